@@ -1,12 +1,19 @@
+import json
 import logging
+import os
 import re
+import stat
 import subprocess
+import time
 
 import typer
 import typer.main
 
 REALM = "APPLECONNECT.APPLE.COM"
 LDAP_URL = "ldap://nod.apple.com"
+LDAP_GROUP = "amp-ds-platform-team"
+AUTH_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "amp-ds-platform-cli", "auth.json")
+AUTH_CACHE_TTL = 900
 
 logger = logging.getLogger('amp-ds-platform-cli')
 
@@ -40,26 +47,132 @@ class AppleDirectory:
         :param username: username returned by appleconnect
         :return: bool
         """
+        # the server only returns the group when the user is a member, instead of all group members
+        ldap_filter = f"(&(cn={LDAP_GROUP})(memberUid={self.escape_filter_value(username)}))"
         cmd = ['ldapsearch', '-LLL', '-x', '-H', LDAP_URL, '-b',
-               'cn=groups,dc=apple,dc=com', 'cn=amp-ds-platform-team', 'memberUid']
+               'cn=groups,dc=apple,dc=com', ldap_filter, 'cn']
         logger.debug('ldapsearch find group command: {}'.format(cmd))
 
         ldap_output = subprocess.run(cmd, check=True, capture_output=True, text=True)
 
-        users_in_group = [line.split(' ')[1] for line in ldap_output.stdout.splitlines()[1:] if len(line)]
-        user_belongs_to_group = username in users_in_group
+        user_belongs_to_group = any(line.startswith('dn:') for line in ldap_output.stdout.splitlines())
 
         return user_belongs_to_group
 
+    @staticmethod
+    def escape_filter_value(value: str) -> str:
+        """Escapes LDAP filter special characters of a value (RFC 4515).
+
+        :param value: filter value
+        :return: str
+        """
+        return "".join(f"\\{ord(char):02x}" if char in '\\*()\x00' else char for char in value)
+
+
+class AuthCache:
+    def __init__(self, path: str = "", ttl: float | None = None):
+        """Cache of a successful authentication, readable and writable by the current user only.
+
+        :param path: cache file path, defaults to PCLI_AUTH_CACHE_PATH or ~/.cache/amp-ds-platform-cli/auth.json
+        :param ttl: seconds an authentication is reused, defaults to PCLI_AUTH_CACHE_TTL or 900, 0 disables the cache
+        """
+        self.path = path or os.environ.get("PCLI_AUTH_CACHE_PATH", "") or AUTH_CACHE_PATH
+        self.ttl = ttl if ttl is not None else self.get_env_ttl()
+
+    @staticmethod
+    def get_env_ttl() -> float:
+        """Read the TTL from PCLI_AUTH_CACHE_TTL, invalid values fall back to the default TTL with a warning.
+
+        :return: float
+        """
+        raw_ttl = os.environ.get("PCLI_AUTH_CACHE_TTL", "").strip()
+        if not raw_ttl:
+            return float(AUTH_CACHE_TTL)
+        try:
+            ttl = float(raw_ttl)
+        except ValueError:
+            ttl = -1.0
+        # also rejects nan
+        if not ttl >= 0:
+            typer.echo(f"Ignoring invalid PCLI_AUTH_CACHE_TTL '{raw_ttl}', authentications are reused for "
+                       f"{AUTH_CACHE_TTL} seconds", err=True)
+            return float(AUTH_CACHE_TTL)
+        return ttl
+
+    def get(self) -> str | None:
+        """Returns the cached username when the authentication has not expired.
+
+        :return: str | None
+        """
+        if self.ttl <= 0:
+            return None
+        try:
+            with open(self.path, 'r') as cache_file:
+                file_stat = os.fstat(cache_file.fileno())
+                # ignore caches other users could have written or read
+                if file_stat.st_uid != os.getuid() or stat.S_IMODE(file_stat.st_mode) & 0o077:
+                    return None
+                cached = json.load(cache_file)
+        except (OSError, ValueError):
+            return None
+
+        # caches written by hand or by other versions are misses
+        if not isinstance(cached, dict):
+            return None
+        try:
+            authenticated_at = float(cached.get("authenticated_at", 0))
+        except (TypeError, ValueError):
+            return None
+        if not 0 <= time.time() - authenticated_at < self.ttl:
+            return None
+        username = cached.get("username")
+        return username if isinstance(username, str) and len(username) else None
+
+    def put(self, username: str) -> None:
+        """Caches a successful authentication of the user.
+
+        :param username: authenticated username
+        :return: None
+        """
+        if self.ttl <= 0:
+            return
+        os.makedirs(os.path.dirname(self.path), mode=0o700, exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as cache_file:
+            json.dump({"username": username, "authenticated_at": time.time()}, cache_file)
+        os.replace(tmp_path, self.path)
+
+    def clear(self) -> None:
+        """Removes the cached authentication.
+
+        :return: None
+        """
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
 
 def auth_callback(ctx: typer.Context) -> None:
     """Callback function to enforce authentication in all CLI commands.
 
+    Successful authentications are cached for a short time, so back-to-back commands skip appleconnect and
+    ldapsearch.
+
     :param ctx: typer Context
     :return: None
     """
+    auth_cache = AuthCache()
+    if auth_cache.get() is not None:
+        logger.debug('using cached authentication')
+        return
+
     username = AppleConnect().authenticate()
     user_belongs_to_group = AppleDirectory().user_belongs_to_group(username=username)
     if not user_belongs_to_group:
+        auth_cache.clear()
         typer.echo("Authentication failed!", err=True)
         raise typer.Exit(1)
+
+    auth_cache.put(username)
@@ -1,80 +1,193 @@
+import fnmatch
 import glob
 import os
+from typing import Any
 import uuid
 
 from amp_ds_platform_library.git.git_cli_operator import GitCLIOperator  # type: ignore
 import ruamel.yaml as yaml
 import typer
 
+try:
+    from amp_ds_platform_library.job_tree.job_tree_index import JobTreeIndex  # type: ignore
+except ImportError:
+    # library releases without the job tree index, jobs are looked up with GlobJobTree
+    JobTreeIndex = None
+
+JOB_TREE_INDEX_PATH = os.path.join(os.path.expanduser("~"), ".cache", "amp-ds-platform-cli", "job_tree_index.json")
+
+JOB_CREATED = "created"
+JOB_SKIPPED = "skipped"
+JOB_FAILED = "failed"
+
+
+class GlobJobTree:
+
+    def __init__(self, root: str):
+        """Job lookups of a directory by recursive glob, used when the library has no job tree index.
+
+        :param root: directory where jobs are searched
+        """
+        self.root = os.path.abspath(root)
+
+    def job_files_by_name(self, job_name: str) -> list[str]:
+        """Return sorted non-empty python job files named after the job.
+
+        :param job_name: job name
+        :return: list[str]
+        """
+        return sorted([f for f in glob.glob(f'{self.root}/**/{job_name}.py', recursive=True) if os.path.getsize(f) > 0])
+
+    def job_names(self) -> list[str]:
+        """Return sorted names of all non-empty python job files.
+
+        :return: list[str]
+        """
+        job_files = glob.glob(f'{self.root}/**/*.py', recursive=True)
+        return sorted({os.path.basename(f)[:-len(".py")] for f in job_files if os.path.getsize(f) > 0})
+
+
+def load_job_tree(directory: str) -> Any:
+    """Job tree of a directory, the persisted job tree index when the library provides it.
+
+    :param directory: directory where jobs are searched
+    :return: JobTreeIndex or GlobJobTree
+    """
+    if JobTreeIndex is None:
+        return GlobJobTree(directory)
+    return JobTreeIndex.load_or_build(directory, index_path=JOB_TREE_INDEX_PATH)
+
 
 class JobCreate:
 
-    def __init__(self, job_name: str):
-        self.job_name = job_name
+    def __init__(self, job_names: list[str], job_names_file: str = ""):
+        """Constructor for JobCreate.
+
+        :param job_names: job names, names containing *, ? or [ are matched against all jobs of the repository
+        :param job_names_file: file with one job name or pattern per line, # starts a comment
+        """
+        self.job_names = job_names
+        self.job_names_file = job_names_file
+        self.spark_config_paths: list[str] = []
+        self.results: list[tuple[str, str, str]] = []
 
     def create_job(self) -> None:
-        """Job creation workflow.
+        """Job creation workflow, all created jobs are pushed in a single commit to one dev branch.
 
         :return: None
         """
-        self.create_job_spark_config()
-        self.push_changes_to_dev_branch()
+        base_jobs_repo_dir = os.path.abspath(os.getcwd())
+        job_tree_index = load_job_tree(base_jobs_repo_dir)
 
-    def create_job_spark_config(self) -> None:
-        """Create individual job spark config file.
+        for job_name in self.resolve_job_names(job_tree_index):
+            status, message = self.create_job_spark_config(job_name, job_tree_index.job_files_by_name(job_name))
+            self.results.append((job_name, status, message))
+            typer.echo(f"{job_name}: {status}" + (f" ({message})" if message else ""))
 
-        :return: None
+        created_count = sum(1 for _, status, _ in self.results if status == JOB_CREATED)
+        failed_count = sum(1 for _, status, _ in self.results if status == JOB_FAILED)
+        typer.echo(f"{created_count} created, {len(self.results) - created_count - failed_count} skipped, "
+                   f"{failed_count} failed")
+
+        if created_count > 0:
+            self.push_changes_to_dev_branch()
+        if failed_count > 0 or len(self.results) == 0:
+            raise typer.Exit(1)
+
+    def resolve_job_names(self, job_tree_index: Any) -> list[str]:
+        """Collect job names from arguments and file, expanding patterns against the job tree index.
+
+        Patterns matching no job are reported as failed.
+
+        :param job_tree_index: JobTreeIndex or GlobJobTree of the jobs repository
+        :return: list[str] unique job names in the requested order
         """
-        base_jobs_repo_dir = os.path.abspath(os.getcwd())
+        requested_names = list(self.job_names)
+        if len(self.job_names_file) > 0:
+            with open(self.job_names_file, 'r') as names_file:
+                requested_names += [line.split('#')[0].strip() for line in names_file]
+
+        job_names: dict[str, None] = {}
+        for requested_name in requested_names:
+            if len(requested_name) == 0:
+                continue
+            if any(char in requested_name for char in "*?["):
+                matched_names = fnmatch.filter(job_tree_index.job_names(), requested_name)
+                if len(matched_names) == 0:
+                    self.results.append((requested_name, JOB_FAILED, "no jobs matching the pattern found"))
+                    typer.echo(f"{requested_name}: {JOB_FAILED} (no jobs matching the pattern found)")
+                job_names.update(dict.fromkeys(matched_names))
+            else:
+                job_names[requested_name] = None
+
+        return list(job_names)
+
+    def create_job_spark_config(self, job_name: str, found_jobs: list[str]) -> tuple[str, str]:
+        """Create individual job spark config file.
 
-        found_jobs = self.search_job_file_by_name(directory=base_jobs_repo_dir, job_name=self.job_name)
+        :param job_name: job name
+        :param found_jobs: python files of the job
+        :return: tuple[str, str] status and message
+        """
         if len(found_jobs) > 1:
-            typer.echo("Multiple jobs with the same name found.")
-            raise typer.Exit(1)
+            return JOB_FAILED, "multiple jobs with the same name found"
         elif len(found_jobs) == 0:
-            typer.echo("No jobs matching the required name found.")
-            raise typer.Exit(1)
+            return JOB_FAILED, "no jobs matching the required name found"
 
         job_folder = "/".join(found_jobs[0].split("/")[:-1])
-        os.makedirs(os.path.join(job_folder, '.spark'), exist_ok=True)
-
-        if os.path.isfile(os.path.join(job_folder, '.spark', 'config.yml')):
-            typer.echo("Spark config file already exists for desired job. "
-                       "If you wish to proceed, delete the config first.")
-            raise typer.Exit(1)
+        spark_config_path = os.path.join(job_folder, '.spark', 'config.yml')
+        if os.path.isfile(spark_config_path):
+            return JOB_SKIPPED, "spark config file already exists, delete the config first to recreate it"
 
+        os.makedirs(os.path.join(job_folder, '.spark'), exist_ok=True)
         spark_config = {"uuid": str(uuid.uuid4())}
-        with open(os.path.join(job_folder, '.spark', 'config.yml'), 'w') as out_file:
+        with open(spark_config_path, 'w') as out_file:
             yaml.round_trip_dump(spark_config, out_file)
+        self.spark_config_paths.append(spark_config_path)
+
+        return JOB_CREATED, ""
 
     def push_changes_to_dev_branch(self) -> None:
-        """Execute clean branch creation from main and push new jot changes.
+        """Execute clean branch creation from origin main and push new job changes.
+
+        Only the created spark configs are committed, other changes in the working tree are left alone.
 
         :return: None
         """
-        dev_branch_name = f"dev-{self.job_name}-job"
-
-        """1. Checkout to main branch"""
-        GitCLIOperator().checkout_branch(branch_name="main")
-
-        """2. Pull from main branch"""
-        GitCLIOperator().pull(branch_name="main")
-
-        """3. Checkout to dev branch"""
-        GitCLIOperator().checkout_branch(branch_name=dev_branch_name, new_branch=True)
-
-        """4. Commit changes"""
-        GitCLIOperator().commit(commit_message=f"Create {self.job_name} job")
-
-        """5. Push changes to branch"""
-        GitCLIOperator().push(branch_name=dev_branch_name)
+        created_jobs = [job_name for job_name, status, _ in self.results if status == JOB_CREATED]
+        if len(created_jobs) == 1:
+            dev_branch_name = f"dev-{created_jobs[0]}-job"
+            commit_message = f"Create {created_jobs[0]} job"
+        else:
+            dev_branch_name = f"dev-{len(created_jobs)}-jobs-{uuid.uuid4().hex[:8]}"
+            commit_message = f"Create {len(created_jobs)} jobs\n\n" + "\n".join(created_jobs)
+
+        git_cli_operator = GitCLIOperator()
+        if hasattr(git_cli_operator, "push_changes_to_new_branch"):
+            git_cli_operator.push_changes_to_new_branch(
+                branch_name=dev_branch_name,
+                paths=self.spark_config_paths,
+                commit_message=commit_message
+            )
+            return
+
+        # library releases without the single-repo workflow
+        git_cli_operator.checkout_branch(branch_name="main")
+        git_cli_operator.pull(branch_name="main")
+        git_cli_operator.checkout_branch(branch_name=dev_branch_name, new_branch=True)
+        git_cli_operator.repo.index.add(self.spark_config_paths)
+        git_cli_operator.repo.index.commit(commit_message)
+        git_cli_operator.push(branch_name=dev_branch_name)
 
     @staticmethod
     def search_job_file_by_name(directory: str, job_name: str) -> list[str]:
-        """Recursively searches for python spark job file by name.
+        """Searches for python spark job file by name in the job tree index of the directory.
+
+        The index is persisted outside of the repository and only rebuilt when the directory tree changed.
+        Libraries without the job tree index fall back to a recursive glob.
 
         :param directory: directory where files are searched
         :param job_name: job name that's searched for
         :return: list[str]
         """
-        return sorted([f for f in glob.glob(f'{directory}/**/{job_name}.py', recursive=True) if os.path.getsize(f) > 0])
+        return list(load_job_tree(directory).job_files_by_name(job_name))
@@ -1,4 +1,3 @@
-from amp_ds_platform_cli.job.create import JobCreate
 import typer
 
 
@@ -6,13 +5,27 @@ app = typer.Typer()
 
 
 @app.command()
-def create(job_name: str) -> None:
+def create(
+        job_names: list[str] = typer.Argument(None, help="Job names, quote patterns like 'etl_*' to match many jobs"),
+        job_names_file: str = typer.Option("", "--file", "-f", help="File with one job name or pattern per line")
+) -> None:
     """Typer command used to create jobs.
 
-    :param job_name: str
+    All jobs are created in a single commit on one dev branch, jobs that already have a spark config are skipped.
+
+    :param job_names: list[str]
+    :param job_names_file: str
     :return: None
     """
-    JobCreate(job_name=job_name).create_job()
+    if not job_names and not job_names_file:
+        typer.echo("Error: Pass job names or a --file with job names", err=True)
+        # exit code of click usage errors
+        raise typer.Exit(code=2)
+
+    # imported when the command runs, keeps git and yaml out of the CLI startup
+    from amp_ds_platform_cli.job.create import JobCreate
+
+    JobCreate(job_names=job_names or [], job_names_file=job_names_file).create_job()
 
 
 if __name__ == "__main__":
@@ -1,8 +1,44 @@
-from amp_ds_platform_cli.authentication.authentication import auth_callback
+from typing import Any
+
 from amp_ds_platform_cli.job import job
+import click
 import typer
+from typer.core import TyperGroup
+
+HELP_REQUESTED = "amp_ds_platform_cli.help_requested"
+
+
+class CLIGroup(TyperGroup):
+
+    def invoke(self, ctx: click.Context) -> Any:
+        """Records whether the invoked subcommand only shows its help, before its arguments are parsed.
+
+        :param ctx: click Context
+        :return: Any
+        """
+        # renamed in click 8.2
+        protected_args = getattr(ctx, "_protected_args", None)
+        if protected_args is None:
+            protected_args = ctx.protected_args
+        ctx.meta[HELP_REQUESTED] = any(arg in ctx.help_option_names for arg in [*protected_args, *ctx.args])
+        return super().invoke(ctx)
+
+
+def auth_callback(ctx: typer.Context) -> None:
+    """Callback function to enforce authentication in all CLI commands.
+
+    :param ctx: typer Context
+    :return: None
+    """
+    # help and shell completion run no command and need no authentication
+    if ctx.resilient_parsing or ctx.meta.get(HELP_REQUESTED, False):
+        return
+
+    from amp_ds_platform_cli.authentication.authentication import auth_callback as authenticate
+    authenticate(ctx)
+
 
-app = typer.Typer()
+app = typer.Typer(cls=CLIGroup)
 app.callback()(auth_callback)
 app.add_typer(job.app, name="job")
 
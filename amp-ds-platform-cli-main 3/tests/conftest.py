@@ -1,3 +1,14 @@
-# import pytest
+import os
 
-# Add your fixtures here
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def auth_cache_path(tmp_path: str, monkeypatch: pytest.MonkeyPatch) -> str:
+    """Points the authentication cache of every test at its own directory instead of the user cache.
+
+    :return: str
+    """
+    cache_path = os.path.join(tmp_path, "cache", "auth.json")
+    monkeypatch.setenv("PCLI_AUTH_CACHE_PATH", cache_path)
+    return cache_path
@@ -0,0 +1,189 @@
+import os
+import stat
+import time
+
+from amp_ds_platform_cli.authentication import authentication
+import click
+import pytest
+import typer
+
+APPLECONNECT_STUB = """#!/bin/sh
+echo "appleconnect $*" >> "$STUB_LOG"
+echo "Success: $STUB_USER@APPLECONNECT.APPLE.COM signed in"
+"""
+
+LDAPSEARCH_STUB = """#!/bin/sh
+echo "ldapsearch $*" >> "$STUB_LOG"
+case "$*" in
+  *"(memberUid=$STUB_MEMBER))"*)
+    echo "dn: cn=amp-ds-platform-team,cn=groups,dc=apple,dc=com"
+    echo "cn: amp-ds-platform-team";;
+esac
+"""
+
+
+@pytest.fixture
+def stub_log(tmp_path: str, monkeypatch: pytest.MonkeyPatch) -> str:
+    """Puts stub appleconnect and ldapsearch executables on the PATH and returns the log of their calls.
+
+    :return: str
+    """
+    bin_dir = os.path.join(tmp_path, "bin")
+    os.makedirs(bin_dir)
+    for name, script in (("appleconnect", APPLECONNECT_STUB), ("ldapsearch", LDAPSEARCH_STUB)):
+        with open(os.path.join(bin_dir, name), "w") as stub_file:
+            stub_file.write(script)
+        os.chmod(os.path.join(bin_dir, name), 0o755)
+
+    log_path = os.path.join(tmp_path, "calls.log")
+    open(log_path, "w").close()
+    monkeypatch.setenv("PATH", os.pathsep.join([bin_dir, os.environ["PATH"]]))
+    monkeypatch.setenv("STUB_LOG", log_path)
+    monkeypatch.setenv("STUB_USER", "jappleseed")
+    monkeypatch.setenv("STUB_MEMBER", "jappleseed")
+    monkeypatch.delenv("PCLI_AUTH_CACHE_TTL", raising=False)
+    return log_path
+
+
+def stub_calls(log_path: str) -> list[str]:
+    """Names of the stubs called so far.
+
+    :return: list[str]
+    """
+    with open(log_path, "r") as log_file:
+        return [line.split(" ")[0] for line in log_file.read().splitlines()]
+
+
+def authenticate() -> None:
+    """Runs the authentication callback of the CLI.
+
+    :return: None
+    """
+    authentication.auth_callback(typer.Context(click.Command("pcli")))
+
+
+def test_repeated_commands_use_cached_authentication(stub_log: str) -> None:
+    """Only the first command runs appleconnect and ldapsearch.
+
+    :return: None
+    """
+    authenticate()
+    authenticate()
+
+    assert stub_calls(stub_log) == ["appleconnect", "ldapsearch"]
+
+
+def test_cache_file_is_private(stub_log: str) -> None:
+    """The auth cache is only readable and writable by the user.
+
+    :return: None
+    """
+    authenticate()
+
+    cache_path = os.environ["PCLI_AUTH_CACHE_PATH"]
+    assert stat.S_IMODE(os.stat(cache_path).st_mode) == 0o600
+
+
+def test_cache_readable_by_others_is_ignored(stub_log: str) -> None:
+    """A cache with loose permissions is not trusted.
+
+    :return: None
+    """
+    authenticate()
+    os.chmod(os.environ["PCLI_AUTH_CACHE_PATH"], 0o644)
+    authenticate()
+
+    assert stub_calls(stub_log) == ["appleconnect", "ldapsearch"] * 2
+
+
+@pytest.mark.parametrize("content", ['["jappleseed"]', '{"username": "jappleseed", "authenticated_at": "now"}',
+                                     '{"username": "jappleseed", "authenticated_at": null}'])
+def test_malformed_cache_is_a_miss(content: str, stub_log: str) -> None:
+    """A cache that is not an object of a username and a time authenticates again.
+
+    :return: None
+    """
+    cache_path = os.environ["PCLI_AUTH_CACHE_PATH"]
+    os.makedirs(os.path.dirname(cache_path), mode=0o700)
+    fd = os.open(cache_path, os.O_WRONLY | os.O_CREAT, 0o600)
+    with os.fdopen(fd, "w") as cache_file:
+        cache_file.write(content)
+
+    assert authentication.AuthCache().get() is None
+    authenticate()
+
+    assert stub_calls(stub_log) == ["appleconnect", "ldapsearch"]
+
+
+def test_expired_cache_authenticates_again(stub_log: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Authentication is repeated once the TTL has passed.
+
+    :return: None
+    """
+    authenticated_at = time.time()
+    authenticate()
+    monkeypatch.setattr(time, "time", lambda: authenticated_at + authentication.AUTH_CACHE_TTL + 1)
+    authenticate()
+
+    assert stub_calls(stub_log) == ["appleconnect", "ldapsearch"] * 2
+
+
+def test_zero_ttl_disables_cache(stub_log: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    """A TTL of 0 authenticates every command.
+
+    :return: None
+    """
+    monkeypatch.setenv("PCLI_AUTH_CACHE_TTL", "0")
+    authenticate()
+    authenticate()
+
+    assert stub_calls(stub_log) == ["appleconnect", "ldapsearch"] * 2
+    assert not os.path.exists(os.environ["PCLI_AUTH_CACHE_PATH"])
+
+
+@pytest.mark.parametrize("raw_ttl", ["15m", "-1", "nan"])
+def test_invalid_ttl_falls_back_to_default(raw_ttl: str, monkeypatch: pytest.MonkeyPatch,
+                                           capsys: pytest.CaptureFixture[str]) -> None:
+    """An invalid PCLI_AUTH_CACHE_TTL uses the default TTL and warns about it.
+
+    :return: None
+    """
+    monkeypatch.setenv("PCLI_AUTH_CACHE_TTL", raw_ttl)
+
+    assert authentication.AuthCache().ttl == authentication.AUTH_CACHE_TTL
+    assert f"Ignoring invalid PCLI_AUTH_CACHE_TTL '{raw_ttl}'" in capsys.readouterr().err
+
+
+def test_non_member_is_rejected_and_not_cached(stub_log: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Users outside of the group fail authentication every time.
+
+    :return: None
+    """
+    monkeypatch.setenv("STUB_MEMBER", "someone_else")
+
+    for _ in range(2):
+        with pytest.raises(typer.Exit):
+            authenticate()
+
+    assert stub_calls(stub_log) == ["appleconnect", "ldapsearch"] * 2
+
+
+def test_group_membership_is_filtered_by_the_server(stub_log: str) -> None:
+    """Ldapsearch queries the single user instead of listing all group members.
+
+    :return: None
+    """
+    assert authentication.AppleDirectory().user_belongs_to_group("jappleseed")
+
+    with open(stub_log, "r") as log_file:
+        ldapsearch_call = log_file.read()
+    assert "(&(cn=amp-ds-platform-team)(memberUid=jappleseed))" in ldapsearch_call
+    assert "memberUid\n" not in ldapsearch_call
+
+
+def test_filter_values_are_escaped() -> None:
+    """Usernames cannot change the LDAP filter.
+
+    :return: None
+    """
+    assert authentication.AppleDirectory.escape_filter_value("*)(cn=*") == "\\2a\\29\\28cn=\\2a"
@@ -0,0 +1,147 @@
+import os
+import subprocess
+
+from amp_ds_platform_cli.job import job
+import pytest
+import typer
+from typer.testing import CliRunner
+
+pytest.importorskip("git")
+pytest.importorskip("amp_ds_platform_library")
+create = pytest.importorskip("amp_ds_platform_cli.job.create")
+
+
+def git(cwd: str, *args: str) -> str:
+    """Runs a git command in a test repository.
+
+    :return: str
+    """
+    return subprocess.run(["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args], cwd=cwd,
+                          check=True, capture_output=True, text=True).stdout
+
+
+@pytest.fixture
+def jobs_repo(tmp_path: str, monkeypatch: pytest.MonkeyPatch) -> str:
+    """Jobs repository cloned from a local origin, used as working directory.
+
+    :return: str
+    """
+    origin = os.path.join(tmp_path, "origin.git")
+    repo = os.path.join(tmp_path, "jobs")
+    git(str(tmp_path), "init", "-q", "--bare", origin)
+    git(str(tmp_path), "clone", "-q", origin, repo)
+    git(repo, "checkout", "-q", "-b", "main")
+    for job_name in ("etl_orders", "etl_users", "report_daily", "configured_job"):
+        os.makedirs(os.path.join(repo, "jobs", job_name))
+        with open(os.path.join(repo, "jobs", job_name, f"{job_name}.py"), "w") as job_file:
+            job_file.write("print('job')\n")
+    os.makedirs(os.path.join(repo, "jobs", "configured_job", ".spark"))
+    with open(os.path.join(repo, "jobs", "configured_job", ".spark", "config.yml"), "w") as config_file:
+        config_file.write("uuid: existing\n")
+    git(repo, "add", "-A")
+    git(repo, "commit", "-q", "-m", "Add jobs")
+    git(repo, "push", "-q", "origin", "main")
+
+    monkeypatch.chdir(repo)
+    monkeypatch.setattr(create, "JOB_TREE_INDEX_PATH", os.path.join(tmp_path, "job_tree_index.json"))
+    return repo
+
+
+def test_bulk_create_makes_one_commit_on_one_branch(jobs_repo: str) -> None:
+    """Names, patterns and files of names are created together in one commit.
+
+    :return: None
+    """
+    names_file = os.path.join(jobs_repo, "..", "names.txt")
+    with open(names_file, "w") as out_file:
+        out_file.write("# daily reports\nreport_daily\n\n")
+
+    job_create = create.JobCreate(job_names=["etl_*", "configured_job"], job_names_file=names_file)
+    job_create.create_job()
+
+    assert job_create.results == [
+        ("etl_orders", create.JOB_CREATED, ""),
+        ("etl_users", create.JOB_CREATED, ""),
+        ("configured_job", create.JOB_SKIPPED,
+         "spark config file already exists, delete the config first to recreate it"),
+        ("report_daily", create.JOB_CREATED, "")
+    ]
+    branches = git(jobs_repo, "ls-remote", "--heads", "origin").splitlines()
+    assert len(branches) == 2
+    dev_branch = [line.split("refs/heads/")[1] for line in branches if "main" not in line][0]
+    assert git(jobs_repo, "rev-list", "--count", f"origin/main..origin/{dev_branch}").strip() == "1"
+    assert sorted(git(jobs_repo, "show", "--name-only", "--format=", f"origin/{dev_branch}").split()) == [
+        "jobs/etl_orders/.spark/config.yml", "jobs/etl_users/.spark/config.yml", "jobs/report_daily/.spark/config.yml"
+    ]
+
+
+def test_failed_jobs_do_not_abort_the_batch(jobs_repo: str) -> None:
+    """Unknown jobs are reported as failed after the other jobs were pushed.
+
+    :return: None
+    """
+    job_create = create.JobCreate(job_names=["missing_job", "report_daily", "nothing_*"])
+
+    with pytest.raises(typer.Exit):
+        job_create.create_job()
+
+    assert [(job_name, status) for job_name, status, _ in job_create.results] == [
+        ("nothing_*", create.JOB_FAILED), ("missing_job", create.JOB_FAILED), ("report_daily", create.JOB_CREATED)
+    ]
+    assert "refs/heads/dev-report_daily-job" in git(jobs_repo, "ls-remote", "--heads", "origin")
+
+
+def test_create_with_library_without_job_tree_index(jobs_repo: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Library releases without the job tree index still create and push jobs.
+
+    :return: None
+    """
+    monkeypatch.setattr(create, "JobTreeIndex", None)
+    with open(os.path.join(jobs_repo, "untracked.txt"), "w") as out_file:
+        out_file.write("not part of the job\n")
+
+    job_create = create.JobCreate(job_names=["etl_*"])
+    job_create.create_job()
+
+    assert [status for _, status, _ in job_create.results] == [create.JOB_CREATED, create.JOB_CREATED]
+    dev_branch = [line.split("refs/heads/")[1] for line in git(jobs_repo, "ls-remote", "--heads", "origin").splitlines()
+                  if "main" not in line][0]
+    assert sorted(git(jobs_repo, "show", "--name-only", "--format=", f"origin/{dev_branch}").split()) == [
+        "jobs/etl_orders/.spark/config.yml", "jobs/etl_users/.spark/config.yml"
+    ]
+
+
+def test_create_with_library_without_single_repo_workflow(jobs_repo: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Library releases without push_changes_to_new_branch still commit only the created configs and push them.
+
+    :return: None
+    """
+    from amp_ds_platform_library.git.git_cli_operator import GitCLIOperator  # type: ignore
+
+    monkeypatch.delattr(GitCLIOperator, "push_changes_to_new_branch", raising=False)
+    with open(os.path.join(jobs_repo, "untracked.txt"), "w") as out_file:
+        out_file.write("not part of the job\n")
+
+    job_create = create.JobCreate(job_names=["etl_*"])
+    job_create.create_job()
+
+    assert [status for _, status, _ in job_create.results] == [create.JOB_CREATED, create.JOB_CREATED]
+    dev_branch = [line.split("refs/heads/")[1] for line in git(jobs_repo, "ls-remote", "--heads", "origin").splitlines()
+                  if "main" not in line][0]
+    assert sorted(git(jobs_repo, "show", "--name-only", "--format=", f"origin/{dev_branch}").split()) == [
+        "jobs/etl_orders/.spark/config.yml", "jobs/etl_users/.spark/config.yml"
+    ]
+
+
+def test_create_without_job_names_is_a_usage_error(jobs_repo: str) -> None:
+    """Neither job names nor a file fails before touching the repository.
+
+    :return: None
+    """
+    head = git(jobs_repo, "rev-parse", "HEAD")
+
+    result = CliRunner().invoke(job.app, [])
+
+    assert result.exit_code == 2
+    assert "Pass job names or a --file with job names" in result.output
+    assert git(jobs_repo, "rev-parse", "HEAD") == head
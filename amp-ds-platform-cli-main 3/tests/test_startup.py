@@ -0,0 +1,85 @@
+import os
+import subprocess
+import sys
+
+from amp_ds_platform_cli import main
+from amp_ds_platform_cli.authentication import authentication
+import pytest
+from typer.testing import CliRunner
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# modules only needed once a command runs
+DEFERRED_MODULES = ("git", "ruamel", "amp_ds_platform_library", "amp_ds_platform_cli.job.create",
+                    "amp_ds_platform_cli.authentication")
+# import time of the CLI modules on top of typer, in microseconds
+IMPORT_TIME_BUDGET_US = 50000
+
+
+def import_times() -> dict[str, int]:
+    """Import amp_ds_platform_cli.main in a fresh interpreter and return cumulative import times by module.
+
+    :return: dict[str, int]
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([PROJECT_DIR, os.environ.get("PYTHONPATH", "")]))
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import amp_ds_platform_cli.main"],
+                            check=True, capture_output=True, text=True, env=env, cwd=PROJECT_DIR)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        times[module.strip()] = int(cumulative)
+    return times
+
+
+def test_startup_defers_command_modules() -> None:
+    """CLI startup does not import modules of the commands.
+
+    :return: None
+    """
+    imported = import_times()
+    assert [module for module in imported if module.startswith(DEFERRED_MODULES)] == []
+
+
+def test_startup_import_time_budget() -> None:
+    """CLI modules stay within the import time budget.
+
+    :return: None
+    """
+    imported = import_times()
+    cli_import_time = imported["amp_ds_platform_cli.main"] - imported.get("typer", 0) - imported.get("click", 0)
+    assert cli_import_time < IMPORT_TIME_BUDGET_US
+
+
+@pytest.mark.parametrize("args", [["--help"], ["job", "--help"], ["job", "create", "--help"]])
+def test_help_skips_authentication(monkeypatch: pytest.MonkeyPatch, args: list[str]) -> None:
+    """Help runs no command and does not authenticate.
+
+    :return: None
+    """
+    calls = []
+    monkeypatch.setattr(authentication.AppleConnect, "authenticate", lambda self: calls.append("authenticate"))
+
+    CliRunner().invoke(main.app, args)
+
+    assert calls == []
+
+
+def test_command_authenticates(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Commands still authenticate before they run.
+
+    :return: None
+    """
+    calls = []
+
+    def authenticate(self: authentication.AppleConnect) -> str:
+        calls.append("authenticate")
+        return "user"
+
+    monkeypatch.setattr(authentication.AppleConnect, "authenticate", authenticate)
+    monkeypatch.setattr(authentication.AppleDirectory, "user_belongs_to_group", lambda self, username: False)
+
+    result = CliRunner().invoke(main.app, ["job", "create", "some_job"])
+
+    assert calls == ["authenticate"]
+    assert result.exit_code == 1
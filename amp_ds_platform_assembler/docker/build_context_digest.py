@@ -0,0 +1,353 @@
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import json
+import os
+import re
+import shlex
+import stat
+from typing import Any
+
+BUILD_CONTEXT_MANIFEST_VERSION = 1
+HASH_CHUNK_SIZE = 1024 * 1024
+HASH_BATCH_SIZE = 256
+IMAGE_TAG_PREFIX = "ctx-"
+IMAGE_TAG_DIGEST_LENGTH = 16
+# heredoc of a Dockerfile instruction, like <<EOF or <<-"EOF", its body ends with a line of the delimiter
+HEREDOC_PATTERN = re.compile(r"<<-?[\"']?([A-Za-z_][A-Za-z0-9_]*)[\"']?")
+
+
+class DockerignoreMatcher:
+    def __init__(self, patterns: list[str]) -> None:
+        """
+        Matches build context paths against .dockerignore patterns, the last matching pattern wins and a
+        pattern matching a parent directory matches everything below it
+        :param patterns: list[str]
+        """
+        self.rules_exclude: list[bool] = []
+        # generated .dockerignore files list thousands of plain paths, they are looked up instead of matched
+        self.literal_rules: dict[str, int] = {}
+        self.wildcard_rules: list[tuple[int, re.Pattern[str]]] = []
+        self.last_rule_cache: dict[str, int] = {}
+        for pattern in patterns:
+            pattern = pattern.strip()
+            if len(pattern) == 0 or pattern.startswith("#"):
+                continue
+            excluded = not pattern.startswith("!")
+            pattern = os.path.normpath(pattern.lstrip("!").strip()).lstrip("/")
+            if pattern == ".":
+                continue
+            rule_index = len(self.rules_exclude)
+            self.rules_exclude.append(excluded)
+            if any(char in pattern for char in "*?[\\"):
+                self.wildcard_rules.append((rule_index, self.translate(pattern)))
+            else:
+                self.literal_rules[pattern] = rule_index
+
+    @staticmethod
+    def translate(pattern: str) -> re.Pattern[str]:
+        """
+        Translates .dockerignore pattern to regex, * and ? stop at directories and ** matches any number of them
+        :param pattern: str
+        :return: re.Pattern[str]
+        """
+        regex = ""
+        index = 0
+        while index < len(pattern):
+            char = pattern[index]
+            if pattern.startswith("**/", index):
+                regex += "(?:.*/)?"
+                index += 3
+                continue
+            if pattern.startswith("**", index):
+                regex += ".*"
+                index += 2
+                continue
+            class_end = pattern.find("]", index + 2) if char == "[" else -1
+            if char == "*":
+                regex += "[^/]*"
+            elif char == "?":
+                regex += "[^/]"
+            elif class_end > 0:
+                char_class = pattern[index + 1:class_end].replace("\\", "\\\\")
+                regex += "[^" + char_class[1:] + "]" if char_class.startswith(("!", "^")) else "[" + char_class + "]"
+                index = class_end
+            else:
+                regex += re.escape(char)
+            index += 1
+        return re.compile(regex + "$")
+
+    @classmethod
+    def from_file(cls, dockerignore_path: str) -> "DockerignoreMatcher":
+        """
+        Loads .dockerignore, missing file matches nothing
+        :param dockerignore_path: str
+        :return: DockerignoreMatcher
+        """
+        if not os.path.isfile(dockerignore_path):
+            return cls([])
+        with open(dockerignore_path, 'r') as dockerignore_file:
+            return cls(dockerignore_file.read().splitlines())
+
+    def is_excluded(self, rel_path: str) -> bool:
+        """
+        Whether path relative to the build context is excluded from the build context
+        :param rel_path: str
+        :return: bool
+        """
+        last_rule = self.get_last_rule(rel_path)
+        return last_rule >= 0 and self.rules_exclude[last_rule]
+
+    def get_last_rule(self, rel_path: str, is_dir: bool = False) -> int:
+        """
+        Returns index of the last rule matching the path or one of its parent directories, -1 when none matches,
+        results of directories are cached
+        :param rel_path: str
+        :param is_dir: bool
+        :return: int
+        """
+        last_rule = self.last_rule_cache.get(rel_path, -2) if is_dir else -2
+        if last_rule == -2:
+            parent_dir = rel_path.rpartition("/")[0]
+            last_rule = max(self.get_last_rule(parent_dir, True) if len(parent_dir) else -1,
+                            self.literal_rules.get(rel_path, -1))
+            for rule_index, regex in reversed(self.wildcard_rules):
+                if rule_index <= last_rule:
+                    break
+                if regex.match(rel_path) is not None:
+                    last_rule = rule_index
+                    break
+            if is_dir:
+                self.last_rule_cache[rel_path] = last_rule
+        return last_rule
+
+
+class BuildContextDigest:
+    def __init__(self, context_dir: str, max_workers: int = 0, chunk_size: int = HASH_CHUNK_SIZE) -> None:
+        """
+        Deterministic content digest of the files copied by a Dockerfile, its text and base image, used to skip
+        rebuilding images whose build context did not change
+        :param context_dir: str docker build context
+        :param max_workers: int hashing threads, 0 picks one per cpu
+        :param chunk_size: int bytes read at once when hashing a file
+        """
+        self.context_dir = os.path.abspath(context_dir)
+        self.max_workers = max_workers if max_workers > 0 else min(32, (os.cpu_count() or 1) * 2)
+        self.chunk_size = chunk_size
+        self.dockerignore = DockerignoreMatcher.from_file(os.path.join(self.context_dir, ".dockerignore"))
+
+    @staticmethod
+    def get_dockerfile_instructions(dockerfile: str) -> tuple[str, list[str]]:
+        """
+        Returns base image and build context sources of the COPY and ADD instructions of Dockerfile text, only FROM,
+        COPY and ADD lines are tokenized. Sources copied from other stages or images, heredocs and remote URLs are
+        left out
+        :param dockerfile: str
+        :return: tuple[str, list[str]]
+        """
+        base_docker_image = ""
+        copy_sources = []
+        heredoc_delimiters: list[str] = []
+        for line in dockerfile.replace("\\\n", " ").splitlines():
+            if len(heredoc_delimiters):
+                if line.strip() == heredoc_delimiters[0]:
+                    heredoc_delimiters.pop(0)
+                continue
+            if line.lstrip().startswith("#"):
+                continue
+            heredoc_delimiters = [match.group(1) for match in HEREDOC_PATTERN.finditer(line)]
+            instruction, _, arguments = line.strip().partition(" ")
+            instruction = instruction.upper()
+            if instruction not in ("FROM", "COPY", "ADD"):
+                continue
+
+            try:
+                words = json.loads(arguments) if arguments.lstrip().startswith("[") else shlex.split(arguments)
+            except ValueError:
+                raise RuntimeError(f"Cannot parse Dockerfile instruction: {line.strip()}")
+            if instruction == "FROM":
+                if len(base_docker_image) == 0:
+                    base_docker_image = next(word for word in words if not word.startswith("--"))
+            elif not any(word.startswith("--from=") for word in words):
+                sources = [word for word in words if not word.startswith("--")][:-1]
+                # heredocs and remote sources are not part of the build context
+                copy_sources += [source for source in sources if not source.startswith(("<<", "git@"))
+                                 and "://" not in source]
+        return base_docker_image, copy_sources
+
+    def get_copied_files(self, copy_sources: list[str]) -> list[str]:
+        """
+        Returns sorted files copied by the COPY sources relative to the build context, leaving out files ignored by
+        .dockerignore
+        :param copy_sources: list[str]
+        :return: list[str]
+        """
+        copied_files = set()
+        for copy_source in copy_sources:
+            source_path = os.path.join(self.context_dir, os.path.normpath(copy_source).lstrip("/"))
+            if not os.path.exists(source_path) and not os.path.islink(source_path):
+                raise RuntimeError(f"Dockerfile copies {copy_source} which is missing in {self.context_dir}")
+
+            if os.path.isdir(source_path) and not os.path.islink(source_path):
+                for dir_path, dir_names, file_names in os.walk(source_path):
+                    rel_dir = os.path.relpath(dir_path, self.context_dir).replace(os.sep, "/")
+                    # symlinked directories are copied as links and not followed
+                    for name in dir_names:
+                        if os.path.islink(os.path.join(dir_path, name)):
+                            file_names.append(name)
+                    for file_name in file_names:
+                        copied_files.add(f"{rel_dir}/{file_name}")
+            else:
+                copied_files.add(os.path.relpath(source_path, self.context_dir).replace(os.sep, "/"))
+
+        return sorted(rel_path for rel_path in copied_files if not self.dockerignore.is_excluded(rel_path))
+
+    def hash_file(self, rel_path: str) -> str:
+        """
+        Returns sha256 of file content and executable bit, symlinks are hashed by their target like docker copies them
+        :param rel_path: str
+        :return: str
+        """
+        path = os.path.join(self.context_dir, rel_path)
+        file_stat = os.lstat(path)
+        if stat.S_ISLNK(file_stat.st_mode):
+            return hashlib.sha256(b"link\0" + os.readlink(path).encode()).hexdigest()
+
+        digest = hashlib.sha256(b"exec\0" if file_stat.st_mode & stat.S_IXUSR else b"file\0")
+        # small files are read at once without allocating a whole chunk
+        buffer = bytearray(max(1, min(self.chunk_size, file_stat.st_size)))
+        view = memoryview(buffer)
+        with open(path, 'rb', buffering=0) as in_file:
+            while read_size := in_file.readinto(buffer):
+                digest.update(view[:read_size])
+        return digest.hexdigest()
+
+    def hash_files(self, rel_paths: list[str]) -> list[str]:
+        """
+        Returns sha256 of every file of the batch
+        :param rel_paths: list[str]
+        :return: list[str]
+        """
+        return [self.hash_file(rel_path) for rel_path in rel_paths]
+
+    def compute(self, dockerfile_path: str = "", base_docker_image: str = "",
+                build_args: dict[str, str] | None = None) -> dict[str, Any]:
+        """
+        Computes build context manifest of the Dockerfile, files are hashed in parallel. The base image is hashed by
+        its reference, not by its content, so a moving tag like python:3.11 pushed again is not detected. Pass a
+        digest reference like python@sha256:... as base image to rebuild when the base image changes
+        :param dockerfile_path: str defaults to the Dockerfile of the build context
+        :param base_docker_image: str defaults to the first FROM of the Dockerfile
+        :param build_args: dict[str, str] --build-arg values passed to docker build, they end up in the image ENV
+        :return: dict[str, Any]
+        """
+        if len(dockerfile_path) == 0:
+            dockerfile_path = os.path.join(self.context_dir, "Dockerfile")
+        with open(dockerfile_path, 'r') as dockerfile_file:
+            dockerfile = dockerfile_file.read()
+
+        dockerfile_base_image, copy_sources = self.get_dockerfile_instructions(dockerfile)
+        if len(base_docker_image) == 0:
+            base_docker_image = dockerfile_base_image
+        copied_files = self.get_copied_files(copy_sources)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            # files are hashed in batches, one future per file costs more than hashing a small file
+            batches = [copied_files[index:index + HASH_BATCH_SIZE]
+                       for index in range(0, len(copied_files), HASH_BATCH_SIZE)]
+            file_hashes: dict[str, str] = {}
+            for batch, batch_hashes in zip(batches, executor.map(self.hash_files, batches)):
+                file_hashes.update(zip(batch, batch_hashes))
+
+        digest = hashlib.sha256()
+        digest.update(f"version\0{BUILD_CONTEXT_MANIFEST_VERSION}\0".encode())
+        digest.update(f"base_image\0{base_docker_image}\0".encode())
+        digest.update(b"dockerfile\0" + hashlib.sha256(dockerfile.encode()).digest())
+        # values are only kept as a hash in the manifest, build args like SENTRY_DSN should not be published
+        build_args_digest = hashlib.sha256()
+        for name, value in sorted((build_args or {}).items()):
+            build_args_digest.update(f"{name}\0{value}\0".encode())
+        digest.update(b"build_args\0" + build_args_digest.digest())
+        for rel_path, file_hash in file_hashes.items():
+            digest.update(f"\0{rel_path}\0{file_hash}".encode())
+
+        return {
+            "version": BUILD_CONTEXT_MANIFEST_VERSION,
+            "digest": digest.hexdigest(),
+            "image_tag": IMAGE_TAG_PREFIX + digest.hexdigest()[:IMAGE_TAG_DIGEST_LENGTH],
+            "base_image": base_docker_image,
+            "dockerfile_sha256": hashlib.sha256(dockerfile.encode()).hexdigest(),
+            "build_args_sha256": build_args_digest.hexdigest(),
+            "file_count": len(file_hashes),
+            "files": file_hashes
+        }
+
+    @staticmethod
+    def load_manifest(manifest_path: str) -> dict[str, Any]:
+        """
+        Loads build context manifest, unreadable manifests are treated as empty
+        :param manifest_path: str
+        :return: dict[str, Any]
+        """
+        try:
+            with open(manifest_path, 'r') as manifest_file:
+                manifest = json.load(manifest_file)
+        except (OSError, ValueError):
+            return {}
+
+        if not isinstance(manifest, dict) or manifest.get("version") != BUILD_CONTEXT_MANIFEST_VERSION:
+            return {}
+        return manifest
+
+    @staticmethod
+    def write_manifest(manifest_path: str, manifest: dict[str, Any]) -> None:
+        """
+        Writes build context manifest through a temporary file which atomically replaces it
+        :param manifest_path: str
+        :param manifest: dict[str, Any]
+        :return: None
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(manifest_path)), exist_ok=True)
+        tmp_path = f"{manifest_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as manifest_file:
+            json.dump(manifest, manifest_file, indent=1, sort_keys=True)
+        os.replace(tmp_path, manifest_path)
+
+    @staticmethod
+    def get_changed_files(manifest: dict[str, Any], previous_manifest: dict[str, Any]) -> list[str]:
+        """
+        Returns sorted files added, removed or changed since the previous manifest
+        :param manifest: dict[str, Any]
+        :param previous_manifest: dict[str, Any]
+        :return: list[str]
+        """
+        files = manifest.get("files", {})
+        previous_files = previous_manifest.get("files", {})
+        return sorted(rel_path for rel_path in files.keys() | previous_files.keys()
+                      if files.get(rel_path) != previous_files.get(rel_path))
+
+    def write_build_context_manifest(self, manifest_path: str, previous_manifest_path: str = "",
+                                     dockerfile_path: str = "", base_docker_image: str = "",
+                                     build_args: dict[str, str] | None = None) -> bool:
+        """
+        Writes build context manifest and reports whether the image has to be rebuilt, the pipeline skips the build
+        when the image tag of the manifest is already published
+        :param manifest_path: str
+        :param previous_manifest_path: str manifest of the last published image, may be the manifest path itself
+        :param dockerfile_path: str
+        :param base_docker_image: str
+        :param build_args: dict[str, str]
+        :return: bool whether the build context changed since the previous manifest
+        """
+        manifest = self.compute(dockerfile_path, base_docker_image, build_args)
+        # loaded before writing, the previous manifest is overwritten when both paths are the same
+        previous_manifest = self.load_manifest(previous_manifest_path) if len(previous_manifest_path) else {}
+        self.write_manifest(manifest_path, manifest)
+
+        if previous_manifest.get("digest") == manifest["digest"]:
+            print(f"Build context unchanged, image {manifest['image_tag']} can be reused")
+            return False
+
+        changed_files = self.get_changed_files(manifest, previous_manifest)
+        print(f"Build context changed, image {manifest['image_tag']} needs to be built "
+              f"({len(changed_files)} of {manifest['file_count']} files changed)")
+        return True
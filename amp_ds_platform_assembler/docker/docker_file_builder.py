@@ -1,5 +1,30 @@
 import os
 
+from amp_ds_platform_library.job_tree.job_tree_index import JobTreeIndex
+
+DOCKERFILE_BUILD_ARGS = """ARG JOB_BUILD_PROJECT
+ENV JOB_BUILD_PROJECT=$JOB_BUILD_PROJECT
+ARG JOB_DRI_TEAM
+ENV JOB_DRI_TEAM=$JOB_DRI_TEAM
+ARG SENTRY_DSN
+ENV SENTRY_DSN=$SENTRY_DSN
+"""
+# docker allows at most 127 image layers including those of the base image, above this many team directories and
+# files the jobs are copied as a single layer
+MAX_JOB_LAYERS = 40
+DOCKERIGNORE_HEADER = "# Generated by DockerfileBuilder, do not edit."
+TEST_DIR_NAMES = ("tests", "test")
+DOCKERIGNORE_PATTERNS = [
+    "**/__pycache__",
+    "**/*.py[cod]",
+    "**/.pytest_cache",
+    "**/.mypy_cache",
+    "**/.ipynb_checkpoints",
+    "**/.DS_Store",
+    "**/.spark/*",
+    "!**/.spark/config.yml",
+]
+
 
 class DockerfileBuilder:
     def build_standard_dockerfile(self, base_docker_image: str = "") -> None:
@@ -8,13 +33,7 @@ class DockerfileBuilder:
 
         dockerfile = f"""FROM {base_docker_image}
 
-ARG JOB_BUILD_PROJECT
-ENV JOB_BUILD_PROJECT=$JOB_BUILD_PROJECT
-ARG JOB_DRI_TEAM
-ENV JOB_DRI_TEAM=$JOB_DRI_TEAM
-ARG SENTRY_DSN
-ENV SENTRY_DSN=$SENTRY_DSN
-
+{DOCKERFILE_BUILD_ARGS}
 # Extract the built app into /app.
 COPY common /mnt/app/common
 COPY jobs /mnt/app/jobs
@@ -24,3 +43,136 @@ COPY pie-config/ /mnt/pie-config/
         """
         with open(os.path.abspath(os.path.join(os.getcwd(), 'Dockerfile')), 'w') as out_file:
             out_file.write(dockerfile)
+
+    def build_layered_dockerfile(self, base_docker_image: str = "", split_jobs_by_team: bool = False,
+                                 requirements_file: str = "requirements.txt", write_dockerignore: bool = True,
+                                 max_job_layers: int = MAX_JOB_LAYERS) -> None:
+        """
+        Builds Dockerfile with layers ordered from least to most volatile, so that changing a job only rebuilds
+        and pushes the jobs layers: dependencies, common, pie-config and jobs, optionally one layer per team
+        :param base_docker_image: str
+        :param split_jobs_by_team: bool
+        :param requirements_file: str requirements installed in the dependencies layer when the file exists
+        :param write_dockerignore: bool writes .dockerignore unless a hand-maintained one exists
+        :param max_job_layers: int most jobs layers when split by team, lower it for base images with many layers
+        :return: None
+        """
+        if len(base_docker_image) == 0:
+            raise Exception("Dockerfile builder needs a base docker image. Check your rio.yml file!")
+
+        context_dir = os.getcwd()
+        copy_instructions = self.get_layered_copy_instructions(context_dir, split_jobs_by_team, requirements_file,
+                                                               max_job_layers)
+
+        dockerfile_lines = [f"FROM {base_docker_image}", "", DOCKERFILE_BUILD_ARGS]
+        if len(requirements_file) and os.path.isfile(os.path.join(context_dir, requirements_file)):
+            dockerfile_lines += [
+                "# Dependencies change least often and come first.",
+                f"COPY {copy_instructions[0][0]} {copy_instructions[0][1]}",
+                f"RUN pip install --no-cache-dir -r {copy_instructions[0][1]}",
+                ""
+            ]
+            copy_instructions = copy_instructions[1:]
+
+        dockerfile_lines.append("# Extract the built app into /app, from least to most frequently changed.")
+        dockerfile_lines += [f"COPY {source} {destination}" for source, destination in copy_instructions]
+        dockerfile_lines.append("")
+
+        with open(os.path.join(context_dir, 'Dockerfile'), 'w') as out_file:
+            out_file.write("\n".join(dockerfile_lines))
+
+        if write_dockerignore:
+            self.build_dockerignore(context_dir, requirements_file)
+
+    def get_layered_copy_instructions(self, context_dir: str, split_jobs_by_team: bool = False,
+                                      requirements_file: str = "requirements.txt",
+                                      max_job_layers: int = MAX_JOB_LAYERS) -> list[tuple[str, str]]:
+        """
+        Returns source and destination of every COPY instruction of the layered Dockerfile, in layer order
+        :param context_dir: str
+        :param split_jobs_by_team: bool
+        :param requirements_file: str
+        :param max_job_layers: int
+        :return: list[tuple[str, str]]
+        """
+        copy_instructions = []
+        if len(requirements_file) and os.path.isfile(os.path.join(context_dir, requirements_file)):
+            copy_instructions.append((requirements_file, f"/mnt/app/{os.path.basename(requirements_file)}"))
+        copy_instructions += [("common", "/mnt/app/common"), ("pie-config/", "/mnt/pie-config/")]
+
+        jobs_dir = os.path.join(context_dir, "jobs")
+        team_dirs = []
+        jobs_root_files = []
+        if split_jobs_by_team and os.path.isdir(jobs_dir):
+            with os.scandir(jobs_dir) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        team_dirs.append(entry.name)
+                    else:
+                        jobs_root_files.append(entry.name)
+
+        # every team directory and file under jobs is a layer of its own
+        if 0 < len(team_dirs) and len(team_dirs) + len(jobs_root_files) <= max_job_layers:
+            # sorted, so the Dockerfile only changes when teams are added or removed
+            copy_instructions += [(f"jobs/{file_name}", f"/mnt/app/jobs/{file_name}")
+                                  for file_name in sorted(jobs_root_files)]
+            copy_instructions += [(f"jobs/{team_dir}", f"/mnt/app/jobs/{team_dir}") for team_dir in sorted(team_dirs)]
+        else:
+            copy_instructions.append(("jobs", "/mnt/app/jobs"))
+
+        return copy_instructions
+
+    def build_dockerignore(self, context_dir: str, requirements_file: str = "requirements.txt") -> None:
+        """
+        Builds .dockerignore limiting the build context to the copied directories, without tests, caches and
+        .spark scratch files, test paths are taken from the jobs index. A .dockerignore without the generated
+        header is maintained by hand and kept
+        :param context_dir: str
+        :param requirements_file: str
+        :return: None
+        """
+        dockerignore_path = os.path.join(context_dir, '.dockerignore')
+        if os.path.isfile(dockerignore_path):
+            with open(dockerignore_path, 'r') as dockerignore_file:
+                if dockerignore_file.readline().rstrip("\n") != DOCKERIGNORE_HEADER:
+                    print(f"Keeping hand-maintained {dockerignore_path}, remove it to generate it")
+                    return
+
+        dockerignore_lines = [DOCKERIGNORE_HEADER, "*", "!common", "!jobs", "!pie-config"]
+        if len(requirements_file):
+            dockerignore_lines.append(f"!{requirements_file}")
+        dockerignore_lines += [""] + DOCKERIGNORE_PATTERNS + [""]
+
+        jobs_dir = os.path.join(context_dir, "jobs")
+        if os.path.isdir(jobs_dir):
+            dockerignore_lines += self.get_job_test_paths(JobTreeIndex.build(jobs_dir))
+
+        with open(dockerignore_path, 'w') as out_file:
+            out_file.write("\n".join(dockerignore_lines) + "\n")
+
+    def get_job_test_paths(self, job_tree_index: JobTreeIndex) -> list[str]:
+        """
+        Returns sorted test directories and test files of the jobs index, relative to the build context
+        :param job_tree_index: JobTreeIndex
+        :return: list[str]
+        """
+        configured_dirs = [rel_dir for rel_dir, record in job_tree_index.directories.items()
+                           if record["spark"] is not None]
+        test_paths = []
+        for rel_dir, record in job_tree_index.directories.items():
+            # test directories holding configured jobs, e.g. a team named tests, are looked into instead
+            if os.path.basename(rel_dir) in TEST_DIR_NAMES and not any(
+                    configured_dir == rel_dir or configured_dir.startswith(rel_dir + "/")
+                    for configured_dir in configured_dirs):
+                test_paths.append(os.path.join("jobs", rel_dir))
+                continue
+            # python files of configured job directories are jobs, even when named like tests
+            if record["spark"] is not None:
+                continue
+            for file_name in record["python_files"]:
+                if file_name.startswith("test_") or file_name.endswith("_test.py") or file_name == "conftest.py":
+                    test_paths.append(os.path.join("jobs", rel_dir, file_name))
+
+        # nested test paths are already excluded with their test directory
+        test_dirs = [path + "/" for path in test_paths if os.path.basename(path) in TEST_DIR_NAMES]
+        return sorted(path for path in test_paths if not any(path.startswith(test_dir) for test_dir in test_dirs))
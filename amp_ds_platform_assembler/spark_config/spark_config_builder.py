@@ -1,39 +1,93 @@
+from collections import ChainMap
+from concurrent.futures import ProcessPoolExecutor
 import glob
+import hashlib
+import json
 import os
-from typing import Any
+from types import MappingProxyType
+from typing import Any, cast, Iterable, Iterator, Mapping, MutableMapping
 
+from amp_ds_platform_library.job_tree.job_tree_index import JobTreeIndex
 import ruamel.yaml as yaml
 
+ASSEMBLER_CACHE_DIR = '.assembler_cache'
+SPARK_YML_MANIFEST_VERSION = 2
+
+# per process state of parallel job entry workers
+_worker_context: dict[str, Any] = {}
+
+
+def _init_job_entry_worker(base_properties: dict[str, Any], fast_load: bool) -> None:
+    """
+    Initializes parallel job entry worker process
+    :param base_properties: dict[str, Any]
+    :param fast_load: bool
+    :return: None
+    """
+    _worker_context["generator"] = SparkConfigGenerator()
+    _worker_context["base_properties"] = MappingProxyType(base_properties)
+    _worker_context["fast_load"] = fast_load
+
+
+def _assemble_job_entry_in_worker(job_args: tuple[str, str, dict[str, Any] | None]) -> dict[str, Any]:
+    """
+    Assembles single job entry inside parallel job entry worker process
+    :param job_args: tuple[str, str, dict[str, Any] | None]
+    :return: dict[str, Any]
+    """
+    config_file, python_job_name, cached_entry = job_args
+    generator: SparkConfigGenerator = _worker_context["generator"]
+    return generator.assemble_job_entry(config_file, python_job_name, cached_entry,
+                                        _worker_context["base_properties"], _worker_context["fast_load"])
+
+
 class SparkConfigGenerator:
 
+    def __init__(self) -> None:
+        self._safe_yaml: yaml.YAML | None = None
+        self.job_tree_index: JobTreeIndex | None = None
+
+    def get_job_tree_index(self, job_dir: str, index_path: str = "") -> JobTreeIndex:
+        """
+        Returns job tree index of job directory, walking the directory only when the index is missing or stale
+        :param job_dir: str
+        :param index_path: str
+        :return: JobTreeIndex
+        """
+        if self.job_tree_index is None or self.job_tree_index.root != os.path.abspath(job_dir) \
+                or not self.job_tree_index.is_valid():
+            self.job_tree_index = JobTreeIndex.load_or_build(job_dir, index_path=index_path)
+        return self.job_tree_index
+
     def get_spark_yml_files(self, job_dir: str) -> list[str]:
         """
         Recursively searches for all spark configs in repository
         :param job_dir: str
         :return: list[str]
         """
-        return sorted([f for f in glob.glob(f'{job_dir}/**/.spark/config.yml', recursive=True) if os.path.getsize(f) > 0])
+        return self.get_job_tree_index(job_dir).spark_config_files()
 
     def get_spark_python_files(self, config_path: str) -> list[str]:
         """
-        Recursively searches for python spark job files
+        Searches for python spark job files, using the job tree index when the path is indexed
         :param config_path: str
         :return: list[str]
         """
+        if self.job_tree_index is not None and self.job_tree_index.contains(config_path):
+            return self.job_tree_index.python_files(config_path)
         return sorted([f for f in glob.glob(f'{config_path}/*.py', recursive=True) if os.path.getsize(f) > 0])
 
-    def generate_spark_yml(self) -> None:
+    def load_anchors_config(self, raw_file: str, build_dev: bool) -> dict[str, Any]:
         """
-        Generates spark config containing all jobs
-        :return: None
+        Parses anchors file and applies dev overrides
+        :param raw_file: str
+        :param build_dev: bool
+        :return: dict[str, Any]
         """
-        with open(os.path.join(os.path.dirname(__file__), 'anchors.yml'), 'r') as anchors_file:
-            raw_file = anchors_file.read()
-
         raw_config = dict(yaml.round_trip_load(raw_file))
 
         # dev updates
-        if os.environ.get('BUILD_DEV', '0') == '1':
+        if build_dev:
             for i, anchor in enumerate(raw_config['anchors']):
                 if 'spark.pie.kubernetes.driver.priorityClassName' in anchor:
                     anchor['spark.pie.kubernetes.driver.priorityClassName'] = 'p3'
@@ -46,33 +100,290 @@ class SparkConfigGenerator:
                 raw_config['anchors'][i] = anchor
             raw_config['triggers'] = []
 
-        spark_config: dict[str, Any] = {"jobs": []}
+        return raw_config
+
+    def get_base_properties(self, raw_file: str, build_dev: bool, cache_dir: str = "") -> Mapping[str, Any]:
+        """
+        Returns resolved default job properties, shared read-only by all jobs
+
+        When a cache directory is given the resolved properties are stored there as JSON, keyed on the anchors file
+        hash and BUILD_DEV, so that the anchors file is only parsed when it changes. The cache directory is in the
+        jobs repository working tree, so it only holds plain data. Properties keeping YAML formatting, e.g. 1.50,
+        are not cached and the anchors file is parsed every time.
+        :param raw_file: str
+        :param build_dev: bool
+        :param cache_dir: str
+        :return: Mapping[str, Any]
+        """
+        cache_path = ""
+        if len(cache_dir):
+            anchors_hash = hashlib.sha256(raw_file.encode()).hexdigest()
+            cache_path = os.path.join(cache_dir, f"anchors-{anchors_hash}-{int(build_dev)}.json")
+            try:
+                with open(cache_path, 'r') as cache_file:
+                    cached_properties = json.load(cache_file)
+                if isinstance(cached_properties, dict):
+                    return MappingProxyType(cached_properties)
+            except (OSError, ValueError):
+                pass
+
+        base_properties = dict(self.load_anchors_config(raw_file, build_dev).get("anchors", [])[-1])
+
+        if len(cache_path) and all(type(value) in (str, int, float, bool, type(None))
+                                   for value in base_properties.values()):
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as cache_file:
+                json.dump(base_properties, cache_file)
+            os.replace(tmp_path, cache_path)
+
+        return MappingProxyType(base_properties)
+
+    def load_job_spark_config(self, file_content: str, fast_load: bool = False) -> dict[str, Any]:
+        """
+        Parses job spark config
+
+        The fast path uses the C accelerated safe loader, which does not keep comments or scalar formatting,
+        e.g. 1.50 is written back as 1.5. Configs without any document, e.g. only comments, are empty.
+        :param file_content: str
+        :param fast_load: bool
+        :return: dict[str, Any]
+        """
+        if not fast_load:
+            return dict(yaml.round_trip_load(file_content) or {})
+
+        if self._safe_yaml is None:
+            self._safe_yaml = yaml.YAML(typ='safe')
+        return dict(self._safe_yaml.load(file_content) or {})
+
+    def build_job_config(self, python_job_name: str, file_content: str, base_properties: Mapping[str, Any],
+                         fast_load: bool = False) -> dict[str, Any]:
+        """
+        Builds single job entry from job spark config and default properties
+
+        Job properties are a copy-on-write view over the shared default properties.
+        :param python_job_name: str
+        :param file_content: str
+        :param base_properties: Mapping[str, Any]
+        :param fast_load: bool
+        :return: dict[str, Any]
+        """
+        raw_jobs = self.load_job_spark_config(file_content, fast_load=fast_load)
+
+        # get default_config
+        job_config: dict[str, Any] = {
+            "name": python_job_name.split("/")[-3] + '-' + python_job_name.split("/")[-1].replace(".py", "").replace("_", "-"),
+            "job_class": "/mnt/app/" + python_job_name,
+            "runtime_versions": {
+                "spark_version": "3.4.0"
+            },
+            # writes only go to the first map, the shared default properties are never modified
+            "properties": ChainMap({}, cast(MutableMapping[str, Any], base_properties))
+        }
+
+        # add job details
+        for key, value in raw_jobs.get("properties", {}).items():
+            job_config["properties"][key] = value
+
+        return job_config
+
+    @staticmethod
+    def render_job_entry(job_config: dict[str, Any]) -> str:
+        """
+        Renders single job as an item of the spark.yml jobs sequence
+        :param job_config: dict[str, Any]
+        :return: str
+        """
+        return str(yaml.round_trip_dump([dict(job_config, properties=dict(job_config["properties"]))]))
+
+    def get_python_job_name(self, config_file: str) -> str:
+        """
+        Returns job python file path used as job name for spark config
+        :param config_file: str
+        :return: str
+        """
+        return "/".join(self.get_spark_python_files(config_path="/".join(config_file.split("/")[:-2]))[0].split("/")[-4:])
+
+    def assemble_job_entry(self, config_file: str, python_job_name: str, cached_entry: dict[str, Any] | None,
+                           base_properties: Mapping[str, Any], fast_load: bool = False) -> dict[str, Any]:
+        """
+        Renders job entry unless cached entry is still valid
+        :param config_file: str
+        :param python_job_name: str
+        :param cached_entry: dict[str, Any] | None
+        :param base_properties: Mapping[str, Any]
+        :param fast_load: bool
+        :return: dict[str, Any]
+        """
+        with open(config_file, 'r') as in_file:
+            file_content = in_file.read()
+
+        config_hash = hashlib.sha256(file_content.encode()).hexdigest()
+        if cached_entry and cached_entry.get("hash") == config_hash \
+                and cached_entry.get("python_job_name") == python_job_name:
+            return cached_entry
+
+        job_config = self.build_job_config(python_job_name, file_content, base_properties, fast_load=fast_load)
+        return {
+            "hash": config_hash,
+            "python_job_name": python_job_name,
+            "entry": self.render_job_entry(job_config)
+        }
+
+    @staticmethod
+    def load_manifest(manifest_path: str) -> dict[str, Any]:
+        """
+        Loads incremental build manifest, unreadable manifests are treated as empty
+        :param manifest_path: str
+        :return: dict[str, Any]
+        """
+        try:
+            with open(manifest_path, 'r') as manifest_file:
+                manifest = json.load(manifest_file)
+        except (OSError, ValueError):
+            return {}
+
+        if not isinstance(manifest, dict) or manifest.get("version") != SPARK_YML_MANIFEST_VERSION:
+            return {}
+        return manifest
+
+    @staticmethod
+    def write_manifest(manifest_path: str, manifest: dict[str, Any]) -> None:
+        """
+        Writes incremental build manifest
+        :param manifest_path: str
+        :param manifest: dict[str, Any]
+        :return: None
+        """
+        os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+        with open(manifest_path, 'w') as manifest_file:
+            json.dump(manifest, manifest_file)
+
+    @staticmethod
+    def write_spark_yml(spark_yml_path: str, job_entries: Iterable[str], skip_unchanged: bool = False) -> bool:
+        """
+        Streams rendered job entries to spark.yml through a temporary file which atomically replaces it
+        :param spark_yml_path: str
+        :param job_entries: Iterable[str]
+        :param skip_unchanged: keep the current file when the content is the same
+        :return: bool whether spark.yml was written
+        """
+        tmp_path = f"{spark_yml_path}.{os.getpid()}.tmp"
+        digest = hashlib.sha256()
+        try:
+            with open(tmp_path, 'w') as out_file:
+                header = "jobs:\n"
+                for job_entry in job_entries:
+                    chunk = header + job_entry
+                    header = ""
+                    out_file.write(chunk)
+                    digest.update(chunk.encode())
+                if len(header):
+                    chunk = str(yaml.round_trip_dump({"jobs": []}))
+                    out_file.write(chunk)
+                    digest.update(chunk.encode())
+
+            if skip_unchanged and os.path.isfile(spark_yml_path):
+                current_digest = hashlib.sha256()
+                with open(spark_yml_path, 'r') as current_file:
+                    for line in current_file:
+                        current_digest.update(line.encode())
+                if current_digest.digest() == digest.digest():
+                    os.remove(tmp_path)
+                    return False
+
+            os.replace(tmp_path, spark_yml_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
 
+        return True
+
+    def generate_spark_yml(self, incremental: bool = False, manifest_path: str = "", workers: int = 1,
+                           fast_load: bool = False) -> None:
+        """
+        Generates spark config containing all jobs
+
+        Job entries are written to spark.yml as soon as they are assembled, so memory does not grow with the
+        number of jobs.
+
+        In incremental mode a manifest with the content hash of every job config, the anchors file and BUILD_DEV
+        is kept on disk. Only job entries whose inputs changed are re-parsed and spark.yml is left untouched
+        when the generated content is the same.
+
+        With more than one worker job configs are parsed in a process pool, a worker count of 0 uses all
+        available CPUs.
+
+        Fast load parses job configs with the C accelerated safe loader, see load_job_spark_config. In incremental
+        mode the resolved default properties are cached as well.
+        :param incremental: bool
+        :param manifest_path: str
+        :param workers: int
+        :param fast_load: bool
+        :return: None
+        """
+        with open(os.path.join(os.path.dirname(__file__), 'anchors.yml'), 'r') as anchors_file:
+            raw_file = anchors_file.read()
+
+        build_dev = os.environ.get('BUILD_DEV', '0') == '1'
+        anchors_hash = hashlib.sha256(raw_file.encode()).hexdigest()
+
+        if len(manifest_path) == 0:
+            manifest_path = os.path.join(os.getcwd(), ASSEMBLER_CACHE_DIR, 'spark_yml_manifest.json')
+
+        cached_jobs: dict[str, Any] = {}
+        if incremental:
+            manifest = self.load_manifest(manifest_path)
+            if manifest.get("anchors_hash") == anchors_hash and manifest.get("build_dev") == build_dev \
+                    and manifest.get("fast_load") == fast_load:
+                cached_jobs = manifest.get("jobs", {})
+
+        # the job tree is walked once, in incremental mode the walk is skipped while the jobs tree is unchanged
         base_dir = os.path.abspath(os.path.join(os.getcwd(), 'jobs'))
-        for f in self.get_spark_yml_files(base_dir):
-            # get job name from job python file
-            python_job_name = "/".join(self.get_spark_python_files(config_path="/".join(f.split("/")[:-2]))[0].split("/")[-4:])
-            with open(f, 'r') as in_file:
-                file_content = in_file.read()
-                raw_jobs = dict(yaml.round_trip_load(file_content))
-
-                # get default_config
-                job_config: dict[str, Any] = {
-                    "name": python_job_name.split("/")[-3] + '-' + python_job_name.split("/")[-1].replace(".py", "").replace("_", "-"),
-                    "job_class": "/mnt/app/" + python_job_name,
-                    "runtime_versions": {
-                        "spark_version": "3.4.0"
-                    },
-                    "properties": dict(raw_config.get("anchors", [])[-1])
-                }
-
-                # add job details
-                for key, value in raw_jobs.get("properties", {}).items():
-                    job_config["properties"][key] = value
-                spark_config["jobs"].append(job_config)
+        job_tree_index = self.get_job_tree_index(base_dir, index_path=os.path.join(
+            os.path.dirname(manifest_path), 'job_tree_index.json') if incremental else "")
+        config_files = job_tree_index.spark_config_files()
+        config_keys = [os.path.relpath(f, base_dir) for f in config_files]
+        job_args = [(f, self.get_python_job_name(f), cached_jobs.get(config_key))
+                    for f, config_key in zip(config_files, config_keys)]
+
+        base_properties = self.get_base_properties(raw_file, build_dev,
+                                                   cache_dir=os.path.dirname(manifest_path) if incremental else "")
 
         os.makedirs(os.path.join(os.getcwd(), 'pie-config', 'platform'), exist_ok=True)
+        spark_yml_path = os.path.abspath(os.path.join(os.getcwd(), 'pie-config', 'platform', 'spark.yml'))
+
+        jobs_manifest: dict[str, Any] = {}
+
+        def job_entries(entries: Iterable[dict[str, Any]]) -> Iterator[str]:
+            # only the incremental manifest keeps rendered entries, otherwise each entry is dropped once written
+            for config_key, entry in zip(config_keys, entries):
+                if incremental:
+                    jobs_manifest[config_key] = entry
+                yield entry["entry"]
+
+        if workers == 0:
+            workers = os.cpu_count() or 1
+
+        if workers > 1 and len(job_args) > 1:
+            # results of executor map keep the sorted order of config files
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_job_entry_worker,
+                                     initargs=(dict(base_properties), fast_load)) as executor:
+                self.write_spark_yml(spark_yml_path, job_entries(executor.map(
+                    _assemble_job_entry_in_worker, job_args, chunksize=max(1, len(job_args) // (workers * 4))
+                )), skip_unchanged=incremental)
+        else:
+            self.write_spark_yml(spark_yml_path, job_entries(
+                self.assemble_job_entry(f, python_job_name, cached_entry, base_properties, fast_load)
+                for f, python_job_name, cached_entry in job_args
+            ), skip_unchanged=incremental)
 
-        with open(os.path.abspath(
-                os.path.join(os.getcwd(), 'pie-config', 'platform', 'spark.yml')), 'w') as out_file:
-            yaml.round_trip_dump(spark_config, out_file)
+        if incremental:
+            self.write_manifest(manifest_path, {
+                "version": SPARK_YML_MANIFEST_VERSION,
+                "anchors_hash": anchors_hash,
+                "build_dev": build_dev,
+                "fast_load": fast_load,
+                "jobs": jobs_manifest
+            })
@@ -0,0 +1,192 @@
+from collections import OrderedDict
+import gzip
+import json
+import os
+import threading
+from typing import Any
+
+
+class LRUFileCache:
+
+    def __init__(self, cache_dir: str, max_memory_size: int, max_disk_size: int, sized: bool = False,
+                 compress: bool = False):
+        """Constructor for LRUFileCache.
+
+        JSON entries kept in an in-memory LRU and as one file per entry on disk. Entries are held serialized and
+        decoded on every read, so callers get their own copy and changes to it never reach the cache. The on-disk
+        recency is the file mtime, the eviction of the least recently used files covers those of other processes.
+
+        :param cache_dir: directory of the on-disk entries, entries are only kept in memory when empty
+        :param max_memory_size: maximum number of in-memory entries, or their serialized bytes when sized
+        :param max_disk_size: maximum number of on-disk entries, or their file bytes when sized
+        :param sized: measure the limits in bytes instead of entries
+        :param compress: gzip compress the on-disk entries
+        """
+        self.cache_dir = cache_dir
+        self.max_memory_size = max_memory_size
+        self.max_disk_size = max_disk_size
+        self.sized = sized
+        self.compress = compress
+        self.memory_size = 0
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        """Number of in-memory entries.
+
+        :return: int
+        """
+        return len(self._entries)
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """Return a copy of the entry, loaded from disk when it is not in memory.
+
+        :param key: cache key
+        :return: dict[str, Any] | None
+        """
+        with self._lock:
+            serialized = self._entries.get(key)
+            if serialized is not None:
+                self._entries.move_to_end(key)
+                entry: dict[str, Any] = json.loads(serialized)
+                return entry
+            serialized = self._load(key)
+            if serialized is None:
+                return None
+            try:
+                entry = json.loads(serialized)
+            except ValueError:
+                return None
+            self._remember(key, serialized)
+            return entry
+
+    def put(self, key: str, entry: dict[str, Any]) -> None:
+        """Store entry in memory and on disk.
+
+        :param key: cache key
+        :param entry: JSON serializable entry
+        :return: None
+        """
+        serialized = json.dumps(entry).encode()
+        with self._lock:
+            self._remember(key, serialized)
+            if not len(self.cache_dir):
+                return
+            os.makedirs(self.cache_dir, mode=0o700, exist_ok=True)
+            tmp_path = f"{self._path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+            if self.compress:
+                with gzip.open(tmp_path, "wb", compresslevel=6) as entry_file:
+                    entry_file.write(serialized)
+            else:
+                with open(tmp_path, "wb") as entry_file:
+                    entry_file.write(serialized)
+            os.replace(tmp_path, self._path(key))
+            self._evict_files()
+
+    def touch(self, key: str) -> None:
+        """Mark the on-disk entry as recently used for the eviction of other processes.
+
+        :param key: cache key
+        :return: None
+        """
+        if len(self.cache_dir):
+            try:
+                os.utime(self._path(key))
+            except OSError:
+                pass
+
+    def remove(self, key: str) -> None:
+        """Remove entry from memory and disk.
+
+        :param key: cache key
+        :return: None
+        """
+        with self._lock:
+            serialized = self._entries.pop(key, None)
+            if serialized is not None:
+                self.memory_size -= self._size(serialized)
+            if len(self.cache_dir):
+                try:
+                    os.remove(self._path(key))
+                except OSError:
+                    pass
+
+    def clear(self) -> None:
+        """Remove all entries from memory and disk.
+
+        :return: None
+        """
+        with self._lock:
+            self._entries.clear()
+            self.memory_size = 0
+            for file_path in self._file_paths():
+                try:
+                    os.remove(file_path)
+                except OSError:
+                    pass
+
+    def _path(self, key: str) -> str:
+        """Path of an on-disk entry."""
+        return os.path.join(self.cache_dir, f"{key}{self._suffix()}")
+
+    def _suffix(self) -> str:
+        """File name suffix of the on-disk entries."""
+        return ".json.gz" if self.compress else ".json"
+
+    def _size(self, serialized: bytes) -> int:
+        """Size of an in-memory entry counted against max_memory_size."""
+        return len(serialized) if self.sized else 1
+
+    def _load(self, key: str) -> bytes | None:
+        """Read a serialized on-disk entry."""
+        if not len(self.cache_dir):
+            return None
+        try:
+            if self.compress:
+                with gzip.open(self._path(key), "rb") as entry_file:
+                    return entry_file.read()
+            with open(self._path(key), "rb") as entry_file:
+                return entry_file.read()
+        except (OSError, EOFError):
+            return None
+
+    def _remember(self, key: str, serialized: bytes) -> None:
+        """Keep entry in memory, entries larger than the memory limit are only kept on disk."""
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.memory_size -= self._size(previous)
+        size = self._size(serialized)
+        if size > self.max_memory_size:
+            return
+        self._entries[key] = serialized
+        self.memory_size += size
+        while self.memory_size > self.max_memory_size:
+            _, evicted = self._entries.popitem(last=False)
+            self.memory_size -= self._size(evicted)
+
+    def _file_paths(self) -> list[str]:
+        """Paths of all on-disk entries, including those of other processes."""
+        if not len(self.cache_dir) or not os.path.isdir(self.cache_dir):
+            return []
+        return [os.path.join(self.cache_dir, file_name) for file_name in os.listdir(self.cache_dir)
+                if file_name.endswith(self._suffix())]
+
+    def _evict_files(self) -> None:
+        """Evict least recently used on-disk entries above max_disk_size."""
+        files: list[tuple[float, int, str]] = []
+        for file_path in self._file_paths():
+            try:
+                file_stat = os.stat(file_path)
+            except OSError:
+                continue
+            files.append((file_stat.st_mtime, file_stat.st_size if self.sized else 1, file_path))
+
+        disk_size = sum(size for _, size, _ in files)
+        for _, size, file_path in sorted(files):
+            if disk_size <= self.max_disk_size:
+                break
+            try:
+                os.remove(file_path)
+            except OSError:
+                pass
+            disk_size -= size
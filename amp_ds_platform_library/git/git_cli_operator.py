@@ -1,3 +1,8 @@
+from contextlib import contextmanager
+import os
+from time import monotonic
+from typing import Iterator
+
 from git import GitCommandError, Repo
 
 
@@ -13,6 +18,7 @@ class GitCLIOperator:
             self.repo = Repo(repo_path or ".")
         except Exception as e:
             raise RuntimeError(f"Failed to initialize repository: {str(e)}")
+        self.step_timings: dict[str, float] = {}
 
     def checkout_branch(self, branch_name: str, new_branch: bool = False) -> None:
         """Checks out repository to specified branch name.
@@ -73,3 +79,99 @@ class GitCLIOperator:
             raise RuntimeError(f"Failed to push changes: {str(e)}")
         else:
             print("Pushed changes successfully.")
+
+    def changed_files(self, base_branch: str, head: str = "HEAD", fetch: bool = True) -> list[str]:
+        """Lists files added, copied, modified or renamed on head since it branched off the base branch.
+
+        Args:
+            base_branch: Name of the branch the changes are compared against, e.g. the PR target branch
+            head: Revision with the changes
+            fetch: Whether to fetch the base branch from origin first
+
+        Returns:
+            Changed file paths relative to the repository root
+        """
+        git = self.repo.git
+        try:
+            if fetch:
+                git.fetch("origin", base_branch)
+            diff = git.diff("--name-only", "--diff-filter=ACMR", f"origin/{base_branch}...{head}")
+        except GitCommandError as e:
+            raise RuntimeError(f"Failed to list changes against {base_branch}: {str(e)}")
+
+        return [path for path in diff.splitlines() if len(path)]
+
+    def create_branch_from_remote(self, branch_name: str, base_branch: str = "main") -> None:
+        """Fetches the base branch from origin and creates a new branch on top of it.
+
+        Unlike checking out and pulling the local base branch first, this only updates the files that differ
+        between the current checkout and the remote base branch. Uncommitted changes are carried over.
+
+        Args:
+            branch_name: Name of the branch to create
+            base_branch: Name of the origin branch the new branch starts from
+        """
+        git = self.repo.git
+        try:
+            with self.timed_step("fetch"):
+                git.fetch("origin", base_branch)
+            with self.timed_step("checkout"):
+                git.checkout("--no-track", "-b", branch_name, f"origin/{base_branch}")
+        except GitCommandError as e:
+            raise RuntimeError(f"Failed to create branch {branch_name} from origin/{base_branch}: {str(e)}")
+        else:
+            print(f"Checked out branch: {branch_name} from origin/{base_branch}")
+
+    def commit_paths(self, paths: list[str], commit_message: str) -> None:
+        """Commits only the given paths instead of all changes in the working tree.
+
+        Args:
+            paths: Paths of the changed files, absolute or relative to the current directory
+            commit_message: Commit message
+        """
+        working_tree_dir = str(self.repo.working_tree_dir)
+        repo_paths = [os.path.relpath(os.path.abspath(path), working_tree_dir) for path in paths]
+        try:
+            with self.timed_step("add"):
+                self.repo.git.add("--", *repo_paths)
+            with self.timed_step("commit"):
+                self.repo.index.commit(commit_message)
+        except GitCommandError as e:
+            raise RuntimeError(f"Failed to commit changes: {str(e)}")
+        else:
+            print("Committed changes with message:", commit_message)
+
+    def push_changes_to_new_branch(self, branch_name: str, paths: list[str], commit_message: str,
+                                   base_branch: str = "main") -> dict[str, float]:
+        """Creates a branch from the origin base branch, commits the given paths and pushes the branch.
+
+        Args:
+            branch_name: Name of the branch to create and push
+            paths: Paths of the changed files to commit
+            commit_message: Commit message
+            base_branch: Name of the origin branch the new branch starts from
+
+        Returns:
+            Seconds taken by every git step
+        """
+        self.step_timings = {}
+        self.create_branch_from_remote(branch_name=branch_name, base_branch=base_branch)
+        self.commit_paths(paths=paths, commit_message=commit_message)
+        with self.timed_step("push"):
+            self.push(branch_name=branch_name)
+
+        print("Git steps took " + ", ".join(f"{step} {seconds:.2f}s" for step, seconds in self.step_timings.items()))
+        return self.step_timings
+
+    @contextmanager
+    def timed_step(self, step: str) -> Iterator[None]:
+        """Records the seconds taken by a git step in step_timings.
+
+        Args:
+            step: Name of the git step
+        """
+        started_at = monotonic()
+        try:
+            yield
+        finally:
+            self.step_timings[step] = self.step_timings.get(step, 0.0) + monotonic() - started_at
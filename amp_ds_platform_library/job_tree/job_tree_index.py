@@ -0,0 +1,249 @@
+import json
+import os
+from typing import Any
+
+JOB_TREE_INDEX_VERSION = 1
+SPARK_DIR_NAME = ".spark"
+SPARK_CONFIG_NAME = "config.yml"
+
+
+class JobTreeIndex:
+    """Index of a jobs repository built in a single os.scandir walk.
+
+    The index records every spark config, every job python file with its size and the job names, so
+    that repeated lookups do not walk the tree again. Like the recursive globs it replaces, hidden
+    directories are skipped and only .spark directories are looked into. Symlinked directories are
+    not followed.
+    """
+
+    def __init__(self, root: str, directories: dict[str, dict[str, Any]]):
+        """Constructor for JobTreeIndex.
+
+        :param root: absolute path of the indexed directory
+        :param directories: directory records keyed by path relative to root
+        """
+        self.root = root
+        self.directories = directories
+
+        self._job_files: dict[str, list[str]] = {}
+        spark_configs: list[str] = []
+        for rel_dir, record in directories.items():
+            for file_name in record["python_files"]:
+                job_name = file_name[:-len(".py")]
+                self._job_files.setdefault(job_name, []).append(self._path(rel_dir, file_name))
+            spark = record["spark"]
+            if spark is not None and spark["config_size"] is not None:
+                spark_configs.append(self._path(rel_dir, SPARK_DIR_NAME, SPARK_CONFIG_NAME))
+
+        self._spark_configs = sorted(spark_configs)
+
+    @classmethod
+    def build(cls, root: str) -> "JobTreeIndex":
+        """Walk the directory tree once and index it.
+
+        :param root: directory to index
+        :return: JobTreeIndex
+        """
+        root = os.path.abspath(root)
+        directories: dict[str, dict[str, Any]] = {}
+        # a missing root is indexed as an empty tree, like the recursive globs found nothing in it
+        pending = [""] if os.path.isdir(root) else []
+        while pending:
+            rel_dir = pending.pop()
+            dir_path = os.path.join(root, rel_dir) if rel_dir else root
+            record: dict[str, Any] = {
+                "mtime_ns": os.stat(dir_path).st_mtime_ns,
+                "python_files": {},
+                "spark": None
+            }
+            with os.scandir(dir_path) as entries:
+                for entry in entries:
+                    if entry.name == SPARK_DIR_NAME and entry.is_dir():
+                        record["spark"] = cls._spark_record(entry.path)
+                    elif entry.name.startswith("."):
+                        continue
+                    elif entry.is_dir(follow_symlinks=False):
+                        pending.append(os.path.join(rel_dir, entry.name))
+                    elif entry.name.endswith(".py") and entry.is_file():
+                        record["python_files"][entry.name] = entry.stat().st_size
+            directories[rel_dir] = record
+
+        return cls(root=root, directories=directories)
+
+    @classmethod
+    def load(cls, root: str, index_path: str) -> "JobTreeIndex | None":
+        """Load a persisted index, returns None when it is missing or stale.
+
+        :param root: directory the index must belong to
+        :param index_path: path of the persisted index
+        :return: JobTreeIndex | None
+        """
+        try:
+            with open(index_path, "r") as index_file:
+                data = json.load(index_file)
+        except (OSError, ValueError):
+            return None
+
+        if not isinstance(data, dict) or data.get("version") != JOB_TREE_INDEX_VERSION \
+                or data.get("root") != os.path.abspath(root):
+            return None
+
+        index = cls(root=data["root"], directories=data["directories"])
+        if not index.is_valid():
+            return None
+        return index
+
+    @classmethod
+    def load_or_build(cls, root: str, index_path: str = "") -> "JobTreeIndex":
+        """Load a persisted index or rebuild and persist it when stale.
+
+        :param root: directory to index
+        :param index_path: path of the persisted index, the index is not persisted when empty
+        :return: JobTreeIndex
+        """
+        if len(index_path) == 0:
+            return cls.build(root)
+
+        index = cls.load(root, index_path)
+        if index is None:
+            index = cls.build(root)
+            index.save(index_path)
+        return index
+
+    def save(self, index_path: str) -> None:
+        """Persist the index to disk.
+
+        :param index_path: path of the persisted index
+        :return: None
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(index_path)), exist_ok=True)
+        tmp_path = f"{index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as index_file:
+            json.dump({"version": JOB_TREE_INDEX_VERSION, "root": self.root, "directories": self.directories},
+                      index_file)
+        os.replace(tmp_path, index_path)
+
+    def is_valid(self) -> bool:
+        """Check that no indexed directory or file changed since the index was built.
+
+        Adding, removing or renaming entries changes the directory mtime. Every indexed python file and
+        spark config is re-checked against its indexed size, since emptied files are excluded from lookups
+        and in-place writes leave the directory mtime alone. File contents of the same size are not tracked.
+
+        :return: bool
+        """
+        if len(self.directories) == 0:
+            return not os.path.isdir(self.root)
+
+        try:
+            for rel_dir, record in self.directories.items():
+                dir_path = os.path.join(self.root, rel_dir) if rel_dir else self.root
+                if os.stat(dir_path).st_mtime_ns != record["mtime_ns"]:
+                    return False
+                for file_name, size in record["python_files"].items():
+                    if os.path.getsize(os.path.join(dir_path, file_name)) != size:
+                        return False
+                spark = record["spark"]
+                if spark is None:
+                    continue
+                spark_path = os.path.join(dir_path, SPARK_DIR_NAME)
+                if os.stat(spark_path).st_mtime_ns != spark["mtime_ns"]:
+                    return False
+                if spark["config_size"] is not None \
+                        and os.path.getsize(os.path.join(spark_path, SPARK_CONFIG_NAME)) != spark["config_size"]:
+                    return False
+        except OSError:
+            return False
+
+        return True
+
+    def spark_config_files(self, directory: str = "") -> list[str]:
+        """Return sorted non-empty spark configs, optionally limited to a directory.
+
+        :param directory: directory to search in, defaults to the index root
+        :return: list[str]
+        """
+        if len(directory) == 0 or os.path.abspath(directory) == self.root:
+            return [f for f in self._spark_configs if self.file_size(f) > 0]
+
+        prefix = os.path.abspath(directory) + "/"
+        return [f for f in self._spark_configs if f.startswith(prefix) and self.file_size(f) > 0]
+
+    def python_files(self, directory: str) -> list[str]:
+        """Return sorted non-empty python files located directly in a directory.
+
+        :param directory: directory to list
+        :return: list[str]
+        """
+        rel_dir = self._relative(directory)
+        record = self.directories.get(rel_dir, {}) if rel_dir is not None else {}
+        return sorted([self._path(rel_dir or "", file_name)
+                       for file_name, size in record.get("python_files", {}).items() if size > 0])
+
+    def job_files_by_name(self, job_name: str) -> list[str]:
+        """Return sorted non-empty python job files named after the job.
+
+        :param job_name: job name
+        :return: list[str]
+        """
+        return sorted([f for f in self._job_files.get(job_name, []) if self.file_size(f) > 0])
+
+    def job_names(self) -> list[str]:
+        """Return sorted names of all non-empty python job files.
+
+        :return: list[str]
+        """
+        return sorted([job_name for job_name in self._job_files if len(self.job_files_by_name(job_name))])
+
+    def contains(self, path: str) -> bool:
+        """Check whether a path is located in the indexed directory.
+
+        :param path: file or directory path
+        :return: bool
+        """
+        return self._relative(path) is not None
+
+    def file_size(self, path: str) -> int:
+        """Return indexed size of a python file or spark config, -1 when it is not indexed.
+
+        :param path: file path
+        :return: int
+        """
+        rel_dir = self._relative(os.path.dirname(path))
+        file_name = os.path.basename(path)
+        if rel_dir is None:
+            return -1
+
+        if os.path.basename(rel_dir) == SPARK_DIR_NAME and file_name == SPARK_CONFIG_NAME:
+            record = self.directories.get(os.path.dirname(rel_dir))
+            spark = record["spark"] if record else None
+            if spark is None or spark["config_size"] is None:
+                return -1
+            return int(spark["config_size"])
+
+        record = self.directories.get(rel_dir)
+        if record is None:
+            return -1
+        return int(record["python_files"].get(file_name, -1))
+
+    def _relative(self, directory: str) -> str | None:
+        """Return directory relative to index root, None when outside of it."""
+        directory = os.path.abspath(directory)
+        if directory == self.root:
+            return ""
+        if not directory.startswith(self.root.rstrip("/") + "/"):
+            return None
+        return os.path.relpath(directory, self.root)
+
+    def _path(self, rel_dir: str, *names: str) -> str:
+        """Return absolute path of an indexed entry."""
+        return os.path.join(self.root, rel_dir, *names) if rel_dir else os.path.join(self.root, *names)
+
+    @staticmethod
+    def _spark_record(spark_path: str) -> dict[str, Any]:
+        """Return index record of a .spark directory."""
+        try:
+            config_size: int | None = os.path.getsize(os.path.join(spark_path, SPARK_CONFIG_NAME))
+        except OSError:
+            config_size = None
+        return {"mtime_ns": os.stat(spark_path).st_mtime_ns, "config_size": config_size}
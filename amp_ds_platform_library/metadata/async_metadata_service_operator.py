@@ -0,0 +1,172 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import math
+from typing import Any, Iterable
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from amp_ds_platform_library.metadata.metadata_service_operator import MetadataServiceOperator
+from amp_ds_platform_library.models.metadata.metadata_service import APIRequest, APIRequestMethod, Job, \
+    JobCreateRequest, JobCreateResult
+
+
+class AsyncMetadataServiceOperator:
+
+    def __init__(self, token: str, concurrency: int = 10, **operator_kwargs: Any):
+        """Constructor for AsyncMetadataServiceOperator.
+
+        Requests are executed by a MetadataServiceOperator in a thread pool, so the pooled session, timeouts and
+        retries are shared with the sync path. At most `concurrency` requests are in flight at once.
+
+        :param token: Access token for Platform Services API
+        :param concurrency: maximum number of concurrent requests
+        :param operator_kwargs: additional MetadataServiceOperator arguments
+        """
+        self.concurrency = concurrency
+        self.operator = MetadataServiceOperator(token, pool_size=concurrency, **operator_kwargs)
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="metadata-service")
+        self._semaphore: asyncio.Semaphore | None = None
+        self._semaphore_loop: asyncio.AbstractEventLoop | None = None
+
+    async def __aenter__(self) -> "AsyncMetadataServiceOperator":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close pooled connections and worker threads without blocking the event loop on requests still running.
+
+        :return: None
+        """
+        await asyncio.to_thread(self.close)
+
+    def close(self) -> None:
+        """Close pooled connections and worker threads, waits for requests still running.
+
+        :return: None
+        """
+        self._executor.shutdown(wait=True)
+        self.operator.close()
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        """Semaphore bounding concurrent requests in the running event loop.
+
+        :return: asyncio.Semaphore
+        """
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def api_request(self, api_request: APIRequest) -> dict[str, Any]:
+        """Execute platform services API request without blocking the event loop.
+
+        :param api_request: APIRequest
+        :return: dict[str, Any]
+        """
+        async with self.semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, self.operator.api_request, api_request)
+
+    async def create_job(self, job_create_request: JobCreateRequest) -> Job:
+        """Create job metadata.
+
+        :param job_create_request: JobCreateRequest
+        :return: Job
+        """
+        api_request = APIRequest(
+            url=self.operator.base_url + "v2/jobs/",
+            method=APIRequestMethod.post,
+            headers=self.operator.headers,
+            json_data=job_create_request.model_dump()
+        )
+        api_response: dict[str, Any] = await self.api_request(api_request=api_request)
+        return Job(**api_response.get("data", {}))
+
+    async def create_jobs_bulk(self, job_create_requests: Iterable[JobCreateRequest]) -> list[JobCreateResult]:
+        """Create many jobs concurrently, a failed job does not fail the batch.
+
+        :param job_create_requests: Iterable[JobCreateRequest]
+        :return: list[JobCreateResult] in the order of the requests
+        """
+        async def create(job_create_request: JobCreateRequest) -> JobCreateResult:
+            try:
+                return JobCreateResult(request=job_create_request, job=await self.create_job(job_create_request))
+            except Exception as e:
+                return JobCreateResult(request=job_create_request, error=str(e))
+
+        return list(await asyncio.gather(*[create(job_create_request) for job_create_request in job_create_requests]))
+
+    async def get_jobs(self, page_size: int = 100, fields: list[str] | None = None,
+                       validate: bool = True) -> list[Job]:
+        """Get jobs metadata, following server pagination.
+
+        Once the first page tells the total count, the remaining pages of page number or offset pagination are
+        requested concurrently. Other paginations are followed page by page.
+
+        :param page_size: number of jobs requested per page
+        :param fields: only keep these job fields, projected jobs are never validated
+        :param validate: validate jobs, set to False to build them with model_construct
+        :return: list[Job]
+        """
+        api_response: dict[str, Any] = await self.api_request(api_request=self.get_jobs_request(
+            self.operator.base_url + "v2/jobs/", params={"page_size": page_size}))
+        data = api_response.get("data", [])
+        page, url = self.operator.parse_jobs_page(data, fields=fields, validate=validate)
+        jobs: list[Job] = list(page)
+
+        page_urls = self.remaining_page_urls(data, len(jobs))
+        if len(page_urls):
+            api_responses = await asyncio.gather(*[self.api_request(api_request=self.get_jobs_request(page_url))
+                                                   for page_url in page_urls])
+            for api_response in api_responses:
+                page, _ = self.operator.parse_jobs_page(api_response.get("data", []), fields=fields,
+                                                        validate=validate)
+                jobs.extend(page)
+            return jobs
+
+        while url is not None:
+            api_response = await self.api_request(api_request=self.get_jobs_request(url))
+            page, url = self.operator.parse_jobs_page(api_response.get("data", []), fields=fields, validate=validate)
+            jobs.extend(page)
+        return jobs
+
+    def get_jobs_request(self, url: str, params: dict[str, Any] | None = None) -> APIRequest:
+        """GET request of a jobs page.
+
+        :param url: page url
+        :param params: query params, next page urls already contain them
+        :return: APIRequest
+        """
+        return APIRequest(url=url, method=APIRequestMethod.get, headers=self.operator.headers, params=params)
+
+    @staticmethod
+    def remaining_page_urls(data: Any, first_page_size: int) -> list[str]:
+        """Urls of all pages after the first one, derived from the next url of the first page.
+
+        Only page number (page=2) and offset (offset=<first page size>) paginations with a total count are
+        supported, otherwise no urls are returned and pages have to be followed one by one.
+
+        :param data: response data of the first page
+        :param first_page_size: number of jobs of the first page
+        :return: list[str]
+        """
+        if not isinstance(data, dict) or not data.get("next") or not isinstance(data.get("count"), int) \
+                or first_page_size == 0:
+            return []
+
+        next_url = urlsplit(data["next"])
+        query = parse_qsl(next_url.query, keep_blank_values=True)
+        query_params = dict(query)
+        if query_params.get("page") == "2":
+            param, values = "page", range(2, math.ceil(data["count"] / first_page_size) + 1)
+        elif query_params.get("offset") == str(first_page_size):
+            param, values = "offset", range(first_page_size, data["count"], first_page_size)
+        else:
+            return []
+
+        return [urlunsplit(next_url._replace(query=urlencode([(name, str(value) if name == param else query_value)
+                                                             for name, query_value in query])))
+                for value in values]
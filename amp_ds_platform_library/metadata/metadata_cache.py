@@ -0,0 +1,123 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any
+
+from amp_ds_platform_library.cache.lru_file_cache import LRUFileCache
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "amp-ds-platform-library", "metadata")
+
+
+class MetadataCache:
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, ttl: float = 300.0, max_entries: int = 128):
+        """Constructor for MetadataCache.
+
+        Read-through cache of Metadata Service GET responses, kept in memory and on disk. Entries younger than the
+        TTL are served without a request, older entries are revalidated with their ETag. The least recently used
+        entries are evicted above max_entries.
+
+        :param cache_dir: directory of the on-disk cache, the cache is only kept in memory when empty
+        :param ttl: seconds an entry is served without revalidation
+        :param max_entries: maximum number of cached responses
+        """
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        # incremented whenever cached data changes, used to invalidate data derived from the cache
+        self.generation = 0
+        self._store = LRUFileCache(cache_dir, max_memory_size=max_entries, max_disk_size=max_entries)
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def key(url: str, params: dict[str, Any] | None = None, headers: dict[str, str] | None = None) -> str:
+        """Cache key of a request, responses are not shared between API keys.
+
+        :param url: request url
+        :param params: request query params
+        :param headers: request headers
+        :return: str
+        """
+        authorization = (headers or {}).get("Authorization", "")
+        raw_key = json.dumps([url, params or {}, authorization], sort_keys=True, default=str)
+        return hashlib.sha256(raw_key.encode()).hexdigest()
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """Return cached entry, fresh or stale.
+
+        :param key: cache key
+        :return: dict[str, Any] | None
+        """
+        return self._store.get(key)
+
+    def get_fresh(self, key: str) -> dict[str, Any] | None:
+        """Return cached entry if it is younger than the TTL and count the hit.
+
+        :param key: cache key
+        :return: dict[str, Any] | None
+        """
+        with self._lock:
+            entry = self.get(key)
+            if entry is None or not self.is_fresh(entry):
+                return None
+            self.hits += 1
+            self._store.touch(key)
+            return entry
+
+    def is_fresh(self, entry: dict[str, Any]) -> bool:
+        """Check whether entry is younger than the TTL.
+
+        :param entry: cached entry
+        :return: bool
+        """
+        return time.time() - float(entry["stored_at"]) < self.ttl
+
+    def put(self, key: str, data: Any, etag: str | None = None) -> None:
+        """Store response data fetched from the service.
+
+        :param key: cache key
+        :param data: response data
+        :param etag: response ETag
+        :return: None
+        """
+        entry = {"stored_at": time.time(), "etag": etag, "data": data}
+        with self._lock:
+            self.misses += 1
+            self.generation += 1
+            self._store.put(key, entry)
+
+    def refresh(self, key: str) -> None:
+        """Mark entry as revalidated after a 304 Not Modified response.
+
+        :param key: cache key
+        :return: None
+        """
+        with self._lock:
+            entry = self.get(key)
+            if entry is None:
+                return
+            self.revalidations += 1
+            self._store.put(key, dict(entry, stored_at=time.time()))
+
+    def invalidate(self) -> None:
+        """Drop all entries, called after writes to the service.
+
+        :return: None
+        """
+        with self._lock:
+            self.generation += 1
+            self._store.clear()
+
+    def stats(self) -> dict[str, int]:
+        """Cache hit and miss counters.
+
+        :return: dict[str, int]
+        """
+        with self._lock:
+            return {"hits": self.hits, "revalidations": self.revalidations, "misses": self.misses,
+                    "entries": len(self._store)}
@@ -1,19 +1,90 @@
-from typing import Any
+import random
+import threading
+from time import sleep, time
+from typing import Any, Iterator
 
+from amp_ds_platform_library.metadata.metadata_cache import MetadataCache
 from amp_ds_platform_library.models.metadata.metadata_service import APIRequest, APIRequestMethod, Job, JobCreateRequest
 import requests
+from requests.adapters import HTTPAdapter
+
+# only requests that can be safely repeated are retried
+IDEMPOTENT_METHODS = frozenset({APIRequestMethod.get, APIRequestMethod.delete})
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
 
 
 class MetadataServiceOperator:
 
     base_url: str = "https://amp-ds-platform-services.g.apple.com/metadata/api/"
 
-    def __init__(self, token: str):
+    def __init__(self, token: str, pool_size: int = 10, timeout: float | tuple[float, float] = (5.0, 30.0),
+                 max_retries: int = 3, backoff_factor: float = 0.5, max_backoff: float = 30.0,
+                 cache: MetadataCache | None = None):
         """Constructor for MetadataServiceOperator.
 
+        The operator keeps one pooled HTTP session with keep-alive connections, reuse a single operator (e.g. as a
+        context manager) for many calls and close it when done.
+
         :param token: Access token for Platform Services API
+        :param pool_size: maximum number of pooled connections, should match the number of concurrent callers
+        :param timeout: per request timeout in seconds, either total or (connect, read)
+        :param max_retries: retries of idempotent requests on connection errors, 429 and 5xx responses
+        :param backoff_factor: base delay in seconds of the exponential backoff between retries
+        :param max_backoff: maximum delay in seconds between retries
+        :param cache: optional read-through cache of GET responses
         """
         self.token = token
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self._session: requests.Session | None = None
+        self._session_lock = threading.Lock()
+        self.cache = cache
+        self._jobs_index: tuple[int, float, dict[str, Job], dict[int, Job]] | None = None
+
+    def __enter__(self) -> "MetadataServiceOperator":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    @property
+    def session(self) -> requests.Session:
+        """Lazily created HTTP session shared by all threads using the operator.
+
+        :return: requests.Session
+        """
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    self._session = session
+        return self._session
+
+    def close(self) -> None:
+        """Close pooled connections of the operator.
+
+        :return: None
+        """
+        with self._session_lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+    @property
+    def headers(self) -> dict[str, Any]:
+        """Authorization headers for Platform Services API.
+
+        :return: dict[str, Any]
+        """
+        return {
+            "Authorization": f"Api-Key {self.token}"
+        }
 
     def create_job(self, job_create_request: JobCreateRequest) -> Job:
         """Create job metadata.
@@ -21,13 +92,10 @@ class MetadataServiceOperator:
         :param job_create_request: JobCreateRequest
         :return: JobCreateResponse
         """
-        headers: dict[str, Any] = {
-            "Authorization": f"Api-Key {self.token}"
-        }
         api_request = APIRequest(
             url=self.base_url + "v2/jobs/",
             method=APIRequestMethod.post,
-            headers=headers,
+            headers=self.headers,
             json_data=job_create_request.model_dump()
         )
         api_response: dict[str, Any] = self.api_request(api_request=api_request)
@@ -40,41 +108,175 @@ class MetadataServiceOperator:
 
         :return: list[Job]
         """
-        headers: dict[str, Any] = {
-            "Authorization": f"Api-Key {self.token}"
-        }
-        api_request = APIRequest(
-            url=self.base_url + "v2/jobs/",
-            method=APIRequestMethod.get,
-            headers=headers
-        )
-        api_response: dict[str, Any] = self.api_request(api_request=api_request)
-        response: list[Job] = [Job(**job) for job in api_response.get("data", [])]
+        return list(self.iter_jobs())
 
-        return response
+    def iter_jobs(self, page_size: int = 100, fields: list[str] | None = None, validate: bool = True,
+                  params: dict[str, Any] | None = None) -> Iterator[Job]:
+        """Lazily iterate jobs metadata page by page.
+
+        Paginated responses ({"results": [...], "next": <url>}) are followed until the last page, plain list
+        responses are returned as a single page. Jobs are yielded as soon as their page arrives.
+
+        :param page_size: number of jobs requested per page
+        :param fields: only keep these job fields, projected jobs are never validated
+        :param validate: validate jobs, set to False to build them with model_construct
+        :param params: additional query params
+        :return: Iterator[Job]
+        """
+        url: str | None = self.base_url + "v2/jobs/"
+        request_params: dict[str, Any] | None = {"page_size": page_size, **(params or {})}
+        while url is not None:
+            api_request = APIRequest(
+                url=url,
+                method=APIRequestMethod.get,
+                headers=self.headers,
+                params=request_params
+            )
+            api_response: dict[str, Any] = self.api_request(api_request=api_request)
+            jobs, url = self.parse_jobs_page(api_response.get("data", []), fields=fields, validate=validate)
+            # next page url already contains the query params
+            request_params = None
+            yield from jobs
+
+    def get_job_by_name(self, name: str) -> Job | None:
+        """Get job metadata by name from the jobs index.
+
+        :param name: job name
+        :return: Job | None
+        """
+        return self.jobs_index()[0].get(name)
+
+    def get_job_by_id(self, job_id: int) -> Job | None:
+        """Get job metadata by id from the jobs index.
+
+        :param job_id: job id
+        :return: Job | None
+        """
+        return self.jobs_index()[1].get(job_id)
+
+    def jobs_index(self) -> tuple[dict[str, Job], dict[int, Job]]:
+        """Jobs keyed by name and by id.
+
+        With a cache the index is kept until the cached jobs change or expire, without a cache it is rebuilt on
+        every call.
+
+        :return: tuple[dict[str, Job], dict[int, Job]]
+        """
+        if self.cache is not None and self._jobs_index is not None:
+            generation, built_at, by_name, by_id = self._jobs_index
+            if generation == self.cache.generation and time() - built_at < self.cache.ttl:
+                return by_name, by_id
+
+        built_at = time()
+        jobs = self.get_jobs()
+        by_name = {job.name: job for job in jobs}
+        by_id = {job.id: job for job in jobs}
+        if self.cache is not None:
+            self._jobs_index = (self.cache.generation, built_at, by_name, by_id)
+        return by_name, by_id
 
     @staticmethod
-    def api_request(api_request: APIRequest) -> dict[str, Any]:
+    def parse_jobs_page(data: Any, fields: list[str] | None = None,
+                        validate: bool = True) -> tuple[Iterator[Job], str | None]:
+        """Parse a page of jobs metadata.
+
+        :param data: response data, paginated dict or list of jobs
+        :param fields: only keep these job fields
+        :param validate: validate jobs
+        :return: tuple[Iterator[Job], str | None] lazily built jobs and next page url
+        """
+        next_url: str | None = None
+        records: list[dict[str, Any]] = data
+        if isinstance(data, dict):
+            records = data.get("results", [])
+            next_url = data.get("next") or None
+
+        def build(record: dict[str, Any]) -> Job:
+            if fields is not None:
+                return Job.model_construct(**{field: record[field] for field in fields if field in record})
+            return Job(**record) if validate else Job.model_construct(**record)
+
+        return (build(record) for record in records), next_url
+
+    def retry_delay(self, attempt: int, response: requests.Response | None = None) -> float:
+        """Delay before the next retry, exponential backoff with full jitter or the server Retry-After.
+
+        :param attempt: number of the failed attempt, starting at 0
+        :param response: response of the failed attempt
+        :return: float
+        """
+        if response is not None and response.headers.get("Retry-After", "").isdigit():
+            return min(float(response.headers["Retry-After"]), self.max_backoff)
+        return random.uniform(0, min(self.backoff_factor * (2 ** attempt), self.max_backoff))
+
+    def api_request(self, api_request: APIRequest) -> dict[str, Any]:
         """Execute platform services API requests.
 
+        With a cache, fresh GET responses are served from it and stale ones are revalidated with If-None-Match.
+        Successful writes invalidate the cache.
+
         :param api_request: APIRequest
         :return: dict[str,str]
         """
-        result: dict[str, Any] = {}
+        cache = self.cache
+        headers = dict(api_request.headers or {})
+        cache_key: str | None = None
+        cached_entry: dict[str, Any] | None = None
+        if cache is not None and api_request.method == "GET":
+            cache_key = cache.key(api_request.url, api_request.params, api_request.headers)
+            fresh_entry = cache.get_fresh(cache_key)
+            if fresh_entry is not None:
+                return {"data": fresh_entry["data"]}
+            cached_entry = cache.get(cache_key)
+            if cached_entry is not None and cached_entry.get("etag"):
+                headers["If-None-Match"] = cached_entry["etag"]
+
         try:
-            if api_request.method == "GET":
-                response = requests.get(url=api_request.url, headers=api_request.headers, params=api_request.params)
-            elif api_request.method == "POST":
-                response = requests.post(url=api_request.url, headers=api_request.headers, json=api_request.json_data)
-            elif api_request.method == "PATCH":
-                response = requests.patch(url=api_request.url, headers=api_request.headers, json=api_request.json_data)
-            elif api_request.method == "DELETE":
-                response = requests.delete(url=api_request.url, headers=api_request.headers)
-            else:
-                raise RuntimeError("API request method not permitted.")
-            response.raise_for_status()
-            result = {"data": response.json()}
+            response = self.send_request(api_request, headers)
+            if response.status_code == 304 and cache is not None and cache_key is not None \
+                    and cached_entry is not None:
+                cache.refresh(cache_key)
+                return {"data": cached_entry["data"]}
+            data = response.json()
         except requests.exceptions.RequestException as e:
             raise RuntimeError("Metadata Service request error occured: " + str(e))
 
-        return result
\ No newline at end of file
+        if cache is not None:
+            if cache_key is not None:
+                cache.put(cache_key, data, etag=response.headers.get("ETag"))
+            else:
+                cache.invalidate()
+
+        return {"data": data}
+
+    def send_request(self, api_request: APIRequest, headers: dict[str, str]) -> requests.Response:
+        """Send request, retrying idempotent requests on connection errors, 429 and 5xx responses.
+
+        :param api_request: APIRequest
+        :param headers: request headers
+        :return: requests.Response
+        """
+        request_kwargs: dict[str, Any] = {"headers": headers, "timeout": self.timeout}
+        if api_request.method == "GET":
+            request_kwargs["params"] = api_request.params
+        elif api_request.method in ("POST", "PATCH"):
+            request_kwargs["json"] = api_request.json_data
+        elif api_request.method != "DELETE":
+            raise RuntimeError("API request method not permitted.")
+
+        attempts = self.max_retries + 1 if api_request.method in IDEMPOTENT_METHODS else 1
+        for attempt in range(attempts):
+            try:
+                response = self.session.request(api_request.method.value, url=api_request.url, **request_kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt == attempts - 1:
+                    raise
+                sleep(self.retry_delay(attempt))
+                continue
+            if response.status_code in RETRY_STATUS_CODES and attempt < attempts - 1:
+                sleep(self.retry_delay(attempt, response))
+                continue
+            response.raise_for_status()
+            return response
+
+        raise RuntimeError("Metadata Service request error occured: retries exhausted")
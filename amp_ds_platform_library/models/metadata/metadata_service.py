@@ -29,6 +29,12 @@ class Job(BaseModel):
     service_account: int
 
 
+class JobCreateResult(BaseModel):
+    request: JobCreateRequest
+    job: Job | None = None
+    error: str | None = None
+
+
 class APIRequestMethod(str, Enum):
     get = "GET"
     post = "POST"
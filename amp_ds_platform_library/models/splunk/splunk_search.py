@@ -0,0 +1,29 @@
+from enum import Enum
+from typing import Any
+
+from pydantic import BaseModel
+
+
+class SplunkInstance(str, Enum):
+    pie = "pie"
+    itunes = "itunes"
+
+
+class SplunkExecMode(str, Enum):
+    normal = "normal"
+    blocking = "blocking"
+    oneshot = "oneshot"
+
+
+class SplunkOutputFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+    arrow = "arrow"
+    parquet = "parquet"
+
+
+class SplunkSearchResult(BaseModel):
+    instance: SplunkInstance
+    search_query: str
+    rows: list[dict[str, Any]] = []
+    error: str | None = None
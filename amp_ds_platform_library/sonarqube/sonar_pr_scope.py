@@ -0,0 +1,104 @@
+import os
+import xml.etree.ElementTree as ElementTree
+
+JUNIT_COUNTERS = ("tests", "failures", "errors", "skipped")
+
+
+class SonarPRScope:
+
+    def __init__(self, changed_files: list[str], repo_root: str, project_dir: str = "."):
+        """Constructor for SonarPRScope.
+
+        Files changed in a pull request, used to limit the SonarQube analysis and its reports to them.
+
+        :param changed_files: changed file paths relative to the repository root
+        :param repo_root: repository root directory
+        :param project_dir: SonarQube project base directory
+        """
+        project_dir = os.path.abspath(project_dir)
+        self.files: list[str] = []
+        for changed_file in changed_files:
+            file_path = os.path.join(os.path.abspath(repo_root), changed_file)
+            # files outside of the project and deleted files cannot be analysed
+            if file_path.startswith(project_dir + os.sep) and os.path.isfile(file_path):
+                self.files.append(os.path.relpath(file_path, project_dir))
+        self._file_set = set(self.files)
+
+    def sonar_opts(self) -> list[str]:
+        """Sonar scanner options limiting the analysis to the changed files.
+
+        :return: list[str]
+        """
+        return [f"-Dsonar.inclusions={','.join(self.files)}"]
+
+    def matches(self, path: str) -> bool:
+        """Check whether a report path refers to a changed file.
+
+        Report paths may be relative to a source root, so a changed file ending with the path also matches.
+
+        :param path: file path of a report entry
+        :return: bool
+        """
+        path = os.path.normpath(path)
+        if path.startswith(os.sep):
+            path = os.path.relpath(path)
+        if path in self._file_set:
+            return True
+        return any(changed_file.endswith(os.sep + path) for changed_file in self.files)
+
+    def filter_report(self, report_path: str) -> str:
+        """Write a copy of a JUnit (pytest, flake8) or Cobertura (coverage) XML report limited to changed files.
+
+        Unfiltered reports are returned as is when they cannot be parsed.
+
+        :param report_path: path of the report
+        :return: str path of the filtered report
+        """
+        try:
+            tree = ElementTree.parse(report_path)
+        except (OSError, ElementTree.ParseError) as e:
+            print(f"Could not filter report {report_path}, using it unfiltered: {e}")
+            return report_path
+
+        for parent in list(tree.iter()):
+            for child in list(parent):
+                if child.tag == "testcase" and not self.matches(self.testcase_path(child)):
+                    parent.remove(child)
+                elif child.tag == "class" and not self.matches(child.get("filename", "")):
+                    parent.remove(child)
+
+        for test_suite in tree.iter("testsuite"):
+            test_cases = test_suite.findall("testcase")
+            counts = {
+                "tests": len(test_cases),
+                "failures": sum(1 for test_case in test_cases if test_case.find("failure") is not None),
+                "errors": sum(1 for test_case in test_cases if test_case.find("error") is not None),
+                "skipped": sum(1 for test_case in test_cases if test_case.find("skipped") is not None)
+            }
+            for counter in JUNIT_COUNTERS:
+                if test_suite.get(counter) is not None:
+                    test_suite.set(counter, str(counts[counter]))
+
+        root, extension = os.path.splitext(report_path)
+        filtered_report_path = f"{root}.pr{extension}"
+        tree.write(filtered_report_path, encoding="utf-8", xml_declaration=True)
+        return filtered_report_path
+
+    @staticmethod
+    def testcase_path(test_case: ElementTree.Element) -> str:
+        """File path of a JUnit test case, from its file attribute or its dotted class name.
+
+        :param test_case: testcase element
+        :return: str
+        """
+        if test_case.get("file"):
+            return test_case.get("file", "")
+        class_name = test_case.get("classname", "")
+        if len(class_name) == 0:
+            # flake8 junit reports name test cases after the checked file
+            return test_case.get("name", "")
+        module_parts = class_name.split(".")
+        # drop test class names, modules are lower case
+        while len(module_parts) > 1 and module_parts[-1][:1].isupper():
+            module_parts.pop()
+        return os.path.join(*module_parts) + ".py"
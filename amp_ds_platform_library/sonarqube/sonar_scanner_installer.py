@@ -0,0 +1,181 @@
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import zipfile
+
+import requests
+
+DEFAULT_SONAR_SCANNER_VERSION = "4.7.0.2747"
+DEFAULT_SCANNER_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "amp-ds-platform-library", "sonar-scanner")
+SONAR_SCANNER_DOWNLOAD_URL = ("https://artifacts.apple.com/bintray-sonarsource-binaries-cache/"
+                              "Distribution/sonar-scanner-cli/")
+INSTALL_MARKER_NAME = ".installed.json"
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+# sha256 of the scanner zip per version, taken from the .sha256 file SonarSource publishes next to each zip
+SONAR_SCANNER_SHA256S: dict[str, str] = {}
+
+
+class SonarScannerInstaller:
+
+    def __init__(self, version: str = DEFAULT_SONAR_SCANNER_VERSION, cache_dir: str = "", sha256: str = "",
+                 timeout: float | tuple[float, float] = (10.0, 60.0)):
+        """Constructor for SonarScannerInstaller.
+
+        Installs sonar-scanner-cli once per version into a cache directory shared by all builds on the host.
+        Concurrent builds are serialized with a file lock, a valid install is reused without downloading.
+
+        :param version: sonar-scanner-cli version
+        :param cache_dir: cache directory, defaults to SONAR_SCANNER_CACHE_DIR or ~/.cache/amp-ds-platform-library
+        :param sha256: expected sha256 of the scanner zip, defaults to SONAR_SCANNER_SHA256, the checksum pinned in
+            SONAR_SCANNER_SHA256S or the published checksum. Installing fails when no checksum is available
+        :param timeout: download timeout in seconds, either total or (connect, read)
+        """
+        self.version = version
+        self.cache_dir = cache_dir or os.environ.get("SONAR_SCANNER_CACHE_DIR", "") or DEFAULT_SCANNER_CACHE_DIR
+        self.sha256 = sha256 or os.environ.get("SONAR_SCANNER_SHA256", "") or SONAR_SCANNER_SHA256S.get(version, "")
+        self.timeout = timeout
+
+    @property
+    def scanner_zip(self) -> str:
+        """Name of the scanner zip."""
+        return f"sonar-scanner-cli-{self.version}-linux.zip"
+
+    @property
+    def download_url(self) -> str:
+        """Download url of the scanner zip."""
+        return SONAR_SCANNER_DOWNLOAD_URL + self.scanner_zip
+
+    @property
+    def version_dir(self) -> str:
+        """Cache directory of the scanner version."""
+        return os.path.join(self.cache_dir, self.version)
+
+    @property
+    def scanner_home(self) -> str:
+        """Installation directory of the scanner."""
+        return os.path.join(self.version_dir, f"sonar-scanner-{self.version}-linux")
+
+    @property
+    def scanner_path(self) -> str:
+        """Path of the sonar-scanner executable."""
+        return os.path.join(self.scanner_home, "bin", "sonar-scanner")
+
+    def install(self) -> str:
+        """Return the path of the sonar-scanner executable, downloading and extracting it when not yet cached.
+
+        :return: str
+        """
+        if self.is_installed():
+            print(f"Using cached sonar-scanner-cli {self.version}")
+            return self.scanner_path
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(os.path.join(self.cache_dir, f"{self.version}.lock"), "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                # another build may have installed the scanner while waiting for the lock
+                if not self.is_installed():
+                    self.download_and_extract()
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+        return self.scanner_path
+
+    def is_installed(self) -> bool:
+        """Check that the scanner of the version was completely installed.
+
+        :return: bool
+        """
+        try:
+            with open(os.path.join(self.version_dir, INSTALL_MARKER_NAME), "r") as marker_file:
+                marker = json.load(marker_file)
+        except (OSError, ValueError):
+            return False
+
+        return marker.get("version") == self.version \
+            and (len(self.sha256) == 0 or marker.get("sha256") == self.sha256) \
+            and os.access(self.scanner_path, os.X_OK) \
+            and os.access(os.path.join(self.scanner_home, "jre", "bin", "java"), os.X_OK)
+
+    def download_and_extract(self) -> None:
+        """Download, verify and extract the scanner into the version directory.
+
+        :return: None
+        """
+        expected_sha256 = self.sha256 or self.fetch_published_sha256()
+        if len(expected_sha256) == 0:
+            raise RuntimeError(f"No checksum to verify {self.scanner_zip}, pass its sha256 or set SONAR_SCANNER_SHA256")
+
+        os.makedirs(self.version_dir, exist_ok=True)
+        zip_path = os.path.join(self.version_dir, self.scanner_zip)
+        zip_sha256 = self.download(zip_path)
+        if zip_sha256 != expected_sha256:
+            os.remove(zip_path)
+            raise RuntimeError(f"Checksum mismatch for {self.scanner_zip}: expected {expected_sha256}, "
+                               f"got {zip_sha256}")
+
+        print("Unzipping sonar-scanner-cli")
+        extract_dir = f"{self.scanner_home}.{os.getpid()}.tmp"
+        shutil.rmtree(extract_dir, ignore_errors=True)
+        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+            zip_ref.extractall(extract_dir)
+        shutil.rmtree(self.scanner_home, ignore_errors=True)
+        os.replace(os.path.join(extract_dir, os.path.basename(self.scanner_home)), self.scanner_home)
+        shutil.rmtree(extract_dir, ignore_errors=True)
+        os.remove(zip_path)
+
+        os.chmod(self.scanner_path, 0o755)
+        os.chmod(os.path.join(self.scanner_home, "jre", "bin", "java"), 0o755)
+
+        marker_path = os.path.join(self.version_dir, INSTALL_MARKER_NAME)
+        with open(f"{marker_path}.{os.getpid()}.tmp", "w") as marker_file:
+            json.dump({"version": self.version, "sha256": zip_sha256}, marker_file)
+        os.replace(f"{marker_path}.{os.getpid()}.tmp", marker_path)
+
+    def download(self, zip_path: str) -> str:
+        """Download the scanner zip, resuming a previously interrupted download.
+
+        :param zip_path: str
+        :return: str sha256 of the downloaded zip
+        """
+        part_path = f"{zip_path}.part"
+        digest = hashlib.sha256()
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+
+        print("Downloading sonar-scanner-cli" + (f", resuming at {offset} bytes" if offset else ""))
+        with requests.get(self.download_url, stream=True, headers=headers, timeout=self.timeout) as response:
+            # 416: the interrupted download was already complete
+            download_complete = offset > 0 and response.status_code == 416
+            if not download_complete:
+                response.raise_for_status()
+                if response.status_code != 206:
+                    # the server ignored the range, start over
+                    offset = 0
+
+            if offset:
+                with open(part_path, "rb") as part_file:
+                    for chunk in iter(lambda: part_file.read(DOWNLOAD_CHUNK_SIZE), b""):
+                        digest.update(chunk)
+            if not download_complete:
+                with open(part_path, "ab" if offset else "wb", buffering=DOWNLOAD_CHUNK_SIZE) as zip_file:
+                    for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                        zip_file.write(chunk)
+                        digest.update(chunk)
+
+        os.replace(part_path, zip_path)
+        return digest.hexdigest()
+
+    def fetch_published_sha256(self) -> str:
+        """Fetch the checksum published next to the scanner zip, empty when none is published.
+
+        :return: str
+        """
+        try:
+            response = requests.get(f"{self.download_url}.sha256", timeout=self.timeout)
+            response.raise_for_status()
+        except requests.exceptions.RequestException:
+            return ""
+        return response.text.split()[0].strip().lower() if len(response.text.split()) else ""
@@ -0,0 +1,94 @@
+import json
+import os
+import re
+import subprocess
+from time import monotonic
+from typing import Any
+
+SCANNER_LOG_LEVELS = ("DEBUG", "INFO", "WARN", "ERROR")
+# e.g. "12:00:01.123 INFO: Sensor Python Sensor [python] (done) | time=1234ms", the timestamp is only logged with -X
+LOG_LINE_PATTERN = re.compile(r"^(?:\d{2}:\d{2}:\d{2}\.\d+ )?(DEBUG|INFO|WARN|ERROR): (.*)$")
+TIMING_PATTERN = re.compile(r"^(.*?)(?: \(done\))? \| time=(\d+)ms$")
+
+
+class SonarScannerRunner:
+
+    def __init__(self, log_level: str = "DEBUG"):
+        """Constructor for SonarScannerRunner.
+
+        Runs sonar-scanner while streaming its output line by line and collects the timing of its phases.
+
+        :param log_level: minimum scanner log level printed, DEBUG runs the scanner with -X
+        """
+        if log_level not in SCANNER_LOG_LEVELS:
+            raise RuntimeError(f"Unknown sonar-scanner log level {log_level}, use one of {SCANNER_LOG_LEVELS}")
+        self.log_level = log_level
+        self.phases: list[dict[str, Any]] = []
+        self.exit_status: int | None = None
+        self.elapsed_seconds = 0.0
+
+    def scanner_opts(self) -> list[str]:
+        """Sonar scanner options of the log level.
+
+        :return: list[str]
+        """
+        return ["-X"] if self.log_level == "DEBUG" else []
+
+    def run(self, sonar_command: list[str], env: dict[str, str]) -> int:
+        """Run sonar-scanner, printing its stdout and stderr as they arrive.
+
+        :param sonar_command: sonar-scanner executable and its options
+        :param env: environment of the scanner process
+        :return: int exit status of the scanner
+        """
+        min_level = SCANNER_LOG_LEVELS.index(self.log_level)
+        # lines without a log level, e.g. stack traces, follow the decision of the previous line
+        print_line = True
+        started_at = monotonic()
+        with subprocess.Popen(sonar_command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1,
+                              env=env) as process:
+            assert process.stdout is not None
+            for line in process.stdout:
+                line = line.rstrip("\n")
+                match = LOG_LINE_PATTERN.match(line)
+                if match is not None:
+                    print_line = SCANNER_LOG_LEVELS.index(match.group(1)) >= min_level
+                    self.parse_timing(match.group(2))
+                if print_line:
+                    print(line, flush=True)
+            self.exit_status = process.wait()
+
+        self.elapsed_seconds = monotonic() - started_at
+        return self.exit_status
+
+    def parse_timing(self, message: str) -> None:
+        """Record the timing of a scanner phase logged as "<phase> | time=<n>ms".
+
+        :param message: log message without time and level
+        :return: None
+        """
+        match = TIMING_PATTERN.match(message)
+        if match is not None:
+            self.phases.append({"phase": match.group(1), "time_ms": int(match.group(2))})
+
+    def timing_report(self) -> dict[str, Any]:
+        """Timing report of the last run, phases are ordered by the time they took.
+
+        :return: dict[str, Any]
+        """
+        return {
+            "exit_status": self.exit_status,
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+            "phases": sorted(self.phases, key=lambda phase: phase["time_ms"], reverse=True)
+        }
+
+    def write_timing_report(self, report_path: str) -> None:
+        """Write the timing report of the last run as JSON.
+
+        :param report_path: str
+        :return: None
+        """
+        report_dir = os.path.dirname(os.path.abspath(report_path))
+        os.makedirs(report_dir, exist_ok=True)
+        with open(report_path, "w") as report_file:
+            json.dump(self.timing_report(), report_file, indent=2)
@@ -35,11 +35,13 @@ Example RIO pipeline for a pull request
 """
 import argparse
 import os
-import requests
-import subprocess
 import sys
-import zipfile
 
+from amp_ds_platform_library.git.git_cli_operator import GitCLIOperator
+from amp_ds_platform_library.sonarqube.sonar_pr_scope import SonarPRScope
+from amp_ds_platform_library.sonarqube.sonar_scanner_installer import DEFAULT_SONAR_SCANNER_VERSION, \
+    SonarScannerInstaller
+from amp_ds_platform_library.sonarqube.sonar_scanner_runner import SCANNER_LOG_LEVELS, SonarScannerRunner
 import toml
 
 sonar_config_opts = [
@@ -59,35 +61,62 @@ def run_sonarqube_scan() -> None:
     :param --pytest_report_path: Path to pytest results
     :param --flake_report_path: Path to flake results
     :param --coverage_report_path: Path to coverage results
+    :param --scanner_cache_dir: Directory caching the sonar-scanner installation
+    :param --incremental_pr: Only analyse files changed in the pull request
+    :param --max_pr_files: Number of changed files above which pull requests are fully analysed
+    :param --scanner_log_level: Minimum sonar-scanner log level printed, DEBUG runs the scanner with -X
+    :param --timing_report_path: Path of the JSON report of the scanner phase timings
     """
     parser = argparse.ArgumentParser(description='Run SonarQube scan')
     parser.add_argument('--project_key', type=str, required=True, help='SonarQube project key')
     parser.add_argument('--pytest_report_path', type=str, required=False, default="", help='Path to pytest results')
     parser.add_argument('--flake_report_path', type=str, required=False, default="", help='Path to flake results')
     parser.add_argument('--coverage_report_path', type=str, required=False, default="", help='Path to coverage results')
+    parser.add_argument('--scanner_cache_dir', type=str, required=False, default="",
+                        help='Directory caching the sonar-scanner installation, defaults to $SONAR_SCANNER_CACHE_DIR')
+    parser.add_argument('--incremental_pr', action='store_true', help='Only analyse files changed in the pull request')
+    parser.add_argument('--max_pr_files', type=int, required=False, default=500,
+                        help='Number of changed files above which pull requests are fully analysed')
+    parser.add_argument('--scanner_log_level', type=str, required=False, default="DEBUG", choices=SCANNER_LOG_LEVELS,
+                        help='Minimum sonar-scanner log level printed, DEBUG runs the scanner with -X')
+    parser.add_argument('--timing_report_path', type=str, required=False, default="",
+                        help='Path of the JSON report of the scanner phase timings')
     # Add more arguments as needed
 
     # Parse the arguments passed from the command line
     args = parser.parse_args(sys.argv[1:])
 
     # Use the parsed arguments in your scan method
-    SonarQubeOperator().perform_scan(
+    exit_status = SonarQubeOperator().perform_scan(
         sonar_config_project_key=args.project_key,
         pytest_report_path=args.pytest_report_path,
         flake_report_path=args.flake_report_path,
-        coverage_report_path=args.coverage_report_path
+        coverage_report_path=args.coverage_report_path,
+        scanner_cache_dir=args.scanner_cache_dir,
+        incremental_pr=args.incremental_pr,
+        max_pr_files=args.max_pr_files,
+        scanner_log_level=args.scanner_log_level,
+        timing_report_path=args.timing_report_path
     )
+    sys.exit(exit_status)
 
 
 class SonarQubeOperator:
 
     def perform_scan(self, sonar_config_project_key: str, pytest_report_path: str = "",
-                     flake_report_path: str = "", coverage_report_path: str = "") -> None:
-        """Run SonarQube scanner."""
+                     flake_report_path: str = "", coverage_report_path: str = "", scanner_cache_dir: str = "",
+                     incremental_pr: bool = False, max_pr_files: int = 500, scanner_log_level: str = "DEBUG",
+                     timing_report_path: str = "") -> int:
+        """Run SonarQube scanner and return its exit status.
+
+        Scanner output is streamed while it runs, lines below scanner_log_level are not printed. The timing of the
+        scanner phases is written as JSON to timing_report_path when set.
+
+        In incremental PR mode only files changed in the pull request are analysed and the reports are limited to
+        them, pull requests changing more than max_pr_files files are fully analysed.
+        """
         # SonarQube scanner version, download details and config
-        sonar_version = "4.7.0.2747"
-        sonar_scanner_zip = f"sonar-scanner-cli-{sonar_version}-linux.zip"
-        sonar_scanner = f"sonar-scanner-{sonar_version}-linux"
+        sonar_version = DEFAULT_SONAR_SCANNER_VERSION
 
         build_secrets_path = os.environ.get("BUILD_SECRETS_PATH", "")
         rio_branch_name = os.environ.get("RIO_BRANCH_NAME")
@@ -95,6 +124,12 @@ class SonarQubeOperator:
         git_pr_source_branch = os.environ.get("GIT_PR_SOURCE_BRANCH")
         git_pr_target_branch = os.environ.get("GIT_PR_TARGET_BRANCH")
 
+        pr_scope = self.get_pr_scope(git_pr_target_branch, max_pr_files) if git_pr_id and incremental_pr else None
+        if pr_scope is not None:
+            pytest_report_path = pr_scope.filter_report(pytest_report_path) if pytest_report_path else ""
+            flake_report_path = pr_scope.filter_report(flake_report_path) if flake_report_path else ""
+            coverage_report_path = pr_scope.filter_report(coverage_report_path) if coverage_report_path else ""
+
         sonar_config_opts.append(f"-Dsonar.projectKey={sonar_config_project_key}")
         if len(pytest_report_path) > 0:
             sonar_config_opts.append(f"-Dsonar.python.xunit.reportPath={pytest_report_path}")
@@ -114,26 +149,8 @@ class SonarQubeOperator:
         with open(sonar_token_path, 'r') as token_file:
             sonar_token = token_file.read().strip()
 
-        # Download SonarQube scanner
-        print("Downloading sonar-scanner-cli")
-        download_url = (f"https://artifacts.apple.com/bintray-sonarsource-binaries-cache/"
-                        f"Distribution/sonar-scanner-cli/{sonar_scanner_zip}")
-        with requests.get(download_url, stream=True) as response:
-            response.raise_for_status()
-            with open(sonar_scanner_zip, "wb") as file:
-                for chunk in response.iter_content(chunk_size=16384):
-                    file.write(chunk)
-
-        # Unzip the scanner
-        print("Unzipping sonar-scanner-cli")
-        with zipfile.ZipFile(sonar_scanner_zip, 'r') as zip_ref:
-            zip_ref.extractall('.')
-
-        # Remove zip file
-        os.remove(sonar_scanner_zip)
-
-        os.chmod("sonar-scanner-4.7.0.2747-linux/bin/sonar-scanner", 0o755)
-        os.chmod("sonar-scanner-4.7.0.2747-linux/jre/bin/java", 0o755)
+        # Install SonarQube scanner, reused from the scanner cache when already installed
+        sonar_scanner_path = SonarScannerInstaller(version=sonar_version, cache_dir=scanner_cache_dir).install()
 
         # Prepare run options
         run_opts = []
@@ -147,6 +164,8 @@ class SonarQubeOperator:
                 f"-Dsonar.pullrequest.branch={git_pr_source_branch}",
                 f"-Dsonar.pullrequest.base={git_pr_target_branch}"
             ]
+            if pr_scope is not None:
+                run_opts += pr_scope.sonar_opts()
         else:
             # For branch scan, set branch name
             run_opts = [f"-Dsonar.branch.name={rio_branch_name}"]
@@ -158,21 +177,50 @@ class SonarQubeOperator:
         # Prepare sonar scanner command
         myenv = os.environ.copy()
         myenv['SONAR_SCANNER_OPTS'] = f'-Djavax.net.ssl.trustStore=/etc/pki/java/cacerts -Dsonar.login={sonar_token}'
-        sonar_scanner_path = os.path.join(sonar_scanner, 'bin', 'sonar-scanner')
+        scanner_runner = SonarScannerRunner(log_level=scanner_log_level)
         sonar_command = [
-            sonar_scanner_path,
-            '-X'
-        ] + run_opts + project_version_opts + sonar_config_opts
+            sonar_scanner_path
+        ] + scanner_runner.scanner_opts() + run_opts + project_version_opts + sonar_config_opts
 
         # Execute sonar scanner
         print("Executing sonar-scanner")
-        try:
-            result = subprocess.run(sonar_command, check=True, capture_output=True, text=True, env=myenv)
+        exit_status = scanner_runner.run(sonar_command, env=myenv)
+        if exit_status == 0:
             print("Sonar-scanner completed successfully")
-            print(result.stdout)
-        except subprocess.CalledProcessError as e:
-            print("Sonar-scanner failed:")
-            print(e.stderr)
+        else:
+            print(f"Sonar-scanner failed with exit status {exit_status}")
+
+        if len(timing_report_path) > 0:
+            scanner_runner.write_timing_report(timing_report_path)
+            print(f"Sonar-scanner timing report written to {timing_report_path}")
+
+        return exit_status
+
+    @staticmethod
+    def get_pr_scope(target_branch: str | None, max_pr_files: int) -> SonarPRScope | None:
+        """Files changed in the pull request, None when the pull request should be fully analysed.
+
+        :param target_branch: pull request target branch
+        :param max_pr_files: number of changed files above which the pull request is fully analysed
+        :return: SonarPRScope | None
+        """
+        if not target_branch:
+            return None
+
+        try:
+            git_operator = GitCLIOperator()
+            changed_files = git_operator.changed_files(target_branch)
+        except RuntimeError as e:
+            print(f"Could not determine files changed in the pull request, running full scan: {e}")
+            return None
+
+        pr_scope = SonarPRScope(changed_files, repo_root=str(git_operator.repo.working_tree_dir))
+        if len(pr_scope.files) == 0 or len(pr_scope.files) > max_pr_files:
+            print(f"{len(pr_scope.files)} files changed in the pull request, running full scan")
+            return None
+
+        print(f"Analysing {len(pr_scope.files)} files changed in the pull request")
+        return pr_scope
 
     @staticmethod
     def extract_project_version() -> str:
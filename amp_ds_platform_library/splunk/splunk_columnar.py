@@ -0,0 +1,318 @@
+import re
+from datetime import datetime
+from itertools import islice
+from typing import Any, Iterable, Iterator
+
+# numbers with leading zeros, like ids or zip codes, stay strings
+INT_PATTERN = re.compile(r"[+-]?(0|[1-9]\d{0,17})")
+FLOAT_PATTERN = re.compile(r"[+-]?((0|[1-9]\d*)(\.\d*)?|\.\d+)([eE][+-]?\d+)?|[+-]?(nan|inf|infinity)", re.IGNORECASE)
+TIME_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}")
+
+
+def import_pyarrow() -> Any:
+    """Import the optional pyarrow dependency.
+
+    :return: pyarrow module
+    """
+    try:
+        import pyarrow  # type: ignore
+    except ImportError:
+        raise RuntimeError("pyarrow is required for arrow and parquet output, install it with: pip install pyarrow")
+    return pyarrow
+
+
+class SplunkColumnarConverter:
+
+    def __init__(self, batch_size: int = 65536, schema: Any = None):
+        """Constructor for SplunkColumnarConverter.
+
+        Converts Splunk result rows to Arrow record batches. Columns whose values are all integers, floats or ISO 8601
+        times become int64, float64 or UTC timestamp columns, multivalue fields become string lists and everything
+        else stays string, so do numbers with leading zeros. Values are never silently dropped:
+
+        - iter_record_batches streams one batch of rows at a time, typed from the first batch unless a schema is
+          given. Fields first appearing in a later batch are appended to the schema, so later batches may carry a
+          wider schema, combine them with pyarrow.concat_tables(tables, promote_options="default"). A later value
+          the schema cannot hold raises a RuntimeError;
+        - write_parquet and write_arrow type the columns from all rows, holding the rows as Arrow string columns
+          until the last one arrived.
+
+        Fields missing from a given schema are dropped.
+
+        :param batch_size: number of rows per record batch
+        :param schema: optional pyarrow.Schema used instead of the inferred one
+        """
+        self.batch_size = batch_size
+        self.schema = schema
+        self.fixed_schema = schema is not None
+
+    def iter_record_batches(self, rows: Iterable[dict[str, Any]]) -> Iterator[Any]:
+        """Convert rows to a stream of pyarrow.RecordBatch, typed from the first batch unless a schema is given.
+
+        Fields first appearing in a later batch are appended to the inferred schema, typed from that batch.
+
+        :param rows: Iterable[dict[str, Any]]
+        :return: Iterator[pyarrow.RecordBatch]
+        """
+        pa = import_pyarrow()
+        for batch_rows in self.iter_row_batches(rows):
+            if self.schema is None:
+                self.schema = self.infer_schema(batch_rows)
+            elif not self.fixed_schema:
+                for name in self.get_field_names(batch_rows):
+                    if self.schema.get_field_index(name) < 0:
+                        data_type = self.infer_type([row.get(name) for row in batch_rows])
+                        self.schema = self.schema.append(
+                            pa.field(name, pa.string() if pa.types.is_null(data_type) else data_type))
+            columns = []
+            for field in self.schema:
+                try:
+                    columns.append(self.build_column([row.get(field.name) for row in batch_rows], field.type))
+                except ValueError as e:
+                    raise RuntimeError(f"Field {field.name} does not fit the schema: {e}, pass a schema or write the "
+                                       f"rows to an Arrow or Parquet file")
+            yield pa.RecordBatch.from_arrays(columns, schema=self.schema)
+
+    def iter_all_rows_record_batches(self, rows: Iterable[dict[str, Any]]) -> Iterator[Any]:
+        """Convert rows to pyarrow.RecordBatch typed from all rows, yielded once the last row arrived.
+
+        Without a given schema the rows are held as Arrow string columns, far smaller than the row dicts. Types of a
+        field found in different batches are widened: integers to floats, multivalue fields to string lists and
+        any other mix to strings.
+
+        :param rows: Iterable[dict[str, Any]]
+        :return: Iterator[pyarrow.RecordBatch]
+        """
+        if self.fixed_schema:
+            yield from self.iter_record_batches(rows)
+            return
+
+        pa = import_pyarrow()
+        field_types: dict[str, Any] = {}
+        raw_batches: list[tuple[int, dict[str, Any]]] = []
+        for batch_rows in self.iter_row_batches(rows):
+            raw_columns = {}
+            for name in self.get_field_names(batch_rows):
+                values = [row.get(name) for row in batch_rows]
+                field_types[name] = self.widen_type(field_types.get(name), self.infer_type(values))
+                raw_columns[name] = self.build_raw_column(values)
+            raw_batches.append((len(batch_rows), raw_columns))
+
+        self.schema = pa.schema([(name, pa.string() if pa.types.is_null(data_type) else data_type)
+                                 for name, data_type in field_types.items()])
+        # convert oldest batch first and release its string columns
+        raw_batches.reverse()
+        while len(raw_batches):
+            row_count, raw_columns = raw_batches.pop()
+            columns = [self.cast_column(raw_columns[field.name], field.type) if field.name in raw_columns
+                       else pa.nulls(row_count, type=field.type) for field in self.schema]
+            yield pa.RecordBatch.from_arrays(columns, schema=self.schema)
+
+    def iter_row_batches(self, rows: Iterable[dict[str, Any]]) -> Iterator[list[dict[str, Any]]]:
+        """Split rows into lists of batch_size rows.
+
+        :param rows: Iterable[dict[str, Any]]
+        :return: Iterator[list[dict[str, Any]]]
+        """
+        row_iterator = iter(rows)
+        while True:
+            batch_rows = list(islice(row_iterator, self.batch_size))
+            if len(batch_rows) == 0:
+                return
+            yield batch_rows
+
+    def write_parquet(self, rows: Iterable[dict[str, Any]], file_path: str) -> int:
+        """Write rows to a Parquet file, typed from all rows.
+
+        :param rows: Iterable[dict[str, Any]]
+        :param file_path: str
+        :return: int number of rows written
+        """
+        pa = import_pyarrow()
+        import pyarrow.parquet as pq  # type: ignore
+
+        row_count = 0
+        writer = None
+        try:
+            for batch in self.iter_all_rows_record_batches(rows):
+                if writer is None:
+                    writer = pq.ParquetWriter(file_path, batch.schema)
+                writer.write_batch(batch)
+                row_count += batch.num_rows
+        finally:
+            if writer is not None:
+                writer.close()
+        if writer is None:
+            # no rows, still leave a valid file behind
+            pq.write_table(pa.table({}), file_path)
+        return row_count
+
+    def write_arrow(self, rows: Iterable[dict[str, Any]], file_path: str) -> int:
+        """Write rows to an Arrow IPC stream file, typed from all rows.
+
+        :param rows: Iterable[dict[str, Any]]
+        :param file_path: str
+        :return: int number of rows written
+        """
+        pa = import_pyarrow()
+        row_count = 0
+        writer = None
+        with open(file_path, "wb") as out_file:
+            try:
+                for batch in self.iter_all_rows_record_batches(rows):
+                    if writer is None:
+                        writer = pa.ipc.new_stream(out_file, batch.schema)
+                    writer.write_batch(batch)
+                    row_count += batch.num_rows
+                if writer is None:
+                    writer = pa.ipc.new_stream(out_file, self.schema or pa.schema([]))
+            finally:
+                if writer is not None:
+                    writer.close()
+        return row_count
+
+    @staticmethod
+    def get_field_names(rows: list[dict[str, Any]]) -> list[str]:
+        """Field names of rows in their first appearance order.
+
+        :param rows: list[dict[str, Any]]
+        :return: list[str]
+        """
+        field_names: dict[str, None] = {}
+        for row in rows:
+            field_names.update(dict.fromkeys(row))
+        return list(field_names)
+
+    def infer_schema(self, rows: list[dict[str, Any]]) -> Any:
+        """Infer a pyarrow.Schema from result rows, fields keep their first appearance order.
+
+        :param rows: list[dict[str, Any]]
+        :return: pyarrow.Schema
+        """
+        pa = import_pyarrow()
+        fields = []
+        for name in self.get_field_names(rows):
+            data_type = self.infer_type([row.get(name) for row in rows])
+            fields.append((name, pa.string() if pa.types.is_null(data_type) else data_type))
+        return pa.schema(fields)
+
+    @staticmethod
+    def infer_type(values: list[Any]) -> Any:
+        """Infer the pyarrow.DataType of a column from its values, null when all values are empty.
+
+        :param values: list[Any]
+        :return: pyarrow.DataType
+        """
+        pa = import_pyarrow()
+        present = [value for value in values if value is not None and value != ""]
+        if any(isinstance(value, list) for value in present):
+            return pa.list_(pa.string())
+        if len(present) == 0:
+            return pa.null()
+        strings = [str(value) for value in present]
+        if all(INT_PATTERN.fullmatch(value) for value in strings):
+            return pa.int64()
+        if all(FLOAT_PATTERN.fullmatch(value) for value in strings):
+            return pa.float64()
+        if all(TIME_PATTERN.match(value) for value in strings) and all(map(is_iso_time, strings)):
+            return pa.timestamp("us", tz="UTC")
+        return pa.string()
+
+    @staticmethod
+    def widen_type(first: Any, second: Any) -> Any:
+        """Narrowest pyarrow.DataType holding the values of both types.
+
+        :param first: pyarrow.DataType or None
+        :param second: pyarrow.DataType
+        :return: pyarrow.DataType
+        """
+        pa = import_pyarrow()
+        if first is None or pa.types.is_null(first):
+            return second
+        if pa.types.is_null(second) or first == second:
+            return first
+        if pa.types.is_list(first) or pa.types.is_list(second):
+            return pa.list_(pa.string())
+        if {first, second} == {pa.int64(), pa.float64()}:
+            return pa.float64()
+        return pa.string()
+
+    @staticmethod
+    def build_raw_column(values: list[Any]) -> Any:
+        """Build a pyarrow.Array of the values as they are, string list for multivalue fields and string otherwise.
+
+        :param values: list[Any]
+        :return: pyarrow.Array
+        """
+        pa = import_pyarrow()
+        if any(isinstance(value, list) for value in values):
+            return pa.array([value if isinstance(value, list) or value is None else [str(value)]
+                             for value in values], type=pa.list_(pa.string()))
+        return pa.array([None if value is None else str(value) for value in values], type=pa.string())
+
+    @staticmethod
+    def build_column(values: list[Any], data_type: Any) -> Any:
+        """Build a pyarrow.Array of the data type, raises ValueError when a value cannot be converted.
+
+        :param values: list[Any]
+        :param data_type: pyarrow.DataType
+        :return: pyarrow.Array
+        """
+        return SplunkColumnarConverter.cast_column(SplunkColumnarConverter.build_raw_column(values), data_type)
+
+    @staticmethod
+    def cast_column(raw_column: Any, data_type: Any) -> Any:
+        """Convert a string or string list pyarrow.Array to the data type, raises ValueError when a value cannot be.
+
+        Multivalue fields of string columns are comma joined and empty values of typed columns become null.
+
+        :param raw_column: pyarrow.Array
+        :param data_type: pyarrow.DataType
+        :return: pyarrow.Array
+        """
+        pa = import_pyarrow()
+        import pyarrow.compute as pc  # type: ignore
+
+        if raw_column.type == data_type:
+            return raw_column
+        if pa.types.is_list(raw_column.type):
+            if not pa.types.is_string(data_type):
+                raise ValueError(f"multivalue field is not a valid {data_type}")
+            return pa.array([None if value is None else ",".join(value) for value in raw_column.to_pylist()],
+                            type=data_type)
+        if pa.types.is_list(data_type):
+            return pa.array([None if value is None else [value] for value in raw_column.to_pylist()], type=data_type)
+
+        strings = pc.if_else(pc.equal(raw_column, ""), pa.scalar(None, type=pa.string()), raw_column)
+        try:
+            # vectorized conversion, falls back to converting value by value when arrow rejects some value
+            return strings.cast(data_type)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            pass
+
+        def convert(value: str | None) -> Any:
+            if value is None:
+                return None
+            try:
+                if pa.types.is_integer(data_type):
+                    return int(value)
+                if pa.types.is_floating(data_type):
+                    return float(value)
+                return datetime.fromisoformat(value)
+            except ValueError:
+                raise ValueError(f"{value!r} is not a valid {data_type}")
+
+        return pa.array([convert(value) for value in strings.to_pylist()], type=data_type)
+
+
+def is_iso_time(value: str) -> bool:
+    """Check whether value is an ISO 8601 time.
+
+    :param value: str
+    :return: bool
+    """
+    try:
+        datetime.fromisoformat(value)
+    except ValueError:
+        return False
+    return True
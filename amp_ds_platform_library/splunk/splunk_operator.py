@@ -1,39 +1,83 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+import csv
+import json
 import os
-from time import sleep
-from typing import Any
+import re
+import tempfile
+from time import monotonic, sleep, time
+from typing import Any, Iterable, Iterator
 
+from amp_ds_platform_library.models.splunk.splunk_search import SplunkExecMode, SplunkInstance, SplunkOutputFormat, \
+    SplunkSearchResult
+from amp_ds_platform_library.splunk.splunk_columnar import SplunkColumnarConverter
+from amp_ds_platform_library.splunk.splunk_result_cache import SplunkResultCache
+from amp_ds_platform_library.splunk.splunk_service_cache import splunk_service_cache, SplunkServiceCache
 import splunklib.client as client  # type: ignore
 import splunklib.results as results  # type: ignore
 
+RELATIVE_TIME_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+# default maxresultrows of limits.conf, results requests never return more rows
+SPLUNK_MAX_RESULT_ROWS = 50000
+
 
 class SplunkOperator:
     SPLUNK_PIE_INDEX_NAME = 'datainfra'
     SPLUNK_ITUNES_INDEX_NAME = 'amp_ds_spark_jobs'
+    SPLUNK_PIE_HOST = 'splunk.pie.apple.com'
+    SPLUNK_ITUNES_HOST = 'splunk.itunes.apple.com'
+    SPLUNK_PORT = 8089
+
+    def __init__(self, poll_interval: float = 0.2, max_poll_interval: float = 5.0, search_timeout: float | None = None,
+                 exec_mode: SplunkExecMode = SplunkExecMode.normal, page_size: int = 10000,
+                 service_cache: SplunkServiceCache | None = splunk_service_cache,
+                 result_cache: SplunkResultCache | None = None):
+        """Constructor for SplunkOperator.
+
+        :param poll_interval: first delay in seconds between job status checks, doubled after every check
+        :param max_poll_interval: maximum delay in seconds between job status checks
+        :param search_timeout: seconds after which a search job is cancelled, no timeout when None
+        :param exec_mode: normal polls the search job, blocking and oneshot let Splunk return once the search
+            is done, which suits small searches
+        :param page_size: number of rows fetched per results request when results are paged
+        :param service_cache: cache sharing connected services within the process, None connects on every search
+        :param result_cache: optional cache of search result rows, reused for identical searches
+        """
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.search_timeout = search_timeout
+        self.exec_mode = exec_mode
+        self.page_size = page_size
+        self.service_cache = service_cache
+        self.result_cache = result_cache
 
     def get_pie_splunk_service(self) -> client.Service:
         """Instantiates the Splunk client service.
 
         :return: client.Service
         """
-        service = client.connect(
-            host='splunk.pie.apple.com',
-            port=8089,
-            token=os.getenv('AMP_DSA_SA_SPLUNK_JWT_TOKEN'),
-            retries=5,
-            retryDelay=5
-        )
-        assert isinstance(service, client.Service)
-        return service
+        return self.connect_splunk_service(self.SPLUNK_PIE_HOST, os.getenv('AMP_DSA_SA_SPLUNK_JWT_TOKEN'))
 
     def get_itunes_splunk_service(self) -> client.Service:
         """Instantiates the itunes Splunk client service.
 
         :return: client.Service
         """
+        return self.connect_splunk_service(self.SPLUNK_ITUNES_HOST, os.getenv('AMP_DSA_SA_SPLUNK_JWT_TOKEN_ITUNES'))
+
+    def connect_splunk_service(self, host: str, token: str | None) -> client.Service:
+        """Returns a cached client service of the host or connects a new one.
+
+        :param host: str
+        :param token: str | None
+        :return: client.Service
+        """
+        if self.service_cache is not None:
+            return self.service_cache.get(host=host, port=self.SPLUNK_PORT, token=token, retries=5, retryDelay=5)
+
         service = client.connect(
-            host='splunk.itunes.apple.com',
-            port=8089,
-            token=os.getenv('AMP_DSA_SA_SPLUNK_JWT_TOKEN_ITUNES'),
+            host=host,
+            port=self.SPLUNK_PORT,
+            token=token,
             retries=5,
             retryDelay=5
         )
@@ -41,50 +85,469 @@ class SplunkOperator:
         return service
 
     def run_search(
-            self, service: client.Service, search_query: str, search_params: dict[Any, Any]
+            self, service: client.Service, search_query: str, search_params: dict[Any, Any],
+            exec_mode: SplunkExecMode | None = None
     ) -> results.JSONResultsReader:
         """Runs Splunk Search using query and additional params.
 
         :param service: client.Service
         :param search_query: str
         :param search_params: dict[Any,Any]
+        :param exec_mode: SplunkExecMode, defaults to the operator exec mode
         :return: results.JSONResultsReader
         """
-        job = service.jobs.create(search_query, **search_params)
+        exec_mode = exec_mode or self.exec_mode
+        if exec_mode == SplunkExecMode.oneshot:
+            # search params of the caller take precedence over the defaults
+            return results.JSONResultsReader(service.jobs.oneshot(search_query, **{"output_mode": "json", "count": 0,
+                                                                                   **search_params}))
 
-        while not job.is_ready():
-            print("waiting for job to be ready")
-            sleep(5)
+        job = self.create_search_job(service, search_query, search_params, exec_mode=exec_mode)
+        return results.JSONResultsReader(job.results(output_mode='json', count=0))
 
-        while not job.is_done():
-            print("waiting for job to be done")
-            sleep(5)
+    def create_search_job(
+            self, service: client.Service, search_query: str, search_params: dict[Any, Any],
+            exec_mode: SplunkExecMode | None = None
+    ) -> client.Job:
+        """Creates Splunk search job and waits until it is done.
 
-        return results.JSONResultsReader(job.results(output_mode='json', count=0))
+        :param service: client.Service
+        :param search_query: str
+        :param search_params: dict[Any,Any]
+        :param exec_mode: SplunkExecMode, oneshot searches have no job and are run as blocking
+        :return: client.Job
+        """
+        if (exec_mode or self.exec_mode) == SplunkExecMode.normal:
+            job = service.jobs.create(search_query, **search_params)
+            self.wait_for_job(job)
+        else:
+            job = service.jobs.create(search_query, **{"exec_mode": "blocking", **search_params})
+        return job
+
+    def iter_search_results(
+            self, service: client.Service, search_query: str, search_params: dict[Any, Any],
+            page_size: int | None = None, exec_mode: SplunkExecMode | None = None
+    ) -> Iterator[dict[str, Any]]:
+        """Runs Splunk Search and lazily yields result rows page by page.
+
+        Only one page of results is held in memory at a time. Pages are requested until the result count of the
+        job is reached, so a server-side result row limit below the page size only means more requests. Without a
+        result count paging stops at the first short page and the page size is capped at SPLUNK_MAX_RESULT_ROWS.
+        Oneshot searches cannot be paged and are returned at once.
+
+        :param service: client.Service
+        :param search_query: str
+        :param search_params: dict[Any,Any]
+        :param page_size: number of rows per results request, defaults to the operator page size
+        :param exec_mode: SplunkExecMode, defaults to the operator exec mode
+        :return: Iterator[dict[str, Any]]
+        """
+        if (exec_mode or self.exec_mode) == SplunkExecMode.oneshot:
+            reader = self.run_search(service, search_query, search_params, exec_mode=SplunkExecMode.oneshot)
+            yield from (row for row in reader if isinstance(row, dict))
+            return
+
+        page_size = min(page_size or self.page_size, SPLUNK_MAX_RESULT_ROWS)
+        job = self.create_search_job(service, search_query, search_params, exec_mode=exec_mode)
+        result_count = self.get_result_count(job)
+        offset = 0
+        while True:
+            reader = results.JSONResultsReader(job.results(output_mode='json', count=page_size, offset=offset))
+            page_rows = 0
+            for row in reader:
+                if isinstance(row, dict):
+                    page_rows += 1
+                    yield row
+            offset += page_rows
+            if result_count is None:
+                if page_rows < page_size:
+                    return
+            elif offset >= result_count:
+                return
+            elif page_rows == 0:
+                raise RuntimeError(f"Splunk returned {offset} of {result_count} search results")
+
+    @staticmethod
+    def get_result_count(job: client.Job) -> int | None:
+        """Returns the number of results of a finished search job, None when the job does not report it.
+
+        :param job: client.Job
+        :return: int | None
+        """
+        try:
+            return int(job.refresh()["resultCount"])
+        except (AttributeError, KeyError, TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def write_search_results(
+            rows: Iterable[dict[str, Any]], file_path: str,
+            output_format: SplunkOutputFormat = SplunkOutputFormat.ndjson, batch_size: int = 65536
+    ) -> int:
+        """Writes result rows to a newline-delimited JSON, CSV, Arrow IPC stream or Parquet file.
+
+        JSON rows are written as they arrive. CSV columns are the fields of all rows in their first appearance order,
+        the rows are spooled to a temporary file until the last one arrived. Arrow and Parquet files are written in
+        columnar batches typed from all rows once the last row arrived and require pyarrow.
+
+        :param rows: Iterable[dict[str, Any]]
+        :param file_path: str
+        :param output_format: SplunkOutputFormat
+        :param batch_size: number of rows per Arrow or Parquet batch
+        :return: int number of rows written
+        """
+        if output_format == SplunkOutputFormat.parquet:
+            return SplunkColumnarConverter(batch_size=batch_size).write_parquet(rows, file_path)
+        if output_format == SplunkOutputFormat.arrow:
+            return SplunkColumnarConverter(batch_size=batch_size).write_arrow(rows, file_path)
+
+        if output_format == SplunkOutputFormat.csv:
+            return SplunkOperator.write_csv_results(rows, file_path)
+
+        row_count = 0
+        with open(file_path, 'w', newline='') as out_file:
+            for row in rows:
+                out_file.write(json.dumps(row) + "\n")
+                row_count += 1
+        return row_count
+
+    @staticmethod
+    def write_csv_results(rows: Iterable[dict[str, Any]], file_path: str) -> int:
+        """Writes result rows to a CSV file with the fields of all rows as columns.
+
+        Rows are spooled to a temporary newline-delimited JSON file while their fields are collected, so memory
+        stays constant.
+
+        :param rows: Iterable[dict[str, Any]]
+        :param file_path: str
+        :return: int number of rows written
+        """
+        field_names: dict[str, None] = {}
+        row_count = 0
+        with tempfile.TemporaryFile('w+') as spool_file:
+            for row in rows:
+                field_names.update(dict.fromkeys(row))
+                spool_file.write(json.dumps(row) + "\n")
+                row_count += 1
+            spool_file.seek(0)
+
+            with open(file_path, 'w', newline='') as out_file:
+                if len(field_names) == 0:
+                    return row_count
+                writer = csv.DictWriter(out_file, fieldnames=list(field_names))
+                writer.writeheader()
+                for line in spool_file:
+                    writer.writerow(json.loads(line))
+        return row_count
+
+    def wait_for_job(self, job: client.Job) -> None:
+        """Polls job until it is done, backing off exponentially up to the maximum poll interval.
+
+        :param job: client.Job
+        :return: None
+        """
+        deadline = None if self.search_timeout is None else monotonic() + self.search_timeout
+        poll_interval = self.poll_interval
+        waiting_reported = False
+
+        while not job.is_done():
+            if deadline is not None and monotonic() >= deadline:
+                job.cancel()
+                raise RuntimeError(f"Splunk search job did not finish within {self.search_timeout} seconds")
+            if not waiting_reported:
+                print("waiting for job to be done")
+                waiting_reported = True
+            sleep(poll_interval if deadline is None else max(0.0, min(poll_interval, deadline - monotonic())))
+            poll_interval = min(poll_interval * 2, self.max_poll_interval)
 
     def run_search_in_pie_and_itunes(
             self, search_query: str, search_params: dict[Any, Any], file_name: str = ""
     ) -> list[dict[str, str]]:
         """Builds search params and runs the search in Splunk for both pie and itunes.
 
+        Raises a RuntimeError naming the failed instances when the search fails in either of them, use run_searches
+        for the results of each instance.
+
         :param search_query: str
         :param search_params: dict[Any,Any]
         :param file_name: str
         :return: list[dict[str, str]]
         """
-        search_query_pie = search_query.replace('{{ index_name }}', self.SPLUNK_PIE_INDEX_NAME)
-        search_query_itunes = search_query.replace('{{ index_name }}', self.SPLUNK_ITUNES_INDEX_NAME)
+        search_result_pie, search_result_itunes = self.run_searches([(search_query, search_params)],
+                                                                    max_concurrency=2)
 
-        pie_reader = self.run_search(self.get_pie_splunk_service(), search_query_pie, search_params)
-        search_results_pie = list([row for row in pie_reader if isinstance(row, dict)])
-        itunes_reader = self.run_search(self.get_itunes_splunk_service(), search_query_itunes, search_params)
-        search_results_itunes = list([row for row in itunes_reader if isinstance(row, dict)])
+        failed_results = [search_result for search_result in (search_result_pie, search_result_itunes)
+                          if search_result.error is not None]
+        if len(failed_results):
+            raise RuntimeError("Splunk search failed in " + "; ".join(
+                f"splunk.{search_result.instance.value}: {search_result.error}" for search_result in failed_results))
 
         if len(file_name) > 0:
-            print(f"received {len(search_results_pie)} rows from splunk.pie for search query in {file_name}")
-            print(f"received {len(search_results_itunes)} rows from splunk.itunes for search query in {file_name}")
+            for search_result in (search_result_pie, search_result_itunes):
+                print(f"received {len(search_result.rows)} rows from splunk.{search_result.instance.value} "
+                      f"for search query in {file_name}")
+
+        return search_result_pie.rows + search_result_itunes.rows
+
+    def run_instance_search(
+            self, instance: SplunkInstance, search_query: str, search_params: dict[Any, Any]
+    ) -> SplunkSearchResult:
+        """Runs the search in one Splunk instance, failures are returned instead of raised.
+
+        :param instance: SplunkInstance
+        :param search_query: str
+        :param search_params: dict[Any,Any]
+        :return: SplunkSearchResult
+        """
+        instance_query = self.render_search_query(instance, search_query)
+        try:
+            rows = self.search_instance_rows(instance, search_query, search_params)
+        except Exception as e:
+            return SplunkSearchResult(instance=instance, search_query=instance_query, error=str(e))
+
+        # rows come straight from splunk, skip validating every row
+        return SplunkSearchResult.model_construct(instance=instance, search_query=instance_query, rows=rows,
+                                                  error=None)
 
-        return search_results_pie + search_results_itunes
+    def search_instance_rows(
+            self, instance: SplunkInstance, search_query: str, search_params: dict[Any, Any]
+    ) -> list[dict[str, Any]]:
+        """Runs the search in one Splunk instance and returns all rows, served from the result cache when set.
+
+        :param instance: SplunkInstance
+        :param search_query: str
+        :param search_params: dict[Any,Any]
+        :return: list[dict[str, Any]]
+        """
+        if self.result_cache is None:
+            return list(self.iter_instance_search(instance, search_query, search_params))
+
+        cache_key = self.result_cache.key(self.render_search_query(instance, search_query),
+                                          self.get_index_name(instance), search_params)
+        rows = self.result_cache.get(cache_key)
+        if rows is None:
+            rows = list(self.iter_instance_search(instance, search_query, search_params))
+            self.result_cache.put(cache_key, rows, search_params)
+        return rows
+
+    def get_index_name(self, instance: SplunkInstance) -> str:
+        """Returns the index name of the Splunk instance.
+
+        :param instance: SplunkInstance
+        :return: str
+        """
+        if instance == SplunkInstance.pie:
+            return self.SPLUNK_PIE_INDEX_NAME
+        return self.SPLUNK_ITUNES_INDEX_NAME
+
+    def render_search_query(self, instance: SplunkInstance, search_query: str) -> str:
+        """Substitutes the index name of the Splunk instance in the search query.
+
+        :param instance: SplunkInstance
+        :param search_query: str
+        :return: str
+        """
+        return search_query.replace('{{ index_name }}', self.get_index_name(instance))
+
+    def get_splunk_service(self, instance: SplunkInstance) -> client.Service:
+        """Instantiates the client service of the Splunk instance.
+
+        :param instance: SplunkInstance
+        :return: client.Service
+        """
+        if instance == SplunkInstance.pie:
+            return self.get_pie_splunk_service()
+        return self.get_itunes_splunk_service()
+
+    def iter_instance_search(
+            self, instance: SplunkInstance, search_query: str, search_params: dict[Any, Any],
+            page_size: int | None = None
+    ) -> Iterator[dict[str, Any]]:
+        """Runs the search in one Splunk instance and lazily yields result rows page by page.
+
+        :param instance: SplunkInstance
+        :param search_query: str
+        :param search_params: dict[Any,Any]
+        :param page_size: number of rows per results request, defaults to the operator page size
+        :return: Iterator[dict[str, Any]]
+        """
+        instance_query = self.render_search_query(instance, search_query)
+        rows_yielded = False
+        for attempt in range(2):
+            service = self.get_splunk_service(instance)
+            try:
+                for row in self.iter_search_results(service, instance_query, search_params, page_size=page_size):
+                    rows_yielded = True
+                    yield row
+                return
+            except Exception as e:
+                # an expired session is reconnected once, as long as no rows were handed out yet
+                if self.service_cache is None or rows_yielded or attempt > 0 \
+                        or not self.service_cache.is_session_error(e):
+                    raise
+                self.service_cache.invalidate(service)
+
+    def iter_instance_record_batches(
+            self, instance: SplunkInstance, search_query: str, search_params: dict[Any, Any],
+            batch_size: int = 65536, schema: Any = None, page_size: int | None = None
+    ) -> Iterator[Any]:
+        """Runs the search in one Splunk instance and lazily yields typed pyarrow.RecordBatch, requires pyarrow.
+
+        Columns are typed from the first batch, fields first appearing later are appended to the schema of the
+        following batches. A later value the types cannot hold raises a RuntimeError, pass a schema for searches
+        with mixed values, see SplunkColumnarConverter.
+
+        :param instance: SplunkInstance
+        :param search_query: str
+        :param search_params: dict[Any,Any]
+        :param batch_size: number of rows per record batch
+        :param schema: optional pyarrow.Schema used instead of the inferred one
+        :param page_size: number of rows per results request, defaults to the operator page size
+        :return: Iterator[pyarrow.RecordBatch]
+        """
+        converter = SplunkColumnarConverter(batch_size=batch_size, schema=schema)
+        return converter.iter_record_batches(
+            self.iter_instance_search(instance, search_query, search_params, page_size=page_size)
+        )
+
+    def write_instance_search(
+            self, instance: SplunkInstance, search_query: str, search_params: dict[Any, Any], file_path: str,
+            output_format: SplunkOutputFormat = SplunkOutputFormat.ndjson, page_size: int | None = None
+    ) -> int:
+        """Runs the search in one Splunk instance and streams the rows to a file with constant memory.
+
+        :param instance: SplunkInstance
+        :param search_query: str
+        :param search_params: dict[Any,Any]
+        :param file_path: str
+        :param output_format: SplunkOutputFormat
+        :param page_size: number of rows per results request, defaults to the operator page size
+        :return: int number of rows written
+        """
+        return self.write_search_results(
+            self.iter_instance_search(instance, search_query, search_params, page_size=page_size),
+            file_path, output_format=output_format
+        )
+
+    def iter_time_sliced_search(
+            self, instance: SplunkInstance, search_query: str, search_params: dict[Any, Any], slices: int = 8,
+            max_concurrency: int = 4, slice_retries: int = 2, newest_first: bool = True
+    ) -> Iterator[dict[str, Any]]:
+        """Splits the earliest_time/latest_time range into slices searched as concurrent jobs.
+
+        Rows are yielded slice by slice in time order as soon as a slice and all slices before it are done, rows
+        within a slice keep the Splunk order. A failed slice is retried on its own. Slicing suits event searches,
+        aggregating searches (stats, top, ...) return one aggregate per slice.
+
+        :param instance: SplunkInstance
+        :param search_query: str
+        :param search_params: dict[Any,Any], earliest_time is required
+        :param slices: number of time slices
+        :param max_concurrency: maximum number of slice searches running at once
+        :param slice_retries: retries of a failed slice
+        :param newest_first: yield the newest slice first like Splunk returns events, else the oldest
+        :return: Iterator[dict[str, Any]]
+        """
+        slice_params = self.time_slices(search_params, slices)
+        if newest_first:
+            slice_params.reverse()
+
+        executor = ThreadPoolExecutor(max_workers=max_concurrency)
+        try:
+            futures: list[Future[list[dict[str, Any]]]] = [
+                executor.submit(self.search_time_slice, instance, search_query, params, slice_retries)
+                for params in slice_params
+            ]
+            for future in futures:
+                yield from future.result()
+        finally:
+            # stop pending slices when the caller stops iterating or a slice failed for good
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def search_time_slice(
+            self, instance: SplunkInstance, search_query: str, search_params: dict[Any, Any], slice_retries: int
+    ) -> list[dict[str, Any]]:
+        """Runs the search of one time slice, retrying it when it fails.
+
+        :param instance: SplunkInstance
+        :param search_query: str
+        :param search_params: dict[Any,Any]
+        :param slice_retries: retries of a failed slice
+        :return: list[dict[str, Any]]
+        """
+        for attempt in range(slice_retries + 1):
+            try:
+                return self.search_instance_rows(instance, search_query, search_params)
+            except Exception as e:
+                if attempt == slice_retries:
+                    raise RuntimeError(f"Splunk search of time slice {search_params.get('earliest_time')} - "
+                                       f"{search_params.get('latest_time')} failed: {e}")
+                print(f"retrying time slice {search_params.get('earliest_time')} - "
+                      f"{search_params.get('latest_time')} after error: {e}")
+                sleep(min(self.poll_interval * (2 ** attempt), self.max_poll_interval))
+        return []
+
+    @staticmethod
+    def time_slices(search_params: dict[Any, Any], slices: int) -> list[dict[Any, Any]]:
+        """Splits the earliest_time/latest_time range of search params into consecutive slices.
+
+        Slice bounds are epoch seconds, earliest is inclusive and latest exclusive in Splunk, so slices do not
+        overlap. Besides absolute times, now and simple relative times like -30d are supported, snapped relative
+        times like -1d@d are not.
+
+        :param search_params: dict[Any,Any]
+        :param slices: number of time slices
+        :return: list[dict[Any, Any]] search params of every slice, oldest first
+        """
+        now = time()
+        earliest = SplunkOperator.resolve_time(search_params.get("earliest_time"), now)
+        latest = SplunkOperator.resolve_time(search_params.get("latest_time", "now"), now)
+        if earliest is None or latest is None:
+            raise RuntimeError("Splunk time slicing requires absolute or simple relative earliest_time and "
+                               f"latest_time, got {search_params.get('earliest_time')} - "
+                               f"{search_params.get('latest_time')}")
+        if latest <= earliest:
+            raise RuntimeError(f"Splunk search latest_time {latest} is not after earliest_time {earliest}")
+
+        slices = max(1, slices)
+        bounds = [earliest + (latest - earliest) * i / slices for i in range(slices)] + [latest]
+        return [dict(search_params, earliest_time=f"{bounds[i]:.3f}", latest_time=f"{bounds[i + 1]:.3f}")
+                for i in range(slices)]
+
+    @staticmethod
+    def resolve_time(value: Any, now: float) -> float | None:
+        """Resolves a Splunk time to epoch seconds, None when it cannot be resolved.
+
+        :param value: absolute time, now or relative time like -24h
+        :param now: epoch seconds relative times are resolved against
+        :return: float | None
+        """
+        if value is None:
+            return None
+        if str(value).strip() == "now":
+            return now
+        match = re.fullmatch(r"-(\d+)([smhdw])", str(value).strip())
+        if match is not None:
+            return now - int(match.group(1)) * RELATIVE_TIME_UNITS[match.group(2)]
+        return SplunkResultCache.parse_time(value)
+
+    def run_searches(
+            self, searches: Iterable[tuple[str, dict[Any, Any]]],
+            instances: Iterable[SplunkInstance] = (SplunkInstance.pie, SplunkInstance.itunes),
+            max_concurrency: int = 4
+    ) -> list[SplunkSearchResult]:
+        """Runs every search in every instance concurrently.
+
+        :param searches: Iterable[tuple[str, dict[Any,Any]]] search queries and their params
+        :param instances: Iterable[SplunkInstance]
+        :param max_concurrency: maximum number of Splunk searches running at once
+        :return: list[SplunkSearchResult] ordered by search, then by instance
+        """
+        instances = list(instances)
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            futures = [executor.submit(self.run_instance_search, instance, search_query, search_params)
+                       for search_query, search_params in searches for instance in instances]
+            return [future.result() for future in futures]
 
     def run_search_in_itunes(self, search_query: str, search_params: dict[Any, Any],
                              file_name: str = "") -> list[dict[str, str]]:
@@ -95,10 +558,7 @@ class SplunkOperator:
         :param file_name: str
         :return: list[dict[str, str]]
         """
-        search_query_itunes = search_query.replace('{{ index_name }}', self.SPLUNK_ITUNES_INDEX_NAME)
-
-        itunes_reader = self.run_search(self.get_itunes_splunk_service(), search_query_itunes, search_params)
-        search_results_itunes = list([row for row in itunes_reader if isinstance(row, dict)])
+        search_results_itunes = self.search_instance_rows(SplunkInstance.itunes, search_query, search_params)
 
         if file_name is not None:
             print(f"received {len(search_results_itunes)} rows from splunk.itunes for search query in {file_name}")
@@ -114,10 +574,7 @@ class SplunkOperator:
         :param file_name: str
         :return: list[dict[str, str]]
         """
-        search_query_pie = search_query.replace('{{ index_name }}', self.SPLUNK_PIE_INDEX_NAME)
-
-        pie_reader = self.run_search(self.get_pie_splunk_service(), search_query_pie, search_params)
-        search_results_pie = list([row for row in pie_reader if isinstance(row, dict)])
+        search_results_pie = self.search_instance_rows(SplunkInstance.pie, search_query, search_params)
 
         if file_name is not None:
             print(f"received {len(search_results_pie)} rows from splunk.pie for search query in {file_name}")
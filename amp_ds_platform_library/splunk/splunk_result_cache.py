@@ -0,0 +1,152 @@
+from datetime import datetime
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any
+
+from amp_ds_platform_library.cache.lru_file_cache import LRUFileCache
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "amp-ds-platform-library", "splunk")
+# search params that change how a search is run but not its results
+IGNORED_SEARCH_PARAMS = frozenset({"exec_mode", "output_mode", "count", "offset"})
+SPLUNK_TIME_FORMAT = "%m/%d/%Y:%H:%M:%S"
+
+
+class SplunkResultCache:
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, ttl: float = 300.0,
+                 max_memory_bytes: int = 64 * 1024 * 1024, max_disk_bytes: int = 512 * 1024 * 1024):
+        """Constructor for SplunkResultCache.
+
+        Cache of Splunk search result rows, kept in memory and gzip compressed on disk. Searches over a closed,
+        absolute time window are cached indefinitely, searches over relative windows (e.g. earliest_time=-24h)
+        expire after the TTL. The least recently used entries are evicted above the size limits.
+
+        :param cache_dir: directory of the on-disk cache, the cache is only kept in memory when empty
+        :param ttl: seconds results of relative time windows are served from the cache
+        :param max_memory_bytes: maximum size of the in-memory rows, measured as serialized JSON
+        :param max_disk_bytes: maximum size of the compressed on-disk entries
+        """
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.hits = 0
+        self.misses = 0
+        self._store = LRUFileCache(cache_dir, max_memory_size=max_memory_bytes, max_disk_size=max_disk_bytes,
+                                   sized=True, compress=True)
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def key(search_query: str, index_name: str, search_params: dict[Any, Any]) -> str:
+        """Cache key of a rendered search query, its index and normalized search params.
+
+        :param search_query: search query with the index name substituted
+        :param index_name: Splunk index name
+        :param search_params: search params
+        :return: str
+        """
+        raw_key = json.dumps([search_query.strip(), index_name, SplunkResultCache.normalize_params(search_params)])
+        return hashlib.sha256(raw_key.encode()).hexdigest()
+
+    @staticmethod
+    def normalize_params(search_params: dict[Any, Any]) -> list[tuple[str, str]]:
+        """Normalize search params, sorted with string values and without params not affecting the results.
+
+        :param search_params: search params
+        :return: list[tuple[str, str]]
+        """
+        return sorted((str(name), str(value).strip()) for name, value in search_params.items()
+                      if value is not None and str(name) not in IGNORED_SEARCH_PARAMS)
+
+    @staticmethod
+    def parse_time(value: Any) -> float | None:
+        """Parse an absolute Splunk time, returns None for relative times like -24h, @d or now.
+
+        :param value: epoch seconds, ISO 8601 or %m/%d/%Y:%H:%M:%S time
+        :return: float | None epoch seconds
+        """
+        if isinstance(value, (int, float)):
+            return float(value)
+        value = str(value).strip()
+        try:
+            return float(value)
+        except ValueError:
+            pass
+        for parse in (datetime.fromisoformat, lambda v: datetime.strptime(v, SPLUNK_TIME_FORMAT)):
+            try:
+                return parse(value).timestamp()
+            except ValueError:
+                continue
+        return None
+
+    def expires_at(self, search_params: dict[Any, Any]) -> float | None:
+        """Expiry time of search results, None when the time window is closed and results never change.
+
+        :param search_params: search params
+        :return: float | None
+        """
+        earliest_time = search_params.get("earliest_time")
+        latest_time = search_params.get("latest_time")
+        now = time.time()
+        if earliest_time is not None and latest_time is not None and self.parse_time(earliest_time) is not None:
+            latest = self.parse_time(latest_time)
+            if latest is not None and latest <= now:
+                return None
+        return now + self.ttl
+
+    def get(self, key: str) -> list[dict[str, Any]] | None:
+        """Return a copy of the cached rows and count the hit or miss, callers may modify the rows.
+
+        :param key: cache key
+        :return: list[dict[str, Any]] | None
+        """
+        with self._lock:
+            entry = self._store.get(key)
+            if entry is None or not self._is_valid(entry):
+                if entry is not None:
+                    self._store.remove(key)
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._store.touch(key)
+            rows: list[dict[str, Any]] = entry["rows"]
+            return rows
+
+    def put(self, key: str, rows: list[dict[str, Any]], search_params: dict[Any, Any]) -> None:
+        """Store search result rows.
+
+        :param key: cache key
+        :param rows: search result rows
+        :param search_params: search params, their time window decides the expiry
+        :return: None
+        """
+        entry = {"stored_at": time.time(), "expires_at": self.expires_at(search_params), "rows": rows}
+        with self._lock:
+            self._store.put(key, entry)
+
+    def clear(self) -> None:
+        """Drop all entries.
+
+        :return: None
+        """
+        with self._lock:
+            self._store.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """Cache hit and miss counters.
+
+        :return: dict[str, Any]
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / lookups if lookups else 0.0,
+                    "entries": len(self._store), "memory_bytes": self._store.memory_size}
+
+    @staticmethod
+    def _is_valid(entry: dict[str, Any]) -> bool:
+        """Check whether entry has not expired."""
+        return entry["expires_at"] is None or time.time() < float(entry["expires_at"])
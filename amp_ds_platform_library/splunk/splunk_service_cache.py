@@ -0,0 +1,124 @@
+import hashlib
+import threading
+from time import monotonic
+from typing import Any
+
+import splunklib.binding as binding  # type: ignore
+import splunklib.client as client  # type: ignore
+
+
+class SplunkServiceCache:
+
+    def __init__(self, health_check_interval: float = 300.0):
+        """Constructor for SplunkServiceCache.
+
+        Thread-safe cache of connected Splunk services keyed by host, port and token. A cached service is health
+        checked when it has not been verified for health_check_interval seconds and reconnected when the check
+        fails, e.g. because the session expired.
+
+        :param health_check_interval: seconds between health checks of a cached service
+        """
+        self.health_check_interval = health_check_interval
+        self.connects = 0
+        self.reuses = 0
+        self.reconnects = 0
+        self._services: dict[tuple[str, int, str], tuple[client.Service, float]] = {}
+        self._key_locks: dict[tuple[str, int, str], threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(host: str, port: int, token: str | None) -> tuple[str, int, str]:
+        """Cache key of a service, the token is only kept as a hash.
+
+        :param host: Splunk host
+        :param port: Splunk management port
+        :param token: Splunk token
+        :return: tuple[str, int, str]
+        """
+        return host, port, hashlib.sha256((token or "").encode()).hexdigest()
+
+    def get(self, host: str, port: int, token: str | None, **connect_kwargs: Any) -> client.Service:
+        """Return a cached service or connect a new one.
+
+        Connecting to one host does not block threads using other hosts.
+
+        :param host: Splunk host
+        :param port: Splunk management port
+        :param token: Splunk token
+        :param connect_kwargs: additional client.connect arguments
+        :return: client.Service
+        """
+        key = self.key(host, port, token)
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            cached = self._services.get(key)
+            if cached is not None:
+                service, checked_at = cached
+                if monotonic() - checked_at < self.health_check_interval:
+                    self._count("reuses")
+                    return service
+                if self.is_healthy(service):
+                    self._services[key] = (service, monotonic())
+                    self._count("reuses")
+                    return service
+                self._count("reconnects")
+
+            service = client.connect(host=host, port=port, token=token, **connect_kwargs)
+            assert isinstance(service, client.Service)
+            self._services[key] = (service, monotonic())
+            self._count("connects")
+            return service
+
+    def invalidate(self, service: client.Service) -> None:
+        """Drop a cached service, the next get of its host reconnects.
+
+        :param service: client.Service
+        :return: None
+        """
+        with self._lock:
+            for key, (cached_service, _) in list(self._services.items()):
+                if cached_service is service:
+                    del self._services[key]
+
+    @staticmethod
+    def is_healthy(service: client.Service) -> bool:
+        """Check that the service still accepts requests.
+
+        :param service: client.Service
+        :return: bool
+        """
+        try:
+            service.info
+        except Exception:
+            return False
+        return True
+
+    @staticmethod
+    def is_session_error(error: Exception) -> bool:
+        """Check whether an error is caused by an expired or invalid session.
+
+        :param error: Exception
+        :return: bool
+        """
+        return isinstance(error, binding.AuthenticationError) \
+            or (isinstance(error, binding.HTTPError) and getattr(error, "status", None) == 401)
+
+    def stats(self) -> dict[str, int]:
+        """Connect and reuse counters.
+
+        :return: dict[str, int]
+        """
+        with self._lock:
+            return {"connects": self.connects, "reuses": self.reuses, "reconnects": self.reconnects,
+                    "services": len(self._services)}
+
+    def _count(self, counter: str) -> None:
+        """Increment a counter."""
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+
+# services are shared by all operators of the process
+splunk_service_cache = SplunkServiceCache()
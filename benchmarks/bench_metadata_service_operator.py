@@ -0,0 +1,129 @@
+"""
+Benchmarks throughput of MetadataServiceOperator against AsyncMetadataServiceOperator on a local stub metadata API
+which answers every request after a fixed latency
+
+    PYTHONPATH=. python benchmarks/bench_metadata_service_operator.py --jobs 200 --latency 0.02
+"""
+import argparse
+import asyncio
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+from time import perf_counter, sleep
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+from amp_ds_platform_library.metadata.async_metadata_service_operator import AsyncMetadataServiceOperator
+from amp_ds_platform_library.metadata.metadata_service_operator import MetadataServiceOperator
+from amp_ds_platform_library.models.metadata.metadata_service import JobCreateRequest
+
+PAGE_SIZE = 20
+
+
+class StubMetadataHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # headers and body are written separately, with nagle every keep-alive response waits for a delayed ack
+    disable_nagle_algorithm = True
+    base_url = ""
+    latency = 0.0
+    jobs: list[dict[str, Any]] = []
+
+    def log_message(self, *args: Any) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        query = {name: values[0] for name, values in parse_qs(urlsplit(self.path).query).items()}
+        page = int(query.get("page", 1))
+        start = (page - 1) * PAGE_SIZE
+        self.respond({
+            "count": len(self.jobs),
+            "next": f"{self.base_url}v2/jobs/?page={page + 1}&page_size={PAGE_SIZE}"
+            if start + PAGE_SIZE < len(self.jobs) else None,
+            "results": self.jobs[start:start + PAGE_SIZE]
+        })
+
+    def do_POST(self) -> None:
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.respond(dict(body, id=int(body["adp_job_id"])))
+
+    def respond(self, data: Any) -> None:
+        sleep(self.latency)
+        body = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def job_create_request(index: int) -> JobCreateRequest:
+    """
+    Returns create request of a benchmark job
+    :param index: int
+    :return: JobCreateRequest
+    """
+    return JobCreateRequest(name=f"job-{index}", adp_job_id=str(index), adp_project_id="project", biz_crit_score=1,
+                            env="prod", dri=1, team=1, lob=1, service_account=1)
+
+
+async def run_async(base_url: str, requests: list[JobCreateRequest], concurrency: int) -> tuple[float, float]:
+    """
+    Returns seconds of the async bulk create and of listing all jobs
+    :param base_url: str
+    :param requests: list[JobCreateRequest]
+    :param concurrency: int
+    :return: tuple[float, float]
+    """
+    async with AsyncMetadataServiceOperator("token", concurrency=concurrency) as operator:
+        operator.operator.base_url = base_url
+        started_at = perf_counter()
+        await operator.create_jobs_bulk(requests)
+        create_seconds = perf_counter() - started_at
+        started_at = perf_counter()
+        await operator.get_jobs(page_size=PAGE_SIZE)
+        return create_seconds, perf_counter() - started_at
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=200, help="jobs created and listed")
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds the stub takes per request")
+    parser.add_argument("--concurrency", type=int, default=20, help="concurrent requests of the async operator")
+    args = parser.parse_args()
+
+    requests = [job_create_request(index) for index in range(args.jobs)]
+    StubMetadataHandler.latency = args.latency
+    StubMetadataHandler.jobs = [dict(request.model_dump(), id=index) for index, request in enumerate(requests)]
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubMetadataHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/metadata/api/"
+    StubMetadataHandler.base_url = base_url
+
+    try:
+        with MetadataServiceOperator("token") as operator:
+            operator.base_url = base_url
+            started_at = perf_counter()
+            for request in requests:
+                operator.create_job(request)
+            sync_create_seconds = perf_counter() - started_at
+            started_at = perf_counter()
+            list(operator.iter_jobs(page_size=PAGE_SIZE))
+            sync_list_seconds = perf_counter() - started_at
+
+        async_create_seconds, async_list_seconds = asyncio.run(run_async(base_url, requests, args.concurrency))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    pages = -(-args.jobs // PAGE_SIZE)
+    print(f"create {args.jobs} jobs, sync:  {sync_create_seconds:7.3f} s  "
+          f"{args.jobs / sync_create_seconds:8.1f} jobs/s")
+    print(f"create {args.jobs} jobs, async: {async_create_seconds:7.3f} s  "
+          f"{args.jobs / async_create_seconds:8.1f} jobs/s")
+    print(f"list {pages} pages, sync:       {sync_list_seconds:7.3f} s")
+    print(f"list {pages} pages, async:      {async_list_seconds:7.3f} s")
+
+
+if __name__ == "__main__":
+    main()
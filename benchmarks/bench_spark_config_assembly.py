@@ -0,0 +1,92 @@
+"""
+Benchmarks per job parse and merge cost of spark.yml assembly, before and after the safe loader fast path and the
+shared default properties, and the anchors parse against the JSON anchors cache
+
+    PYTHONPATH=. python benchmarks/bench_spark_config_assembly.py --jobs 2000
+"""
+import argparse
+import os
+import tempfile
+from time import perf_counter
+from typing import Any, Callable
+
+import ruamel.yaml as yaml
+
+from amp_ds_platform_assembler.spark_config.spark_config_builder import SparkConfigGenerator
+
+ANCHORS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                            "amp_ds_platform_assembler", "spark_config", "anchors.yml")
+# typical job spark config, a handful of properties overriding the defaults
+JOB_SPARK_CONFIG = """# job properties
+uuid: 0b8c5a8e-7d1e-4c4a-9f5e-3f3c2a1b0c9d
+properties:
+  spark.executor.instances: 4
+  spark.executor.memory: 8g
+  spark.driver.memory: 4g
+  spark.sql.shuffle.partitions: 200
+  spark.pie.kubernetes.executor.request.cores: 1.50
+  spark.pie.driverEnv.JOB_OWNER: amp-ds-platform-team
+"""
+PYTHON_JOB_NAME = "jobs/team/project/job.py"
+
+
+def time_per_call(function: Callable[[], Any], calls: int) -> float:
+    """
+    Returns average milliseconds per call
+    :param function: Callable[[], Any]
+    :param calls: int
+    :return: float
+    """
+    started_at = perf_counter()
+    for _ in range(calls):
+        function()
+    return (perf_counter() - started_at) * 1000 / calls
+
+
+def baseline_job_config(raw_config: dict[str, Any], file_content: str) -> dict[str, Any]:
+    """
+    Parses and merges single job the way generate_spark_yml did before the fast path, with the round trip loader
+    and a copy of the default properties for every job
+    :param raw_config: dict[str, Any] parsed anchors file
+    :param file_content: str
+    :return: dict[str, Any]
+    """
+    raw_jobs = dict(yaml.round_trip_load(file_content))
+    job_config: dict[str, Any] = {"name": "team-job", "properties": dict(raw_config.get("anchors", [])[-1])}
+    for key, value in raw_jobs.get("properties", {}).items():
+        job_config["properties"][key] = value
+    return job_config
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=1000, help="jobs parsed and merged per measurement")
+    args = parser.parse_args()
+
+    with open(ANCHORS_PATH, 'r') as anchors_file:
+        raw_file = anchors_file.read()
+    generator = SparkConfigGenerator()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        anchors_parse_ms = time_per_call(lambda: generator.load_anchors_config(raw_file, False), 20)
+        base_properties = generator.get_base_properties(raw_file, False, cache_dir=cache_dir)
+        anchors_cached_ms = time_per_call(lambda: generator.get_base_properties(raw_file, False, cache_dir), 200)
+
+    raw_config = dict(yaml.round_trip_load(raw_file))
+    before_ms = time_per_call(lambda: baseline_job_config(raw_config, JOB_SPARK_CONFIG), args.jobs)
+    round_trip_ms = time_per_call(
+        lambda: generator.build_job_config(PYTHON_JOB_NAME, JOB_SPARK_CONFIG, base_properties), args.jobs)
+    fast_load_ms = time_per_call(
+        lambda: generator.build_job_config(PYTHON_JOB_NAME, JOB_SPARK_CONFIG, base_properties, fast_load=True),
+        args.jobs)
+
+    print(f"anchors.yml parse:                     {anchors_parse_ms:8.3f} ms")
+    print(f"anchors from JSON cache:               {anchors_cached_ms:8.3f} ms")
+    print(f"per job, before (round trip + copy):   {before_ms:8.3f} ms")
+    print(f"per job, shared properties:            {round_trip_ms:8.3f} ms")
+    print(f"per job, shared properties, fast load: {fast_load_ms:8.3f} ms")
+    print(f"speedup per job:                       {before_ms / fast_load_ms:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmarks time and peak memory of holding synthetic Splunk result rows as a list of dicts against converting them to
+Arrow record batches and writing Arrow and Parquet files, every mode runs in its own process to measure its peak RSS
+
+    PYTHONPATH=. python benchmarks/bench_splunk_columnar.py --rows 1000000
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+from time import perf_counter
+from typing import Any, Iterator
+
+import pyarrow  # type: ignore  # noqa: F401, imported in every mode so the peak RSS of all modes includes it
+
+from amp_ds_platform_library.splunk.splunk_columnar import SplunkColumnarConverter
+
+MODES = ["list of dicts", "arrow batches", "arrow file", "parquet file"]
+HOSTS = [f"host-{index:02d}.example.com" for index in range(20)]
+
+
+def iter_rows(row_count: int) -> Iterator[dict[str, Any]]:
+    """
+    Yields result rows as the Splunk JSON results reader does, every value a string and a multivalue field
+    :param row_count: int
+    :return: Iterator[dict[str, Any]]
+    """
+    for index in range(row_count):
+        yield {
+            "_time": f"2024-01-{index % 28 + 1:02d}T{index % 24:02d}:{index % 60:02d}:{index % 60:02d}.000+00:00",
+            "host": HOSTS[index % len(HOSTS)],
+            "status": str(200 + index % 5 * 100),
+            "bytes": str(index * 37 % 100000),
+            "latency": f"{index % 1000 / 7:.3f}",
+            "tags": ["web", f"zone-{index % 3}"] if index % 4 == 0 else "web",
+        }
+
+
+def run_mode(mode: str, row_count: int) -> dict[str, Any]:
+    """
+    Runs a single mode and returns its seconds, peak RSS and file size
+    :param mode: str
+    :param row_count: int
+    :return: dict[str, Any]
+    """
+    file_size = None
+    started_at = perf_counter()
+    if mode == "list of dicts":
+        rows = list(iter_rows(row_count))
+        assert len(rows) == row_count
+    elif mode == "arrow batches":
+        converted = sum(batch.num_rows for batch in SplunkColumnarConverter().iter_record_batches(iter_rows(row_count)))
+        assert converted == row_count
+    else:
+        with tempfile.TemporaryDirectory() as out_dir:
+            file_path = os.path.join(out_dir, "results")
+            converter = SplunkColumnarConverter()
+            write = converter.write_arrow if mode == "arrow file" else converter.write_parquet
+            assert write(iter_rows(row_count), file_path) == row_count
+            file_size = os.path.getsize(file_path)
+    seconds = perf_counter() - started_at
+    return {"seconds": seconds, "peak_rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+            "file_size": file_size}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000000, help="synthetic result rows")
+    parser.add_argument("--mode", choices=MODES, help="run a single mode and print its measurements as JSON")
+    args = parser.parse_args()
+
+    if args.mode is not None:
+        print(json.dumps(run_mode(args.mode, args.rows)))
+        return
+
+    print(f"{'mode':>14} {'time':>9} {'peak RSS':>12} {'file size':>12}")
+    for mode in MODES:
+        process = subprocess.run([sys.executable, __file__, "--rows", str(args.rows), "--mode", mode],
+                                 check=True, capture_output=True, text=True)
+        result = json.loads(process.stdout)
+        file_size = f"{result['file_size'] / 2 ** 20:8.1f} MiB" if result["file_size"] is not None else ""
+        print(f"{mode:>14} {result['seconds']:7.2f} s {result['peak_rss'] / 2 ** 20:8.1f} MiB {file_size:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Benchmarks latency of short Splunk searches against a local fake client.Service, comparing the fixed 5 second
+polling of the original run_search with adaptive polling and the blocking and oneshot execution modes
+
+    PYTHONPATH=. python benchmarks/bench_splunk_search_latency.py --durations 0.3 1.0
+"""
+import argparse
+from functools import partial
+import io
+import json
+from time import monotonic, perf_counter, sleep
+from typing import Any, Callable
+
+import splunklib.results as results  # type: ignore
+
+from amp_ds_platform_library.models.splunk.splunk_search import SplunkExecMode
+from amp_ds_platform_library.splunk.splunk_operator import SplunkOperator
+
+RESULT_ROWS = 100
+
+
+class FakeJob:
+    def __init__(self, service: "FakeService", duration: float) -> None:
+        self.service = service
+        self.done_at = monotonic() + duration
+
+    def is_ready(self) -> bool:
+        self.service.status_requests += 1
+        return True
+
+    def is_done(self) -> bool:
+        self.service.status_requests += 1
+        return monotonic() >= self.done_at
+
+    def cancel(self) -> None:
+        pass
+
+    def results(self, **kwargs: Any) -> io.BytesIO:
+        return fake_results()
+
+
+class FakeJobs:
+    def __init__(self, service: "FakeService") -> None:
+        self.service = service
+
+    def create(self, query: str, **params: Any) -> FakeJob:
+        job = FakeJob(self.service, self.service.duration)
+        if params.get("exec_mode") == "blocking":
+            sleep(self.service.duration)
+        return job
+
+    def oneshot(self, query: str, **params: Any) -> io.BytesIO:
+        sleep(self.service.duration)
+        return fake_results()
+
+
+class FakeService:
+    """client.Service whose searches finish after a fixed duration, counting job status requests."""
+
+    def __init__(self, duration: float) -> None:
+        self.duration = duration
+        self.status_requests = 0
+        self.jobs = FakeJobs(self)
+
+
+def fake_results() -> io.BytesIO:
+    """
+    Returns JSON results stream of a search
+    :return: io.BytesIO
+    """
+    rows = [{"_time": str(index), "value": str(index)} for index in range(RESULT_ROWS)]
+    return io.BytesIO(json.dumps({"preview": False, "results": rows}).encode())
+
+
+def baseline_run_search(service: FakeService, search_query: str, search_params: dict[Any, Any]) -> Any:
+    """
+    Runs search like run_search did before adaptive polling, checking the job every 5 seconds
+    :param service: FakeService
+    :param search_query: str
+    :param search_params: dict[Any, Any]
+    :return: results.JSONResultsReader
+    """
+    job = service.jobs.create(search_query, **search_params)
+    while not job.is_ready():
+        sleep(5)
+    while not job.is_done():
+        sleep(5)
+    return results.JSONResultsReader(job.results(output_mode='json', count=0))
+
+
+def measure(run: Callable[[FakeService], Any], duration: float) -> tuple[float, int]:
+    """
+    Returns seconds until all rows of a search of the given duration were read and the job status requests sent
+    :param run: Callable[[FakeService], Any] runs search and returns its results reader
+    :param duration: float
+    :return: tuple[float, int]
+    """
+    service = FakeService(duration)
+    started_at = perf_counter()
+    rows = [row for row in run(service) if isinstance(row, dict)]
+    elapsed = perf_counter() - started_at
+    assert len(rows) == RESULT_ROWS
+    return elapsed, service.status_requests
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--durations", type=float, nargs="+", default=[0.3, 1.0, 3.0],
+                        help="seconds the fake searches take")
+    args = parser.parse_args()
+
+    search_query = "search index=datainfra | head 100"
+    search_params = {"earliest_time": "-1h", "latest_time": "now"}
+    modes: dict[str, Callable[[FakeService], Any]] = {
+        "fixed 5 s polling": lambda service: baseline_run_search(service, search_query, search_params)
+    }
+    for exec_mode in SplunkExecMode:
+        operator = SplunkOperator(exec_mode=exec_mode, service_cache=None)
+        modes[exec_mode.value] = partial(operator.run_search, search_query=search_query, search_params=search_params)
+
+    print(f"{'search duration':>16} {'mode':>18} {'latency':>10} {'overhead':>10} {'status requests':>16}")
+    for duration in args.durations:
+        for mode, run in modes.items():
+            elapsed, status_requests = measure(run, duration)
+            print(f"{duration:>14.1f} s {mode:>18} {elapsed:>8.3f} s {elapsed - duration:>8.3f} s "
+                  f"{status_requests:>16}")
+
+
+if __name__ == "__main__":
+    main()
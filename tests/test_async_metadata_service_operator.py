@@ -0,0 +1,252 @@
+import asyncio
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+import time
+from typing import Any, Awaitable, Callable, Iterator, TypeVar
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from amp_ds_platform_library.metadata.async_metadata_service_operator import AsyncMetadataServiceOperator
+from amp_ds_platform_library.models.metadata.metadata_service import JobCreateRequest
+
+# seconds each stub request takes, long enough for concurrent requests to overlap
+REQUEST_DELAY = 0.05
+
+T = TypeVar("T")
+
+
+class StubMetadataService(ThreadingHTTPServer):
+    """Platform services metadata API on localhost, recording the requests it served."""
+
+    daemon_threads = True
+
+    def __init__(self, job_count: int, pagination: str) -> None:
+        super().__init__(("127.0.0.1", 0), StubMetadataHandler)
+        self.jobs = [job_record(job_id) for job_id in range(1, job_count + 1)]
+        self.pagination = pagination
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requests: list[str] = []
+
+    @property
+    def base_url(self) -> str:
+        """Base url of the metadata API.
+
+        :return: str
+        """
+        return f"http://127.0.0.1:{self.server_address[1]}/metadata/api/"
+
+
+class StubMetadataHandler(BaseHTTPRequestHandler):
+    server: StubMetadataService
+
+    def log_message(self, *args: Any) -> None:
+        """Keep test output quiet.
+
+        :return: None
+        """
+
+    def do_GET(self) -> None:
+        """List jobs with page number, offset or cursor pagination.
+
+        :return: None
+        """
+        url = urlsplit(self.path)
+        query = {name: values[0] for name, values in parse_qs(url.query).items()}
+        page_size = int(query.get("page_size", 100))
+        jobs = self.server.jobs
+        if self.server.pagination == "page":
+            start = (int(query.get("page", 1)) - 1) * page_size
+            next_query = f"page={int(query.get('page', 1)) + 1}&page_size={page_size}"
+        elif self.server.pagination == "offset":
+            start = int(query.get("offset", 0))
+            next_query = f"limit={page_size}&offset={start + page_size}&page_size={page_size}"
+        else:
+            start = int(query.get("cursor", 0))
+            next_query = f"cursor={start + page_size}&page_size={page_size}"
+
+        data: dict[str, Any] = {
+            "next": f"{self.server.base_url}v2/jobs/?{next_query}" if start + page_size < len(jobs) else None,
+            "results": jobs[start:start + page_size]
+        }
+        if self.server.pagination != "cursor":
+            data["count"] = len(jobs)
+        self.respond(200, data)
+
+    def do_POST(self) -> None:
+        """Create a job, names starting with "invalid" are rejected.
+
+        :return: None
+        """
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if body["name"].startswith("invalid"):
+            self.respond(400, {"name": ["invalid job name"]})
+            return
+        self.respond(201, dict(body, id=1000 + int(body["adp_job_id"])))
+
+    def respond(self, status: int, data: Any) -> None:
+        """Send JSON response after the request delay, counting concurrent requests.
+
+        :return: None
+        """
+        with self.server.lock:
+            self.server.in_flight += 1
+            self.server.max_in_flight = max(self.server.max_in_flight, self.server.in_flight)
+            self.server.requests.append(f"{self.command} {self.path}")
+        time.sleep(REQUEST_DELAY)
+        with self.server.lock:
+            self.server.in_flight -= 1
+
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def job_record(job_id: int) -> dict[str, Any]:
+    """Job as returned by the metadata API.
+
+    :return: dict[str, Any]
+    """
+    return {"id": job_id, "name": f"job-{job_id}", "adp_job_id": str(job_id), "adp_project_id": "project",
+            "biz_crit_score": 1, "env": "prod", "dri": 1, "team": 1, "lob": 1, "service_account": 1}
+
+
+def job_create_request(name: str, adp_job_id: int) -> JobCreateRequest:
+    """Job create request of a job.
+
+    :return: JobCreateRequest
+    """
+    return JobCreateRequest(name=name, adp_job_id=str(adp_job_id), adp_project_id="project", biz_crit_score=1,
+                            env="prod", dri=1, team=1, lob=1, service_account=1)
+
+
+def start_stub(job_count: int = 0, pagination: str = "page") -> StubMetadataService:
+    """Start stub metadata service in a background thread.
+
+    :return: StubMetadataService
+    """
+    server = StubMetadataService(job_count, pagination)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+@pytest.fixture
+def stub_service() -> Iterator[StubMetadataService]:
+    """Stub metadata service with 250 jobs and page number pagination.
+
+    :return: Iterator[StubMetadataService]
+    """
+    server = start_stub(job_count=250)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def run_with_operator(server: StubMetadataService, call: Callable[[AsyncMetadataServiceOperator], Awaitable[T]],
+                      concurrency: int = 10) -> T:
+    """Run a coroutine of an async operator sending requests to the stub service.
+
+    :return: T
+    """
+    async def main() -> T:
+        async with AsyncMetadataServiceOperator("token", concurrency=concurrency, max_retries=0) as operator:
+            operator.operator.base_url = server.base_url
+            return await call(operator)
+
+    return asyncio.run(main())
+
+
+def test_create_jobs_bulk_returns_results_and_errors_per_item(stub_service: StubMetadataService) -> None:
+    """Rejected jobs are reported without failing the other jobs of the batch.
+
+    :return: None
+    """
+    requests = [job_create_request("invalid-job" if index == 3 else f"new-{index}", index) for index in range(8)]
+
+    results = run_with_operator(stub_service, lambda operator: operator.create_jobs_bulk(requests))
+
+    assert [result.request for result in results] == requests
+    assert [result.job.id if result.job else None for result in results] == \
+        [1000, 1001, 1002, None, 1004, 1005, 1006, 1007]
+    assert results[3].error is not None and "400" in results[3].error
+
+
+def test_concurrency_is_bounded_by_the_semaphore(stub_service: StubMetadataService) -> None:
+    """No more than the configured number of requests are in flight.
+
+    :return: None
+    """
+    requests = [job_create_request(f"new-{index}", index) for index in range(30)]
+
+    started_at = time.monotonic()
+    results = run_with_operator(stub_service, lambda operator: operator.create_jobs_bulk(requests), concurrency=4)
+    elapsed = time.monotonic() - started_at
+
+    assert all(result.error is None for result in results)
+    assert stub_service.max_in_flight == 4
+    # one after the other the requests take 30 * REQUEST_DELAY
+    assert elapsed < 30 * REQUEST_DELAY
+
+
+def test_get_jobs_requests_remaining_pages_concurrently(stub_service: StubMetadataService) -> None:
+    """Pages after the first one are requested at once when the total count is known.
+
+    :return: None
+    """
+    jobs = run_with_operator(stub_service, lambda operator: operator.get_jobs(page_size=20))
+
+    assert [job.id for job in jobs] == list(range(1, 251))
+    assert len(stub_service.requests) == 13
+    assert stub_service.max_in_flight == 10
+
+
+@pytest.mark.parametrize("pagination", ["offset", "cursor"])
+def test_get_jobs_follows_other_paginations(pagination: str) -> None:
+    """Offset pagination is requested concurrently, cursor pagination is followed page by page.
+
+    :return: None
+    """
+    server = start_stub(job_count=95, pagination=pagination)
+    try:
+        jobs = run_with_operator(server, lambda operator: operator.get_jobs(page_size=10, fields=["id", "name"]))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert [job.id for job in jobs] == list(range(1, 96))
+    assert len(server.requests) == 10
+    assert server.max_in_flight == (9 if pagination == "offset" else 1)
+
+
+def test_closing_does_not_block_the_event_loop(stub_service: StubMetadataService) -> None:
+    """Leaving the context while a request is running waits for it without blocking other coroutines.
+
+    :return: None
+    """
+    ticks: list[float] = []
+
+    async def tick() -> None:
+        while True:
+            ticks.append(time.monotonic())
+            await asyncio.sleep(REQUEST_DELAY / 10)
+
+    async def main() -> None:
+        ticker = asyncio.create_task(tick())
+        async with AsyncMetadataServiceOperator("token", max_retries=0) as operator:
+            operator.operator.base_url = stub_service.base_url
+            request = asyncio.create_task(operator.create_job(job_create_request("new-job", 1)))
+            # the request is handed to a worker thread and is still waiting for the stub when the context exits
+            await asyncio.sleep(REQUEST_DELAY / 5)
+            ticks.clear()
+        ticker.cancel()
+        assert (await request).id == 1001
+
+    asyncio.run(main())
+
+    assert len(ticks) >= 3
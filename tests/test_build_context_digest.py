@@ -0,0 +1,156 @@
+import json
+import os
+
+import pytest
+
+from amp_ds_platform_assembler.docker.build_context_digest import BuildContextDigest, DockerignoreMatcher
+
+DOCKERFILE = """# syntax=docker/dockerfile:1
+FROM --platform=linux/amd64 python:3.11 AS build
+RUN echo "it's not a COPY
+RUN <<EOF
+COPY not-an-instruction /tmp/
+echo "unbalanced
+EOF
+
+FROM python:3.11-slim
+COPY --from=build /wheels /wheels
+COPY --chown=1000 common \\
+     jobs /mnt/app/
+COPY ["pie-config/", "/mnt/pie-config/"]
+ADD https://example.com/data.tgz /tmp/
+COPY <<EOF /etc/app.conf
+setting=1
+EOF
+copy requirements.txt /mnt/app/
+"""
+
+
+def test_only_copy_sources_of_the_build_context_are_parsed() -> None:
+    """RUN lines and heredocs are not tokenized, sources of other stages and remote sources are skipped.
+
+    :return: None
+    """
+    base_docker_image, copy_sources = BuildContextDigest.get_dockerfile_instructions(DOCKERFILE)
+
+    assert base_docker_image == "python:3.11"
+    assert copy_sources == ["common", "jobs", "pie-config/", "requirements.txt"]
+
+
+def test_unbalanced_quote_in_copy_raises() -> None:
+    """COPY instructions that cannot be parsed fail with the instruction.
+
+    :return: None
+    """
+    with pytest.raises(RuntimeError, match="COPY 'common /mnt/app/common"):
+        BuildContextDigest.get_dockerfile_instructions("FROM python:3.11\nCOPY 'common /mnt/app/common\n")
+
+
+def write_file(path: str, content: str = "") -> None:
+    """Write a file of the build context, creating its directories.
+
+    :return: None
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as out_file:
+        out_file.write(content)
+
+
+@pytest.fixture
+def context_dir(tmp_path: str) -> str:
+    """Build context copying common and jobs, test directories and files outside of them are not copied.
+
+    :return: str
+    """
+    context_dir = str(tmp_path)
+    write_file(os.path.join(context_dir, "Dockerfile"), "FROM python:3.11\nARG SENTRY_DSN\nENV SENTRY_DSN=$SENTRY_DSN\n"
+                                                        "COPY common /mnt/app/common\nCOPY jobs /mnt/app/jobs\n")
+    write_file(os.path.join(context_dir, ".dockerignore"), "**/tests\n**/*.pyc\n")
+    write_file(os.path.join(context_dir, "common", "utils.py"), "print('utils')\n")
+    write_file(os.path.join(context_dir, "jobs", "etl", "etl.py"), "print('etl')\n")
+    write_file(os.path.join(context_dir, "jobs", "etl", "etl.pyc"))
+    write_file(os.path.join(context_dir, "jobs", "etl", "tests", "test_etl.py"))
+    write_file(os.path.join(context_dir, "README.md"), "readme\n")
+    return context_dir
+
+
+def test_compute_hashes_the_copied_files(context_dir: str) -> None:
+    """Only copied files not ignored by .dockerignore are hashed, the digest does not depend on other files.
+
+    :return: None
+    """
+    manifest = BuildContextDigest(context_dir).compute()
+
+    assert sorted(manifest["files"]) == ["common/utils.py", "jobs/etl/etl.py"]
+    assert manifest["base_image"] == "python:3.11"
+    assert manifest["image_tag"] == "ctx-" + manifest["digest"][:16]
+
+    write_file(os.path.join(context_dir, "README.md"), "changed\n")
+    write_file(os.path.join(context_dir, "jobs", "etl", "tests", "test_etl.py"), "changed\n")
+    assert BuildContextDigest(context_dir).compute()["digest"] == manifest["digest"]
+
+
+@pytest.mark.parametrize("change", ["content", "executable", "build_args", "base_image"])
+def test_compute_digest_changes(change: str, context_dir: str) -> None:
+    """Content and executable bit of copied files, build args and the base image change the digest.
+
+    :return: None
+    """
+    build_args = {"SENTRY_DSN": "https://key@sentry.example.com/1"}
+    manifest = BuildContextDigest(context_dir).compute(build_args=build_args)
+    base_docker_image = ""
+    if change == "content":
+        write_file(os.path.join(context_dir, "common", "utils.py"), "print('changed')\n")
+    elif change == "executable":
+        os.chmod(os.path.join(context_dir, "common", "utils.py"), 0o755)
+    elif change == "build_args":
+        build_args = {"SENTRY_DSN": "https://key@sentry.example.com/2"}
+    else:
+        base_docker_image = "python@sha256:" + "0" * 64
+
+    changed_manifest = BuildContextDigest(context_dir).compute(base_docker_image=base_docker_image,
+                                                                build_args=build_args)
+
+    assert changed_manifest["digest"] != manifest["digest"]
+    assert "sentry.example.com" not in json.dumps(changed_manifest)
+
+
+@pytest.mark.parametrize("rel_path, excluded", [
+    ("jobs/etl/tests/test_etl.py", True),
+    ("jobs/tests", True),
+    ("jobs/etl/etl.pyc", True),
+    ("jobs/keep.pyc", False),
+    ("build/out/lib.so", True),
+    ("jobs/etl/etl.py", False),
+    ("data/a.csv", True),
+    ("data/ab.csv", False),
+    ("secrets", False),
+])
+def test_dockerignore_last_matching_pattern_wins(rel_path: str, excluded: bool) -> None:
+    """Patterns match parent directories, * stops at directories, ** does not and ! re-includes paths.
+
+    :return: None
+    """
+    matcher = DockerignoreMatcher(["# comment", "", "**/tests", "*/*/*.pyc", "/build", "data/?.csv",
+                                   "secrets", "!secrets"])
+
+    assert matcher.is_excluded(rel_path) is excluded
+
+
+def test_manifest_reports_unchanged_build_context(context_dir: str, capsys: pytest.CaptureFixture[str]) -> None:
+    """The manifest compares against the previous one even when it is written over it.
+
+    :return: None
+    """
+    manifest_path = os.path.join(context_dir, ".build", "manifest.json")
+    digest = BuildContextDigest(context_dir)
+
+    assert digest.write_build_context_manifest(manifest_path, manifest_path)
+    assert digest.write_build_context_manifest(manifest_path, manifest_path) is False
+    assert "Build context unchanged" in capsys.readouterr().out
+
+    write_file(os.path.join(context_dir, "jobs", "etl", "etl.py"), "print('changed')\n")
+    assert BuildContextDigest(context_dir).write_build_context_manifest(manifest_path, manifest_path)
+    assert "(1 of 2 files changed)" in capsys.readouterr().out
+    manifest = BuildContextDigest.load_manifest(manifest_path)
+    assert manifest["digest"] == BuildContextDigest(context_dir).compute()["digest"]
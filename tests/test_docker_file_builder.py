@@ -0,0 +1,93 @@
+import os
+
+import pytest
+
+from amp_ds_platform_assembler.docker.docker_file_builder import DOCKERIGNORE_HEADER, DockerfileBuilder
+
+
+def write_file(path: str, content: str = "") -> None:
+    """Write a file of the build context, creating its directories.
+
+    :return: None
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as out_file:
+        out_file.write(content)
+
+
+def write_job(context_dir: str, rel_dir: str) -> None:
+    """Write a configured job directory under jobs.
+
+    :return: None
+    """
+    job_dir = os.path.join(context_dir, "jobs", rel_dir)
+    write_file(os.path.join(job_dir, f"{os.path.basename(rel_dir)}.py"), "print('job')\n")
+    write_file(os.path.join(job_dir, ".spark", "config.yml"), "uuid: job\n")
+
+
+def read_lines(path: str) -> list[str]:
+    """Lines of a generated file.
+
+    :return: list[str]
+    """
+    with open(path, "r") as in_file:
+        return in_file.read().splitlines()
+
+
+@pytest.fixture
+def context_dir(tmp_path: str, monkeypatch: pytest.MonkeyPatch) -> str:
+    """Build context with two teams, one of them named tests, used as working directory.
+
+    :return: str
+    """
+    context_dir = str(tmp_path)
+    for directory in ("common", "pie-config"):
+        os.makedirs(os.path.join(context_dir, directory))
+    write_job(context_dir, "tests/etl_orders")
+    write_file(os.path.join(context_dir, "jobs", "tests", "etl_orders", "tests", "test_etl_orders.py"))
+    write_file(os.path.join(context_dir, "jobs", "tests", "test_team.py"))
+    write_job(context_dir, "reports/daily")
+    write_file(os.path.join(context_dir, "jobs", "reports", "tests", "test_daily.py"))
+    monkeypatch.chdir(context_dir)
+    return context_dir
+
+
+def test_team_directory_named_tests_is_copied_and_not_ignored(context_dir: str) -> None:
+    """Only test directories without configured jobs in them are left out of the build context.
+
+    :return: None
+    """
+    DockerfileBuilder().build_layered_dockerfile("python:3.11", split_jobs_by_team=True)
+
+    assert "COPY jobs/tests /mnt/app/jobs/tests" in read_lines(os.path.join(context_dir, "Dockerfile"))
+    dockerignore_lines = read_lines(os.path.join(context_dir, ".dockerignore"))
+    assert "jobs/tests" not in dockerignore_lines
+    assert "jobs/tests/etl_orders" not in dockerignore_lines
+    assert ["jobs/reports/tests", "jobs/tests/etl_orders/tests", "jobs/tests/test_team.py"] == \
+        [line for line in dockerignore_lines if line.startswith("jobs/")]
+
+
+def test_teams_above_max_job_layers_are_copied_as_one_layer(context_dir: str) -> None:
+    """Jobs are copied as a single layer when the team layers would exceed the limit.
+
+    :return: None
+    """
+    DockerfileBuilder().build_layered_dockerfile("python:3.11", split_jobs_by_team=True, max_job_layers=1)
+
+    copy_lines = [line for line in read_lines(os.path.join(context_dir, "Dockerfile")) if line.startswith("COPY jobs")]
+    assert copy_lines == ["COPY jobs /mnt/app/jobs"]
+
+
+def test_hand_maintained_dockerignore_is_kept(context_dir: str) -> None:
+    """Only .dockerignore files generated by the builder are overwritten.
+
+    :return: None
+    """
+    dockerignore_path = os.path.join(context_dir, ".dockerignore")
+    write_file(dockerignore_path, "secrets\n")
+    DockerfileBuilder().build_layered_dockerfile("python:3.11")
+    assert read_lines(dockerignore_path) == ["secrets"]
+
+    write_file(dockerignore_path, f"{DOCKERIGNORE_HEADER}\nstale\n")
+    DockerfileBuilder().build_layered_dockerfile("python:3.11")
+    assert "stale" not in read_lines(dockerignore_path)
@@ -0,0 +1,135 @@
+import os
+import xml.etree.ElementTree as ElementTree
+
+import pytest
+
+from amp_ds_platform_library.sonarqube.sonar_pr_scope import SonarPRScope
+
+PYTEST_REPORT = """<?xml version="1.0" encoding="utf-8"?>
+<testsuites>
+  <testsuite name="pytest" tests="4" failures="1" errors="1" skipped="1">
+    <testcase classname="tests.test_etl.TestEtl" name="test_load"/>
+    <testcase classname="tests.test_etl" name="test_transform"><failure message="assert"/></testcase>
+    <testcase classname="tests.test_report" name="test_render"><error message="boom"/></testcase>
+    <testcase classname="tests.test_report.TestReport" name="test_send"><skipped/></testcase>
+  </testsuite>
+</testsuites>
+"""
+FLAKE8_REPORT = """<?xml version="1.0" encoding="utf-8"?>
+<testsuite name="flake8" tests="2" failures="2">
+  <testcase name="jobs/etl.py"><failure message="E501 line too long"/></testcase>
+  <testcase name="jobs/report.py"><failure message="F401 unused import"/></testcase>
+</testsuite>
+"""
+COVERAGE_REPORT = """<?xml version="1.0" ?>
+<coverage line-rate="0.5">
+  <sources><source>jobs</source></sources>
+  <packages>
+    <package name="jobs">
+      <classes>
+        <class name="etl.py" filename="etl.py" line-rate="1"/>
+        <class name="report.py" filename="report.py" line-rate="0"/>
+      </classes>
+    </package>
+  </packages>
+</coverage>
+"""
+
+
+@pytest.fixture
+def scope(tmp_path: str, monkeypatch: pytest.MonkeyPatch) -> SonarPRScope:
+    """Scope of a pull request changing a job and its test, the project is the working directory.
+
+    :return: SonarPRScope
+    """
+    project_dir = str(tmp_path)
+    for file_path in ("jobs/etl.py", "jobs/report.py", "tests/test_etl.py", "tests/test_report.py"):
+        os.makedirs(os.path.join(project_dir, os.path.dirname(file_path)), exist_ok=True)
+        with open(os.path.join(project_dir, file_path), "w") as out_file:
+            out_file.write("\n")
+    monkeypatch.chdir(project_dir)
+    return SonarPRScope(["jobs/etl.py", "tests/test_etl.py", "jobs/deleted.py"], repo_root=project_dir,
+                        project_dir=project_dir)
+
+
+def filter_report(scope: SonarPRScope, report: str) -> ElementTree.Element:
+    """Filter a report written to the working directory and parse the filtered copy.
+
+    :return: ElementTree.Element
+    """
+    with open("report.xml", "w") as report_file:
+        report_file.write(report)
+    filtered_report_path = scope.filter_report("report.xml")
+    assert filtered_report_path == "report.pr.xml"
+    return ElementTree.parse(filtered_report_path).getroot()
+
+
+def test_deleted_files_are_not_in_scope(scope: SonarPRScope) -> None:
+    """Only existing changed files are analysed.
+
+    :return: None
+    """
+    assert scope.sonar_opts() == ["-Dsonar.inclusions=jobs/etl.py,tests/test_etl.py"]
+
+
+def test_pytest_report_keeps_test_cases_of_changed_files(scope: SonarPRScope) -> None:
+    """Test cases of unchanged test modules are removed and the suite counters recounted.
+
+    :return: None
+    """
+    test_suite = filter_report(scope, PYTEST_REPORT).find("testsuite")
+
+    assert test_suite is not None
+    assert [test_case.get("name") for test_case in test_suite.iter("testcase")] == ["test_load", "test_transform"]
+    assert {counter: test_suite.get(counter) for counter in ("tests", "failures", "errors", "skipped")} == \
+        {"tests": "2", "failures": "1", "errors": "0", "skipped": "0"}
+
+
+def test_flake8_report_keeps_test_cases_of_changed_files(scope: SonarPRScope) -> None:
+    """Flake8 test cases are named after the checked file, counters missing from the suite are not added.
+
+    :return: None
+    """
+    test_suite = filter_report(scope, FLAKE8_REPORT)
+
+    assert [test_case.get("name") for test_case in test_suite.iter("testcase")] == ["jobs/etl.py"]
+    assert test_suite.get("tests") == "1"
+    assert test_suite.get("failures") == "1"
+    assert test_suite.get("errors") is None
+
+
+def test_coverage_report_keeps_classes_of_changed_files(scope: SonarPRScope) -> None:
+    """Coverage classes relative to a source root match the changed file ending with their path.
+
+    :return: None
+    """
+    coverage = filter_report(scope, COVERAGE_REPORT)
+
+    assert [coverage_class.get("filename") for coverage_class in coverage.iter("class")] == ["etl.py"]
+
+
+def test_unparsable_report_is_used_unfiltered(scope: SonarPRScope) -> None:
+    """Reports that are not XML are returned as is.
+
+    :return: None
+    """
+    with open("report.xml", "w") as report_file:
+        report_file.write("not xml")
+
+    assert scope.filter_report("report.xml") == "report.xml"
+    assert not os.path.exists("report.pr.xml")
+
+
+@pytest.mark.parametrize("attributes, path", [
+    ({"file": "tests/test_etl.py", "classname": "test_etl.TestEtl", "name": "test_load"}, "tests/test_etl.py"),
+    ({"classname": "tests.test_etl", "name": "test_load"}, "tests/test_etl.py"),
+    ({"classname": "tests.test_etl.TestEtl", "name": "test_load"}, "tests/test_etl.py"),
+    ({"classname": "tests.test_etl.TestEtl.TestNested", "name": "test_load"}, "tests/test_etl.py"),
+    ({"classname": "", "name": "jobs/etl.py"}, "jobs/etl.py"),
+])
+def test_testcase_path(attributes: dict[str, str], path: str) -> None:
+    """Test case paths come from the file attribute, the module part of the class name or the flake8 name.
+
+    :return: None
+    """
+    assert SonarPRScope.testcase_path(ElementTree.Element("testcase", attributes)) == path
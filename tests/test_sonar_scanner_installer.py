@@ -0,0 +1,57 @@
+import os
+
+import pytest
+
+from amp_ds_platform_library.sonarqube.sonar_scanner_installer import SonarScannerInstaller
+
+
+class RecordingInstaller(SonarScannerInstaller):
+    """Installer recording downloads instead of running them."""
+
+    def __init__(self, cache_dir: str) -> None:
+        super().__init__(version="0.0.0.1", cache_dir=cache_dir)
+        self.downloads: list[str] = []
+
+    def download(self, zip_path: str) -> str:
+        self.downloads.append(zip_path)
+        with open(zip_path, "wb") as zip_file:
+            zip_file.write(b"zip")
+        return "0" * 64
+
+
+@pytest.fixture
+def installer(tmp_path: str, monkeypatch: pytest.MonkeyPatch) -> RecordingInstaller:
+    """Installer of a version without a pinned checksum into a temporary cache.
+
+    :return: RecordingInstaller
+    """
+    monkeypatch.delenv("SONAR_SCANNER_SHA256", raising=False)
+    return RecordingInstaller(str(tmp_path))
+
+
+def test_install_fails_without_a_checksum(installer: RecordingInstaller, monkeypatch: pytest.MonkeyPatch) -> None:
+    """An unverifiable scanner is neither downloaded nor installed.
+
+    :return: None
+    """
+    monkeypatch.setattr(installer, "fetch_published_sha256", lambda: "")
+
+    with pytest.raises(RuntimeError, match="No checksum to verify"):
+        installer.install()
+
+    assert installer.downloads == []
+    assert not installer.is_installed()
+
+
+def test_install_fails_on_checksum_mismatch(installer: RecordingInstaller) -> None:
+    """A downloaded zip not matching the expected checksum is removed.
+
+    :return: None
+    """
+    installer.sha256 = "1" * 64
+
+    with pytest.raises(RuntimeError, match="Checksum mismatch"):
+        installer.install()
+
+    assert not os.path.exists(installer.downloads[0])
+    assert not installer.is_installed()
@@ -0,0 +1,102 @@
+import json
+import os
+import sys
+
+import pytest
+
+from amp_ds_platform_library.sonarqube.sonar_scanner_runner import SonarScannerRunner
+
+SCANNER_OUTPUT = [
+    "INFO: Scanner configuration file: /opt/sonar-scanner/conf/sonar-scanner.properties",
+    "12:00:01.123 DEBUG: Sensor Python Sensor [python] (done) | time=1234ms",
+    "INFO: Sensor Cobertura Sensor for Python coverage [python] (done) | time=56ms",
+    "WARN: Missing blame information for the following files:",
+    "  * jobs/etl.py",
+    "INFO: Load project repositories (done) | time=789ms",
+    "    at org.sonar.Scanner.run(Scanner.java:1)",
+    "ERROR: Error during SonarScanner execution",
+]
+
+
+def fake_scanner(exit_status: int = 0) -> list[str]:
+    """Command printing the scanner output and exiting with the exit status.
+
+    :return: list[str]
+    """
+    output = "\n".join(SCANNER_OUTPUT)
+    script = f"import sys; print({output!r}); sys.exit({exit_status})"
+    return [sys.executable, "-c", script]
+
+
+def test_lines_below_the_log_level_are_not_printed(capsys: pytest.CaptureFixture[str]) -> None:
+    """Lines without a log level follow the decision of the previous line.
+
+    :return: None
+    """
+    runner = SonarScannerRunner(log_level="WARN")
+
+    assert runner.run(fake_scanner(exit_status=2), env=dict(os.environ)) == 2
+
+    assert capsys.readouterr().out.splitlines() == [
+        "WARN: Missing blame information for the following files:",
+        "  * jobs/etl.py",
+        "ERROR: Error during SonarScanner execution",
+    ]
+    assert runner.scanner_opts() == []
+
+
+def test_debug_prints_all_lines(capsys: pytest.CaptureFixture[str]) -> None:
+    """DEBUG prints every line and runs the scanner with -X.
+
+    :return: None
+    """
+    runner = SonarScannerRunner()
+
+    assert runner.run(fake_scanner(), env=dict(os.environ)) == 0
+
+    assert capsys.readouterr().out.splitlines() == SCANNER_OUTPUT
+    assert runner.scanner_opts() == ["-X"]
+
+
+def test_timing_of_filtered_lines_is_reported(tmp_path: str) -> None:
+    """Phases are parsed from every log line, also the ones not printed, and ordered by time.
+
+    :return: None
+    """
+    runner = SonarScannerRunner(log_level="ERROR")
+    runner.run(fake_scanner(), env=dict(os.environ))
+    report_path = os.path.join(tmp_path, "reports", "sonar-timing.json")
+
+    runner.write_timing_report(report_path)
+
+    with open(report_path, "r") as report_file:
+        report = json.load(report_file)
+    assert report["exit_status"] == 0
+    assert report["elapsed_seconds"] >= 0
+    assert report["phases"] == [
+        {"phase": "Sensor Python Sensor [python]", "time_ms": 1234},
+        {"phase": "Load project repositories", "time_ms": 789},
+        {"phase": "Sensor Cobertura Sensor for Python coverage [python]", "time_ms": 56},
+    ]
+
+
+@pytest.mark.parametrize("message", ["Sensor Python Sensor [python]", "time=12ms", "Load | time=12s"])
+def test_messages_without_timing_are_ignored(message: str) -> None:
+    """Only messages ending in "| time=<n>ms" are phases.
+
+    :return: None
+    """
+    runner = SonarScannerRunner()
+
+    runner.parse_timing(message)
+
+    assert runner.phases == []
+
+
+def test_unknown_log_level_raises() -> None:
+    """Log levels are checked before running the scanner.
+
+    :return: None
+    """
+    with pytest.raises(RuntimeError, match="Unknown sonar-scanner log level TRACE"):
+        SonarScannerRunner(log_level="TRACE")
@@ -0,0 +1,49 @@
+import json
+import os
+
+from amp_ds_platform_assembler.spark_config.spark_config_builder import SparkConfigGenerator
+
+ANCHORS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                            "amp_ds_platform_assembler", "spark_config", "anchors.yml")
+
+
+def read_anchors() -> str:
+    """Anchors file shipped with the assembler.
+
+    :return: str
+    """
+    with open(ANCHORS_PATH, "r") as anchors_file:
+        return anchors_file.read()
+
+
+def test_base_properties_are_cached_as_json(tmp_path: str) -> None:
+    """Resolved default properties are stored as plain JSON and served from it.
+
+    :return: None
+    """
+    raw_file = read_anchors()
+    generator = SparkConfigGenerator()
+
+    base_properties = generator.get_base_properties(raw_file, False, cache_dir=str(tmp_path))
+
+    cache_files = os.listdir(tmp_path)
+    assert len(cache_files) == 1 and cache_files[0].endswith("-0.json")
+    with open(os.path.join(tmp_path, cache_files[0]), "r") as cache_file:
+        assert json.load(cache_file) == dict(base_properties)
+    assert dict(generator.get_base_properties(raw_file, False, cache_dir=str(tmp_path))) == dict(base_properties)
+
+
+def test_corrupt_cache_is_parsed_again(tmp_path: str) -> None:
+    """Cache files that are not a JSON object are ignored.
+
+    :return: None
+    """
+    raw_file = read_anchors()
+    generator = SparkConfigGenerator()
+    expected = dict(generator.get_base_properties(raw_file, True))
+    generator.get_base_properties(raw_file, True, cache_dir=str(tmp_path))
+    cache_path = os.path.join(tmp_path, os.listdir(tmp_path)[0])
+    with open(cache_path, "w") as cache_file:
+        cache_file.write("[1, 2")
+
+    assert dict(generator.get_base_properties(raw_file, True, cache_dir=str(tmp_path))) == expected
@@ -0,0 +1,103 @@
+import os
+from typing import Any
+
+import pytest
+
+from amp_ds_platform_library.splunk.splunk_columnar import SplunkColumnarConverter
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+# fields appear, change type and turn multivalue after the first batch of two rows
+ROWS: list[dict[str, Any]] = [
+    {"count": "1", "_time": "2024-01-01T00:00:00+00:00", "empty": ""},
+    {"count": "2", "_time": "2024-01-02T00:00:00+00:00", "empty": ""},
+    {"count": "2.5", "_time": "n/a", "empty": "7", "late": "x"},
+    {"count": "3", "_time": "2024-01-03 00:00:00 PST", "tags": ["a", "b"]},
+    {"count": "4", "tags": "c"},
+]
+
+
+def test_write_parquet_types_columns_from_all_rows(tmp_path: Any) -> None:
+    """Later batches widen the column types and add fields instead of losing values.
+
+    :return: None
+    """
+    file_path = os.path.join(tmp_path, "results.parquet")
+
+    assert SplunkColumnarConverter(batch_size=2).write_parquet(iter(ROWS), file_path) == 5
+
+    table = pq.read_table(file_path)
+    assert table.schema == pa.schema([("count", pa.float64()), ("_time", pa.string()), ("empty", pa.int64()),
+                                      ("late", pa.string()), ("tags", pa.list_(pa.string()))])
+    assert table.column("count").to_pylist() == [1.0, 2.0, 2.5, 3.0, 4.0]
+    assert table.column("_time").to_pylist() == [row.get("_time") for row in ROWS]
+    assert table.column("empty").to_pylist() == [None, None, 7, None, None]
+    assert table.column("late").to_pylist() == [None, None, "x", None, None]
+    assert table.column("tags").to_pylist() == [None, None, None, ["a", "b"], ["c"]]
+
+
+def test_write_arrow_types_columns_from_all_rows(tmp_path: Any) -> None:
+    """Arrow IPC stream files hold the same typed columns.
+
+    :return: None
+    """
+    file_path = os.path.join(tmp_path, "results.arrow")
+
+    assert SplunkColumnarConverter(batch_size=2).write_arrow(iter(ROWS), file_path) == 5
+
+    with pa.ipc.open_stream(file_path) as reader:
+        table = reader.read_all()
+    assert table.column("count").to_pylist() == [1.0, 2.0, 2.5, 3.0, 4.0]
+    assert table.column("late").to_pylist() == [None, None, "x", None, None]
+
+
+def test_iter_record_batches_raises_instead_of_losing_values() -> None:
+    """Streamed batches keep the types of the first batch and refuse values they cannot hold.
+
+    :return: None
+    """
+    with pytest.raises(RuntimeError, match="Field count does not fit the schema"):
+        list(SplunkColumnarConverter(batch_size=1).iter_record_batches([{"count": "1"}, {"count": "x"}]))
+
+
+def test_iter_record_batches_appends_fields_of_later_batches() -> None:
+    """Fields first appearing in a later batch widen the schema of the following batches.
+
+    :return: None
+    """
+    rows = [{"count": "1"}, {"count": "2", "late": "x"}, {"count": "3", "later": "4"}, {"count": "5", "late": "y"}]
+
+    batches = list(SplunkColumnarConverter(batch_size=1).iter_record_batches(rows))
+
+    assert batches[-1].schema == pa.schema([("count", pa.int64()), ("late", pa.string()), ("later", pa.int64())])
+    table = pa.concat_tables([pa.Table.from_batches([batch]) for batch in batches], promote_options="default")
+    assert table.to_pylist() == [{"count": 1, "late": None, "later": None}, {"count": 2, "late": "x", "later": None},
+                                 {"count": 3, "late": None, "later": 4}, {"count": 5, "late": "y", "later": None}]
+
+
+def test_numbers_with_leading_zeros_stay_strings() -> None:
+    """Ids and zip codes with leading zeros keep their zeros instead of being typed as numbers.
+
+    :return: None
+    """
+    rows = [{"zip": "00123", "amount": "007.5", "count": "0", "ratio": "0.5"}, {"zip": "12345", "amount": "1.5",
+                                                                                 "count": "10", "ratio": ".25"}]
+
+    table = pa.Table.from_batches(list(SplunkColumnarConverter().iter_record_batches(rows)))
+
+    assert table.schema == pa.schema([("zip", pa.string()), ("amount", pa.string()), ("count", pa.int64()),
+                                      ("ratio", pa.float64())])
+    assert table.column("zip").to_pylist() == ["00123", "12345"]
+
+
+def test_iter_record_batches_drops_fields_missing_from_given_schema() -> None:
+    """A given schema selects the fields converted.
+
+    :return: None
+    """
+    converter = SplunkColumnarConverter(batch_size=2, schema=pa.schema([("count", pa.string())]))
+
+    table = pa.Table.from_batches(list(converter.iter_record_batches(ROWS)))
+
+    assert table.to_pylist() == [{"count": row["count"]} for row in ROWS]
@@ -0,0 +1,130 @@
+import csv
+import io
+import json
+import os
+from typing import Any
+
+import pytest
+
+from amp_ds_platform_library.models.splunk.splunk_search import SplunkExecMode, SplunkInstance, SplunkOutputFormat
+from amp_ds_platform_library.splunk.splunk_operator import SplunkOperator
+
+
+class FakeJob:
+    """Finished search job returning at most max_result_rows rows per results request, like limits.conf."""
+
+    def __init__(self, result_count: int, max_result_rows: int, report_result_count: bool = True) -> None:
+        self.rows = [{"index": str(index)} for index in range(result_count)]
+        self.max_result_rows = max_result_rows
+        self.report_result_count = report_result_count
+        self.requests: list[tuple[int, int]] = []
+
+    def refresh(self) -> "FakeJob":
+        return self
+
+    def __getitem__(self, key: str) -> str:
+        if not self.report_result_count:
+            raise KeyError(key)
+        return str(len(self.rows))
+
+    def results(self, output_mode: str, count: int, offset: int) -> io.BytesIO:
+        self.requests.append((count, offset))
+        page = self.rows[offset:offset + min(count, self.max_result_rows)]
+        return io.BytesIO(json.dumps({"preview": False, "results": page}).encode())
+
+
+class FakeJobs:
+    def __init__(self, job: FakeJob) -> None:
+        self.job = job
+
+    def create(self, query: str, **params: Any) -> FakeJob:
+        return self.job
+
+
+class FakeService:
+    def __init__(self, job: FakeJob) -> None:
+        self.jobs = FakeJobs(job)
+
+
+def search_rows(failing_instance: SplunkInstance | None) -> Any:
+    """Replacement of search_instance_rows returning one row per instance, failing in one instance.
+
+    :return: Callable
+    """
+    def search_instance_rows(instance: SplunkInstance, search_query: str,
+                             search_params: dict[Any, Any]) -> list[dict[str, Any]]:
+        if instance == failing_instance:
+            raise ConnectionError("connection refused")
+        return [{"instance": instance.value}]
+
+    return search_instance_rows
+
+
+def test_pie_and_itunes_search_returns_rows_of_both_instances(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Rows of both instances are returned, pie first.
+
+    :return: None
+    """
+    operator = SplunkOperator(service_cache=None)
+    monkeypatch.setattr(operator, "search_instance_rows", search_rows(None))
+
+    assert operator.run_search_in_pie_and_itunes("search index={{ index_name }}", {}) == [
+        {"instance": SplunkInstance.pie.value}, {"instance": SplunkInstance.itunes.value}
+    ]
+
+
+@pytest.mark.parametrize("failing_instance", [SplunkInstance.pie, SplunkInstance.itunes])
+def test_pie_and_itunes_search_raises_when_one_instance_fails(failing_instance: SplunkInstance,
+                                                              monkeypatch: pytest.MonkeyPatch) -> None:
+    """Rows of a single instance are not returned as if they were complete.
+
+    :return: None
+    """
+    operator = SplunkOperator(service_cache=None)
+    monkeypatch.setattr(operator, "search_instance_rows", search_rows(failing_instance))
+
+    with pytest.raises(RuntimeError, match=f"splunk.{failing_instance.value}: connection refused"):
+        operator.run_search_in_pie_and_itunes("search index={{ index_name }}", {})
+
+
+def test_paging_continues_past_the_server_result_row_limit() -> None:
+    """A page size above maxresultrows returns short pages, paging goes on until the job result count.
+
+    :return: None
+    """
+    job = FakeJob(result_count=25, max_result_rows=10)
+    operator = SplunkOperator(exec_mode=SplunkExecMode.blocking, service_cache=None)
+
+    rows = list(operator.iter_search_results(FakeService(job), "search", {}, page_size=20))
+
+    assert [row["index"] for row in rows] == [str(index) for index in range(25)]
+    assert job.requests == [(20, 0), (20, 10), (20, 20)]
+
+
+def test_paging_without_result_count_caps_the_page_size() -> None:
+    """Without a result count the page size is capped at the default maxresultrows.
+
+    :return: None
+    """
+    job = FakeJob(result_count=5, max_result_rows=50000, report_result_count=False)
+    operator = SplunkOperator(exec_mode=SplunkExecMode.blocking, service_cache=None)
+
+    assert len(list(operator.iter_search_results(FakeService(job), "search", {}, page_size=100000))) == 5
+    assert job.requests == [(50000, 0)]
+
+
+def test_csv_columns_include_fields_of_later_rows(tmp_path: str) -> None:
+    """Fields first appearing after the first row get a column instead of being dropped.
+
+    :return: None
+    """
+    file_path = os.path.join(tmp_path, "results.csv")
+    rows = [{"host": "a"}, {"host": "b", "status": "500"}, {"error": "timeout"}]
+
+    assert SplunkOperator.write_search_results(iter(rows), file_path, output_format=SplunkOutputFormat.csv) == 3
+
+    with open(file_path, "r", newline="") as csv_file:
+        reader = csv.DictReader(csv_file)
+        assert reader.fieldnames == ["host", "status", "error"]
+        assert list(reader) == [{"host": "a", "status": "", "error": ""}, {"host": "b", "status": "500", "error": ""},
+                                {"host": "", "status": "", "error": "timeout"}]